@@ -0,0 +1,106 @@
+"""
+Adaptação de textos das questões coletadas (sinônimos e paráfrases simples)
+Todas as regras de substituição são compiladas uma única vez em uma só
+expressão regular, montada como uma árvore de prefixos (trie): o texto é
+percorrido em uma passada, e o custo por caractere praticamente não cresce
+com o número de regras. Em cada posição vale a frase mais longa.
+
+Arquivo de regras (carregar_regras): uma regra por linha no formato
+    original => substituto
+Linhas vazias e iniciadas por # são ignoradas.
+"""
+import re
+from functools import lru_cache
+
+REGRAS_PADRAO = {
+    'de acordo com': 'conforme',
+    'assinale a alternativa': 'marque a opção',
+    'é correto afirmar': 'pode-se afirmar corretamente',
+    'é incorreto afirmar': 'não se pode afirmar corretamente',
+    'julgue os itens': 'avalie os itens',
+    'com relação a': 'acerca de',
+    'no que se refere a': 'quanto a',
+}
+
+_ESPACOS = re.compile(r'\s+')
+
+
+def _normalizar(frase):
+    return _ESPACOS.sub(' ', frase.strip()).lower()
+
+
+def carregar_regras(caminho):
+    """Lê um arquivo de regras 'original => substituto' e retorna {original: substituto}"""
+    regras = {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if not linha or linha.startswith('#'):
+                continue
+            if '=>' not in linha:
+                raise ValueError(f"{caminho}:{numero}: regra sem '=>': {linha!r}")
+            original, substituto = linha.split('=>', 1)
+            regras[original.strip()] = substituto.strip()
+    return regras
+
+
+def regex_trie(frases):
+    """Expressão regular equivalente a frase1|frase2|..., fatorada pelos prefixos comuns"""
+    trie = {}
+    for frase in frases:
+        no = trie
+        for ch in frase:
+            no = no.setdefault(ch, {})
+        no[''] = {}
+
+    def gerar(no):
+        ramos = [re.escape(ch) + gerar(filho) for ch, filho in sorted(no.items()) if ch]
+        if not ramos:
+            return ''
+        corpo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        # Frase que termina aqui: o ramo mais longo é opcional (e tentado primeiro)
+        return f'(?:{corpo})?' if '' in no else corpo
+
+    return gerar(trie)
+
+
+class Adaptador:
+    """Aplica as regras de substituição (sem diferenciar maiúsculas) em uma passada"""
+
+    def __init__(self, regras=None):
+        regras = REGRAS_PADRAO if regras is None else regras
+        self.regras = {_normalizar(o): s for o, s in regras.items() if o.strip()}
+        self.padrao = re.compile(regex_trie(self.regras), re.IGNORECASE) if self.regras else None
+
+    def _substituir(self, match):
+        trecho = match.group(0)
+        return self.regras.get(trecho.lower(), trecho)
+
+    def substituir(self, texto):
+        if self.padrao is None:
+            return texto
+        return self.padrao.sub(self._substituir, texto)
+
+    def adaptar(self, texto):
+        if not texto:
+            return texto
+
+        # Normaliza espaços
+        texto = _ESPACOS.sub(' ', texto.strip())
+        texto_adaptado = self.substituir(texto)
+
+        # Pequenas variações para evitar cópia exata
+        # Se nenhuma regra se aplicou, adiciona pequenas modificações
+        if texto_adaptado == texto:
+            texto_adaptado = texto_adaptado.replace(' o ', ' o(a) ').replace(' a ', ' a(o) ')
+            texto_adaptado = texto_adaptado.replace('é', 'é considerado').replace('são', 'são considerados')
+
+        return texto_adaptado[:len(texto) + 50]  # Limita tamanho
+
+
+@lru_cache(maxsize=8)
+def obter_adaptador(arquivo_regras=None):
+    """Adaptador compilado (um por arquivo de regras, reaproveitado pelo processo)"""
+    if arquivo_regras is None:
+        return Adaptador()
+    return Adaptador(carregar_regras(arquivo_regras))
@@ -0,0 +1,209 @@
+"""
+Amostragem de questões para montar simulados
+Sorteador único do app web, do app de desktop (main_app.py) e do simulado de
+terminal (simulado.py). Sorteia o simulado inteiro em número constante de
+consultas, qualquer que seja a configuração {materia: qtd}, com custo
+proporcional às quantidades pedidas e não ao tamanho do banco:
+  1. uma consulta com o menor id e o maior id de cada matéria (índices
+     (cargo_id, materia) e (materia, id)); o total de cada matéria vem do
+     catálogo em cache (catalogo.py)
+  2. ids candidatos são sorteados uniformemente no intervalo [MIN, MAX] de cada
+     matéria e buscados de uma vez (IN por chave primária); os que não existem
+     ou são de outra matéria são descartados (amostragem por rejeição, que
+     mantém a escolha uniforme mesmo com buracos na numeração)
+Matérias com poucas questões têm os ids listados pelo índice e sorteados
+diretamente. Se o sorteio não render questões suficientes, uma nova rodada é
+feita apenas para as matérias que faltaram (raro, pois os candidatos já vêm
+com folga).
+Com excluir (ids já vistos, ver vistas.py), os candidatos excluídos também são
+descartados e cada nova rodada sorteia quatro vezes mais candidatos para as
+matérias que faltaram; se nem assim bastar (o aluno já viu quase tudo), os ids
+restantes da matéria são listados pelo índice.
+"""
+import json
+import math
+import random
+
+from catalogo import obter_catalogo
+
+COLUNAS_QUESTAO = """id, enunciado, op_a, op_b, op_c, op_d, correta, materia,
+       COALESCE(explicacao_teorica, '') AS explicacao_teorica, banca, orgao, explicacao_html"""
+
+# Folga aplicada ao número esperado de candidatos por matéria
+FOLGA_CANDIDATOS = 1.5
+MAX_RODADAS = 4
+AUMENTO_POR_RODADA = 4  # multiplicador de candidatos por rodada, com excluir
+
+
+def _filtro_cargo(cargo_id):
+    """cargo_id=... não filtra por cargo; None é o banco geral"""
+    if cargo_id is ...:
+        return "1", ()
+    if cargo_id is None:
+        return "cargo_id IS NULL", ()
+    return "cargo_id = ?", (cargo_id,)
+
+
+def totais_catalogo(conn, cargo_id):
+    """{materia: total} do cargo, lido do catálogo em cache (sem contar a cada sorteio)"""
+    caminho = conn.execute("PRAGMA database_list").fetchone()[2]
+    return obter_catalogo(caminho).totais(cargo_id)
+
+
+def faixas_por_materia(conn, cargo_id, materias, totais=None):
+    """
+    Retorna {materia: (menor id, maior id, total)} das matérias do cargo.
+    Se totais ({materia: qtd}) já forem conhecidos, a contagem é dispensada.
+    """
+    if not materias:
+        return {}
+    filtro, params = _filtro_cargo(cargo_id)
+    contagem = "NULL" if totais is not None else \
+        f"(SELECT COUNT(*) FROM questoes WHERE {filtro} AND materia = m.value)"
+    rows = conn.execute(f"""
+        SELECT m.value,
+               (SELECT id FROM questoes WHERE {filtro} AND materia = m.value ORDER BY id LIMIT 1),
+               (SELECT id FROM questoes WHERE {filtro} AND materia = m.value ORDER BY id DESC LIMIT 1),
+               {contagem}
+        FROM json_each(?) m
+    """, params * (2 if totais is not None else 3) + (json.dumps(list(materias)),)).fetchall()
+    faixas = {}
+    for materia, menor, maior, total in rows:
+        if totais is not None:
+            total = totais.get(materia, 0)
+        if menor is not None and total:
+            faixas[materia] = (menor, maior, total)
+    return faixas
+
+
+def _candidatos_esperados(faixa, faltam):
+    menor, maior, total = faixa
+    return math.ceil(faltam * (maior - menor + 1) / total * FOLGA_CANDIDATOS) + 8
+
+
+def _listar_ids(conn, cargo_id, materias):
+    """{materia: [ids]} lidos direto do índice, para matérias pequenas"""
+    filtro, params = _filtro_cargo(cargo_id)
+    ids = {m: [] for m in materias}
+    for materia, qid in conn.execute(f"""
+        SELECT materia, id FROM questoes
+        WHERE {filtro} AND materia IN (SELECT value FROM json_each(?))
+    """, params + (json.dumps(materias),)):
+        ids[materia].append(qid)
+    return ids
+
+
+def _buscar(conn, cargo_id, ids):
+    """{id: questão} dos ids que existem e são do cargo"""
+    filtro, params = _filtro_cargo(cargo_id)
+    rows = conn.execute(f"""
+        SELECT {COLUNAS_QUESTAO} FROM questoes
+        WHERE id IN (SELECT value FROM json_each(?)) AND +{filtro}
+    """, (json.dumps(sorted(ids)),) + params).fetchall()
+    return {r[0]: r for r in rows}
+
+
+def amostrar_questoes(conn, cargo_id, config, totais=None, rng=random, excluir=None):
+    """
+    config = {materia: qtd}. Retorna lista embaralhada de tuplas
+    (id, enunciado, op_a, op_b, op_c, op_d, correta, materia, explicacao_teorica, banca, orgao,
+    explicacao_html).
+    cargo_id=... sorteia entre todos os cargos; None é o banco geral.
+    totais ({materia: qtd no banco}) é opcional; sem ele, vem do catálogo.
+    excluir (qualquer objeto com `in`) descarta os ids que contém.
+    """
+    if totais is None:
+        totais = totais_catalogo(conn, cargo_id)
+    faixas = faixas_por_materia(conn, cargo_id, [m for m, qtd in config.items() if qtd > 0], totais)
+    faltam = {m: min(config[m], total) for m, (_, _, total) in faixas.items()}
+    escolhidas = {m: {} for m in faltam}
+    fator = {m: 1 for m in faltam}
+    listar = set()  # matérias em que já compensa listar os ids restantes
+
+    def aceitavel(m, qid):
+        return qid not in escolhidas[m] and (excluir is None or qid not in excluir)
+
+    # Matérias em que sortear no intervalo custaria mais candidatos do que a
+    # própria matéria tem questões: lista os ids e sorteia entre eles
+    pequenas = [m for m in faltam if _candidatos_esperados(faixas[m], faltam[m]) >= faixas[m][2]]
+    ids_pequenas = _listar_ids(conn, cargo_id, pequenas) if pequenas else {}
+
+    for _ in range(MAX_RODADAS):
+        pendentes = [m for m, qtd in faltam.items() if qtd > 0 and m not in listar]
+        if not pendentes:
+            break
+        candidatos = {}
+        for m in pendentes:
+            if m in ids_pequenas:
+                restantes = [i for i in ids_pequenas[m] if aceitavel(m, i)]
+                candidatos[m] = rng.sample(restantes, min(faltam[m], len(restantes)))
+            else:
+                menor, maior, _ = faixas[m]
+                candidatos[m] = [rng.randint(menor, maior)
+                                 for _ in range(_candidatos_esperados(faixas[m], faltam[m]) * fator[m])]
+        encontradas = _buscar(conn, cargo_id, {i for ids in candidatos.values() for i in ids})
+        # Percorre os candidatos na ordem sorteada: os primeiros acertos
+        # distintos formam uma amostra uniforme da matéria
+        for m in pendentes:
+            for qid in candidatos[m]:
+                if faltam[m] == 0:
+                    break
+                q = encontradas.get(qid)
+                if q is not None and q[7] == m and aceitavel(m, qid):
+                    escolhidas[m][qid] = q
+                    faltam[m] -= 1
+            if excluir is not None and faltam[m] and m not in ids_pequenas:
+                fator[m] *= AUMENTO_POR_RODADA
+                if _candidatos_esperados(faixas[m], faltam[m]) * fator[m] >= faixas[m][2]:
+                    listar.add(m)
+
+    # Quase tudo já visto: sorteia entre os ids restantes, listados pelo índice
+    pendentes = [m for m, qtd in faltam.items() if qtd > 0 and m not in ids_pequenas]
+    if excluir is not None and pendentes:
+        sorteados = []
+        for m, ids in _listar_ids(conn, cargo_id, pendentes).items():
+            restantes = [i for i in ids if aceitavel(m, i)]
+            sorteados += rng.sample(restantes, min(faltam[m], len(restantes)))
+        for qid, q in _buscar(conn, cargo_id, sorteados).items():
+            escolhidas[q[7]][qid] = q
+
+    todas = [q for por_materia in escolhidas.values() for q in por_materia.values()]
+    rng.shuffle(todas)
+    return todas
+
+
+def amostrar_do_banco(conn, quantidade, rng=random):
+    """
+    quantidade questões sorteadas entre todas, sem filtro de cargo ou matéria
+    (mesmo formato de amostrar_questoes). Sorteia ids entre MIN(id) e MAX(id)
+    da chave primária, supondo a numeração quase contínua; a cada rodada
+    curta os candidatos são multiplicados por AUMENTO_POR_RODADA.
+    """
+    # Subconsultas separadas: MIN e MAX juntos no mesmo SELECT percorreriam a tabela
+    menor, maior = conn.execute(
+        "SELECT (SELECT MIN(id) FROM questoes), (SELECT MAX(id) FROM questoes)").fetchone()
+    if menor is None:
+        return []
+    escolhidas = {}
+    fator = 1
+    while len(escolhidas) < quantidade:
+        faltam = quantidade - len(escolhidas)
+        n = math.ceil(faltam * FOLGA_CANDIDATOS) * fator + 8
+        if n >= maior - menor + 1:
+            # Banco pequeno ou muito esparso: sorteia entre os ids existentes
+            restantes = [i for (i,) in conn.execute("SELECT id FROM questoes") if i not in escolhidas]
+            candidatos = rng.sample(restantes, min(faltam, len(restantes)))
+        else:
+            candidatos = [rng.randint(menor, maior) for _ in range(n)]
+        encontradas = _buscar(conn, ..., set(candidatos))
+        for qid in candidatos:
+            if len(escolhidas) == quantidade:
+                break
+            if qid in encontradas and qid not in escolhidas:
+                escolhidas[qid] = encontradas[qid]
+        if n >= maior - menor + 1:
+            break
+        fator *= AUMENTO_POR_RODADA
+    todas = list(escolhidas.values())
+    rng.shuffle(todas)
+    return todas
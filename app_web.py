@@ -1,12 +1,28 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
-import random
-import re
+import json
 import time
 import hashlib
 from datetime import datetime, timedelta
-from streamlit_autorefresh import st_autorefresh
+from array import array
+import streamlit.components.v1 as components
+from conexao import conexao, estatisticas as estatisticas_conexoes
+from amostragem import amostrar_questoes
+from database import aplicar_migracoes
+from autenticacao import resolver_principal, garantir_admin_dono, invalidar_usuario
+from catalogo import obter_catalogo, invalidar_catalogo
+from registros import consultar, consultar_um, como_dicts
+from busca import buscar_questoes
+from listagem import listar_questoes, TAMANHO_PREVIA
+from respostas import novo_simulado_id, registrar_resposta, finalizar_simulado
+from desempenho import desempenho_usuario
+from revisao import selecionar_revisao, UNIFORME, REVISAO_INTELIGENTE
+from vistas import amostrar_ineditas, marcar_vistas, total_vistas, limpar_vistas, INEDITAS
+from cache_questoes import obter_cache, questoes_por_id, invalidar_questoes
+from renderizacao import renderizar, html_teoria
+from assinaturas import iniciar_varredura, contagem_assinaturas
+from comentarios import (adicionar_comentario, esvaziar_comentarios, total_comentarios,
+                         comentarios_da_questao, comentarios_recentes, remover_comentario)
 try:
     from config import ADMIN_DONO, VALOR_ASSINATURA
 except ImportError:
@@ -43,44 +59,23 @@ st.markdown("""
     .stButton > button[kind="primary"] { background: #2563eb !important; color: #fff !important; border: none !important; }
     [data-testid="stMetricValue"] { color: #1e3a5f !important; }
     [data-testid="stMetricLabel"] { color: #475569 !important; }
+    .st-key-tempo_esgotado { display: none; }
 </style>
 """, unsafe_allow_html=True)
 
 # ==============================
 # 2. BANCO DE DADOS
 # ==============================
-def acessar_banco():
-    return sqlite3.connect("banco_questoes.db", check_same_thread=False)
-
-def criar_tabelas():
-    conn = acessar_banco()
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL UNIQUE,
-            senha TEXT NOT NULL
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS admins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER NOT NULL UNIQUE,
-            FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-criar_tabelas()
+# Aplica as migrações pendentes uma única vez por processo
+aplicar_migracoes()
+# Expira as assinaturas vencidas em segundo plano (uma thread por processo)
+iniciar_varredura()
 
 def existe_algum_admin():
     """Verifica se já existe pelo menos um admin"""
-    conn = acessar_banco()
-    try:
+    with conexao() as conn:
         r = conn.execute("SELECT 1 FROM admins LIMIT 1").fetchone()
         return r is not None
-    finally:
-        conn.close()
 
 # ==============================
 # 3. SEGURANÇA E ADMIN
@@ -88,68 +83,40 @@ def existe_algum_admin():
 def hash_senha(senha):
     return hashlib.sha256(senha.encode("utf-8")).hexdigest()
 
-def eh_admin(usuario_id, nome_usuario=None):
-    """Verifica se o usuário é admin (dono do site)"""
-    if nome_usuario and nome_usuario.lower() == ADMIN_DONO.lower():
-        # Garante que o dono está na tabela admins
-        conn = acessar_banco()
-        try:
-            admin = conn.execute("SELECT id FROM admins WHERE usuario_id = ?", (usuario_id,)).fetchone()
-            if not admin:
-                conn.execute("INSERT OR IGNORE INTO admins (usuario_id) VALUES (?)", (usuario_id,))
-                conn.commit()
-            return True
-        finally:
-            conn.close()
-    conn = acessar_banco()
-    try:
-        admin = conn.execute("SELECT id FROM admins WHERE usuario_id = ?", (usuario_id,)).fetchone()
-        return admin is not None
-    finally:
-        conn.close()
+def obter_principal(forcar=False):
+    """
+    Principal (id, admin, assinatura) do usuário logado, guardado na sessão.
+    Só consulta o banco no login, quando o TTL expira ou após mudança na assinatura.
+    """
+    principal = st.session_state.get("principal")
+    if (forcar or principal is None or principal.nome != st.session_state.usuario_logado
+            or principal.expirado()):
+        with conexao() as conn:
+            principal = resolver_principal(conn, st.session_state.usuario_logado, ADMIN_DONO)
+        st.session_state.principal = principal
+    return principal
 
 def obter_usuario_id(nome):
     """Obtém ID do usuário pelo nome"""
-    conn = acessar_banco()
-    try:
+    with conexao() as conn:
         user = conn.execute("SELECT id FROM usuarios WHERE nome = ?", (nome,)).fetchone()
         return user[0] if user else None
-    finally:
-        conn.close()
-
-def verificar_assinatura_ativa(usuario_id):
-    """Verifica se o usuário tem assinatura ativa"""
-    conn = acessar_banco()
-    try:
-        hoje = datetime.now().date()
-        assinatura = conn.execute("""
-            SELECT data_fim, status FROM assinaturas 
-            WHERE usuario_id = ? AND status = 'ativa' AND data_fim >= ?
-            ORDER BY data_fim DESC LIMIT 1
-        """, (usuario_id, hoje)).fetchone()
-        if assinatura:
-            return True, assinatura[0]  # Retorna True e data_fim
-        return False, None
-    finally:
-        conn.close()
 
 def criar_assinatura(usuario_id, meses=1, metodo="manual"):
     """Cria uma nova assinatura"""
-    conn = acessar_banco()
     try:
-        hoje = datetime.now().date()
-        data_fim = hoje + timedelta(days=30 * meses)
-        conn.execute("""
-            INSERT INTO assinaturas (usuario_id, data_inicio, data_fim, valor_pago, status, metodo_pagamento)
-            VALUES (?, ?, ?, ?, 'ativa', ?)
-        """, (usuario_id, hoje, data_fim, VALOR_ASSINATURA * meses, metodo))
-        conn.commit()
+        with conexao() as conn:
+            hoje = datetime.now().date()
+            data_fim = hoje + timedelta(days=30 * meses)
+            conn.execute("""
+                INSERT INTO assinaturas (usuario_id, data_inicio, data_fim, valor_pago, status, metodo_pagamento)
+                VALUES (?, ?, ?, ?, 'ativa', ?)
+            """, (usuario_id, hoje, data_fim, VALOR_ASSINATURA * meses, metodo))
+        invalidar_usuario(usuario_id)
         return True
     except Exception as e:
         print(f"Erro ao criar assinatura: {e}")
         return False
-    finally:
-        conn.close()
 
 def obter_id_questao_atual():
     """Obtém o ID da questão atual no simulado"""
@@ -157,127 +124,225 @@ def obter_id_questao_atual():
     # Por enquanto, retornamos None e usamos índice
     return None
 
-def adicionar_comentario(questao_id, usuario_id, comentario):
-    """Adiciona um comentário a uma questão"""
-    conn = acessar_banco()
-    try:
-        conn.execute("""
-            INSERT INTO comentarios_questoes (questao_id, usuario_id, comentario)
-            VALUES (?, ?, ?)
-        """, (questao_id, usuario_id, comentario))
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Erro ao adicionar comentário: {e}")
-        return False
-    finally:
-        conn.close()
-
-def listar_comentarios(questao_id):
-    """Lista comentários de uma questão"""
-    conn = acessar_banco()
-    try:
-        df = pd.read_sql("""
-            SELECT c.id, u.nome, c.comentario, c.data_criacao
-            FROM comentarios_questoes c
-            JOIN usuarios u ON c.usuario_id = u.id
-            WHERE c.questao_id = ?
-            ORDER BY c.data_criacao DESC
-        """, conn, params=(questao_id,))
-        return df
-    finally:
-        conn.close()
-
 # ==============================
 # 4. DADOS POR CONCURSO / CARGO / MATÉRIA
 # ==============================
 def listar_concursos():
-    conn = acessar_banco()
     try:
-        df = pd.read_sql("SELECT id, nome FROM concursos ORDER BY nome", conn)
-        return [(int(r.id), r.nome) for _, r in df.iterrows()]
+        return obter_catalogo().concursos
     except Exception:
         return []
-    finally:
-        conn.close()
 
 def listar_cargos(concurso_id):
     if concurso_id is None:
         return [(None, "Geral")]
-    conn = acessar_banco()
-    try:
-        df = pd.read_sql(
-            "SELECT c.id, c.nome FROM cargos c WHERE c.concurso_id = ? ORDER BY c.nome",
-            conn, params=(concurso_id,)
-        )
-        return [(int(r.id), r.nome) for _, r in df.iterrows()]
-    finally:
-        conn.close()
+    return obter_catalogo().cargos.get(concurso_id, [])
 
 def listar_materias(cargo_id):
-    conn = acessar_banco()
-    try:
-        if cargo_id is None:
-            df = pd.read_sql(
-                "SELECT DISTINCT materia FROM questoes WHERE cargo_id IS NULL ORDER BY materia",
-                conn
-            )
+    """{materia: total de questões} do cargo, em ordem alfabética"""
+    return obter_catalogo().materias.get(cargo_id, {})
+
+MODOS_SELECAO = {"Uniforme": UNIFORME, "Revisão inteligente": REVISAO_INTELIGENTE, "Só inéditas": INEDITAS}
+
+def carregar_questoes(cargo_id, config, modo=UNIFORME, usuario_id=None):
+    """
+    config = {materia: qtd}. Retorna lista de tuplas
+    (id, enunciado, op_a..op_d, correta, materia, explicacao_teorica, banca, orgao, explicacao_html).
+    As questões servidas entram no cache compartilhado e no conjunto de vistas do usuário.
+    """
+    totais = listar_materias(cargo_id)
+    cache = obter_cache()
+    # Versão antes do sorteio: se uma questão for alterada no meio, a leitura não entra no cache
+    versao = cache.versao
+    with conexao() as conn:
+        if usuario_id is None:
+            questoes = amostrar_questoes(conn, cargo_id, config, totais=totais)
+        elif modo == REVISAO_INTELIGENTE:
+            questoes = selecionar_revisao(conn, usuario_id, cargo_id, config, totais=totais)
+        elif modo == INEDITAS:
+            questoes = amostrar_ineditas(conn, usuario_id, cargo_id, config, totais=totais)
         else:
-            df = pd.read_sql(
-                "SELECT DISTINCT materia FROM questoes WHERE cargo_id = ? ORDER BY materia",
-                conn, params=(cargo_id,)
-            )
-        return df["materia"].tolist()
-    finally:
-        conn.close()
-
-def carregar_questoes(cargo_id, config):
-    """config = {materia: qtd}. Retorna lista de tuplas (enunciado, op_a..op_d, correta, materia, explicacao_teorica)."""
-    todas = []
-    conn = acessar_banco()
-    for materia, qtd in config.items():
-        if cargo_id is None:
-            rows = conn.execute(
-                "SELECT id FROM questoes WHERE cargo_id IS NULL AND materia = ?",
-                (materia,)
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                "SELECT id FROM questoes WHERE cargo_id = ? AND materia = ?",
-                (cargo_id, materia)
-            ).fetchall()
-        if not rows:
-            continue
-        ids = [r[0] for r in rows]
-        escolhidos = random.sample(ids, min(qtd, len(ids)))
-        for qid in escolhidos:
-            q = conn.execute("""
-                SELECT id, enunciado, op_a, op_b, op_c, op_d, correta, materia,
-                       COALESCE(explicacao_teorica, '') AS explicacao_teorica
-                FROM questoes WHERE id = ?
-            """, (qid,)).fetchone()
-            if q:
-                todas.append(q)  # Agora inclui ID como primeiro elemento
-    conn.close()
-    random.shuffle(todas)
-    return todas
+            questoes = amostrar_questoes(conn, cargo_id, config, totais=totais)
+        if usuario_id is not None:
+            marcar_vistas(conn, usuario_id, [q[0] for q in questoes])
+    cache.guardar(questoes, versao=versao)
+    return questoes
+
+def paginas_por_chave(chave, buscar, filtros=None):
+    """
+    Paginação por chave genérica: buscar(cursor) → (registros, proximo).
+    Guarda a pilha de cursores em cursores_{chave}; quando filtros muda desde
+    a última execução, volta para a primeira página. Retorna os registros da
+    página atual.
+    """
+    if st.session_state.get(f"filtros_{chave}") != filtros:
+        st.session_state[f"filtros_{chave}"] = filtros
+        st.session_state[f"cursores_{chave}"] = [None]
+    # Pilha de cursores: o início de cada página já visitada (None = primeira)
+    cursores = st.session_state.setdefault(f"cursores_{chave}", [None])
+    registros, proximo = buscar(cursores[-1])
+    if not registros and len(cursores) == 1:
+        return registros
+    c1, c2, c3 = st.columns([1, 2, 1])
+    if len(cursores) > 1 and c1.button("← Anterior", key=f"ant_{chave}"):
+        cursores.pop()
+        st.rerun()
+    c2.caption(f"Página {len(cursores)}")
+    if proximo is not None and c3.button("Próxima →", key=f"prox_{chave}"):
+        cursores.append(proximo)
+        st.rerun()
+    return registros
+
+def busca_paginada(chave, rotulo, cargo_id=...):
+    """Campo de busca com paginação. Retorna (texto, resultados da página atual)."""
+    texto = st.text_input(rotulo, key=f"busca_{chave}", placeholder="Ex.: princípio da publicidade")
+    if not texto.strip():
+        return "", []
+
+    def buscar(pagina):
+        # O cursor da busca é o número da página (ordem por relevância)
+        pagina = pagina or 0
+        with conexao() as conn:
+            resultados, tem_mais = buscar_questoes(conn, texto, pagina, cargo_id=cargo_id)
+        return resultados, pagina + 1 if tem_mais else None
+    resultados = paginas_por_chave(f"busca_{chave}", buscar, filtros=texto)
+    if not resultados:
+        st.info("Nenhuma questão encontrada.")
+    return texto, resultados
+
+ORIGENS = {"Todas": None, "Do scraping": "scraping", "Manuais": "manual"}
+
+def listagem_paginada(chave, sem_teoria_padrao=False):
+    """Filtros + paginação por chave das questões (admin). Retorna os registros da página atual."""
+    catalogo = obter_catalogo()
+    c1, c2, c3, c4 = st.columns(4)
+    origem = c1.selectbox("Origem", list(ORIGENS), key=f"origem_{chave}")
+    materia = c2.selectbox("Matéria", ["Todas"] + catalogo.todas_materias(), key=f"materia_{chave}")
+    banca = c3.selectbox("Banca", ["Todas"] + catalogo.bancas, key=f"banca_{chave}")
+    sem_teoria = c4.checkbox("Sem conteúdo teórico", value=sem_teoria_padrao, key=f"sem_teoria_{chave}")
+    filtros = {
+        "origem": ORIGENS[origem],
+        "materia": None if materia == "Todas" else materia,
+        "banca": None if banca == "Todas" else banca,
+        "sem_teoria": sem_teoria,
+    }
+
+    def buscar(cursor):
+        with conexao() as conn:
+            return listar_questoes(conn, antes_de=cursor, **filtros)
+    return paginas_por_chave(f"lista_{chave}", buscar, filtros=filtros)
+
+def discussao_questao(questao_id):
+    """Comentários da questão, 20 por página, com o formulário para comentar"""
+    with conexao() as conn:
+        total = total_comentarios(conn, questao_id)
+    with st.expander(f"💬 Comentários ({total})"):
+        principal = st.session_state.get("principal")
+        usuario_id = principal.usuario_id if principal else None
+        if usuario_id is not None:
+            with st.form(f"form_comentario_{questao_id}", clear_on_submit=True):
+                texto = st.text_area("Seu comentário", max_chars=2000)
+                if st.form_submit_button("Comentar") and texto.strip():
+                    adicionar_comentario(questao_id, usuario_id, texto.strip())
+                    # O autor vê o próprio comentário logo em seguida
+                    esvaziar_comentarios()
+                    st.session_state.pop(f"cursores_comentarios_{questao_id}", None)
+                    st.rerun()
+        if total:
+            def buscar(cursor):
+                with conexao() as conn:
+                    return comentarios_da_questao(conn, questao_id, antes_de=cursor)
+            for c in paginas_por_chave(f"comentarios_{questao_id}", buscar):
+                st.markdown(f"**{c.usuario or 'Usuário removido'}** · {c.data_criacao}")
+                st.write(c.comentario)
+
+# ==============================
+# 4.5. CRONÔMETRO
+# ==============================
+TEMPO_POR_QUESTAO = 120  # segundos
+TEMPO_ESGOTADO = "TEMPO ESGOTADO"
+
+def tempo_restante():
+    return max(0, TEMPO_POR_QUESTAO - int(time.time() - st.session_state.t_inicio))
+
+def tempo_esgotado():
+    return time.time() - st.session_state.t_inicio >= TEMPO_POR_QUESTAO
+
+def cronometro_cliente(restante):
+    """
+    Contagem regressiva feita no navegador. Ao zerar, clica no botão
+    "Tempo esgotado" da página, que é a única chamada ao servidor.
+    """
+    components.html(f"""
+        <div id="cronometro" style="font-family: sans-serif; color: #1e3a5f;">
+            <div style="font-size: 0.85rem; color: #475569;">⏱️ Tempo</div>
+            <div id="restante" style="font-size: 2rem; font-weight: 600;">{restante}s</div>
+        </div>
+        <script>
+            const fim = Date.now() + {restante} * 1000;
+            const el = document.getElementById("restante");
+            function tique() {{
+                const r = Math.max(0, Math.ceil((fim - Date.now()) / 1000));
+                el.textContent = r + "s";
+                if (r <= 15) el.style.color = "#dc2626";
+                if (r > 0) {{ setTimeout(tique, 250); return; }}
+                for (const b of window.parent.document.querySelectorAll("button")) {{
+                    if (b.innerText.includes("Tempo esgotado")) {{ b.click(); break; }}
+                }}
+            }}
+            tique();
+        </script>
+    """, height=80)
+
+def salvar_resposta(questao_id, alternativa, correta):
+    """Registra a resposta no histórico do usuário (em segundo plano, sem esperar o disco)"""
+    principal = st.session_state.get("principal")
+    usuario_id = principal.usuario_id if principal else None
+    if usuario_id is None or st.session_state.simulado_id is None:
+        return
+    registrar_resposta(usuario_id, questao_id, st.session_state.simulado_id, alternativa,
+                       alternativa == correta, round(time.time() - st.session_state.t_inicio, 1))
+
+# Respostas do simulado na sessão: um byte por questão (0 = ainda sem resposta)
+CODIGO_ESGOTADO = 1
+
+def resposta(indice):
+    """Letra respondida, TEMPO_ESGOTADO ou None"""
+    codigo = st.session_state.respostas[indice]
+    if codigo == 0:
+        return None
+    return TEMPO_ESGOTADO if codigo == CODIGO_ESGOTADO else chr(codigo)
+
+def responder(indice, letra):
+    st.session_state.respostas[indice] = CODIGO_ESGOTADO if letra == TEMPO_ESGOTADO else ord(letra)
+
+def iniciar_simulado(questoes):
+    """A sessão guarda só os ids e as respostas; os textos ficam no cache compartilhado"""
+    st.session_state.ids_questoes = array("q", (q[0] for q in questoes))
+    st.session_state.respostas = bytearray(len(questoes))
+    st.session_state.indice_atual = 0
+    st.session_state.simulado_id = novo_simulado_id()
+    st.session_state.simulado_ativo = True
+    st.session_state.resultado_final = None
 
 # ==============================
 # 5. SESSION STATE
 # ==============================
 for k, v in {
     "usuario_logado": None,
-    "historico_respostas": {},
+    "respostas": bytearray(),
     "indice_atual": 0,
     "simulado_ativo": False,
     "modo_revisao": False,
-    "questoes": [],
+    "ids_questoes": array("q"),
     "resultado_final": None,
+    "simulado_id": None,
     "concurso_selecionado": None,
     "concurso_nome": "",
     "cargo_selecionado": None,
     "cargo_nome": "",
     "modo_admin": False,
+    "principal": None,
 }.items():
     if k not in st.session_state:
         st.session_state[k] = v
@@ -295,14 +360,16 @@ with st.sidebar:
             u = st.text_input("Usuário", key="user")
             s = st.text_input("Senha", type="password", key="pass")
             if st.button("Fazer Login", use_container_width=True):
-                conn = acessar_banco()
-                user = conn.execute(
-                    "SELECT nome FROM usuarios WHERE nome=? AND senha=?",
-                    (u, hash_senha(s))
-                ).fetchone()
-                conn.close()
+                with conexao() as conn:
+                    user = conn.execute(
+                        "SELECT nome FROM usuarios WHERE nome=? AND senha=?",
+                        (u, hash_senha(s))
+                    ).fetchone()
                 if user:
                     st.session_state.usuario_logado = user[0]
+                    principal = obter_principal(forcar=True)
+                    with conexao() as conn:
+                        garantir_admin_dono(conn, principal, ADMIN_DONO)
                     st.rerun()
                 else:
                     st.error("Usuário ou senha incorretos")
@@ -311,24 +378,22 @@ with st.sidebar:
             ns = st.text_input("Nova Senha", type="password", key="new_pass")
             if st.button("Cadastrar", use_container_width=True):
                 if nu and ns:
-                    conn = acessar_banco()
                     try:
-                        conn.execute(
-                            "INSERT INTO usuarios (nome, senha) VALUES (?,?)",
-                            (nu, hash_senha(ns))
-                        )
-                        conn.commit()
+                        with conexao() as conn:
+                            conn.execute(
+                                "INSERT INTO usuarios (nome, senha) VALUES (?,?)",
+                                (nu, hash_senha(ns))
+                            )
                         st.success("Conta criada! Faça login para continuar.")
                     except sqlite3.IntegrityError:
                         st.error("Usuário já existe.")
-                    conn.close()
     else:
         st.success(f"**{st.session_state.usuario_logado}**")
-        usuario_id = obter_usuario_id(st.session_state.usuario_logado)
-        is_admin = usuario_id and eh_admin(usuario_id, st.session_state.usuario_logado)
+        principal = obter_principal()
+        is_admin = principal.admin
         
         # Verifica assinatura
-        tem_assinatura, data_fim = verificar_assinatura_ativa(usuario_id) if usuario_id else (False, None)
+        tem_assinatura, data_fim = principal.assinatura_ativa, principal.assinatura_fim
         
         st.markdown("---")
         if is_admin:
@@ -362,13 +427,13 @@ if st.session_state.usuario_logado is None:
 # ==============================
 # 7.3. VERIFICAÇÃO DE ASSINATURA
 # ==============================
-usuario_id = obter_usuario_id(st.session_state.usuario_logado) if st.session_state.usuario_logado else None
-is_admin = usuario_id and eh_admin(usuario_id, st.session_state.usuario_logado)
+principal = obter_principal()
+usuario_id = principal.usuario_id
+is_admin = principal.admin
 
 # Bloqueia acesso se não for admin e não tiver assinatura
 if usuario_id and not is_admin:
-    tem_assinatura, data_fim = verificar_assinatura_ativa(usuario_id)
-    if not tem_assinatura:
+    if not principal.assinatura_ativa:
         # Mostra tela de assinatura
         if not st.session_state.get("modo_assinatura", False):
             st.markdown("# 💳 Assinatura Necessária")
@@ -444,47 +509,46 @@ if pode_acessar_admin:
     
     with tab1:
         st.markdown("### Adicionar/Editar Conteúdo Teórico")
-        conn = acessar_banco()
-        
-        # Buscar questões sem conteúdo teórico ou para editar
-        df = pd.read_sql("""
-            SELECT id, enunciado, materia, banca, orgao, 
-                   COALESCE(explicacao_teorica, '') AS explicacao_teorica
-            FROM questoes
-            ORDER BY id DESC
-            LIMIT 100
-        """, conn)
-        conn.close()
+        # Buscar questões por texto ou navegar pela listagem paginada
+        texto_busca, resultados = busca_paginada("teoria", "🔎 Buscar questão")
+        if texto_busca:
+            opcoes = {qid: trecho for qid, _, _, trecho in resultados}
+        else:
+            opcoes = {q.id: q.previa for q in listagem_paginada("teoria", sem_teoria_padrao=True)}
         
-        if len(df) > 0:
+        if opcoes:
             questao_id = st.selectbox(
                 "Selecione a questão",
-                options=df['id'].tolist(),
-                format_func=lambda x: f"ID {x}: {df[df['id']==x]['enunciado'].iloc[0][:80]}..."
+                options=list(opcoes),
+                format_func=lambda x: f"ID {x}: {opcoes[x]}"
             )
             
-            questao_selecionada = df[df['id'] == questao_id].iloc[0]
+            # (id, enunciado, op_a..op_d, correta, materia, explicacao_teorica, banca, orgao, explicacao_html)
+            q = questoes_por_id([questao_id])[0]
             
             st.markdown("**Enunciado:**")
-            st.write(questao_selecionada['enunciado'])
-            st.markdown(f"**Matéria:** {questao_selecionada['materia']} | **Banca:** {questao_selecionada.get('banca', 'N/A')} | **Órgão:** {questao_selecionada.get('orgao', 'N/A')}")
+            st.write(q[1])
+            st.markdown(f"**Matéria:** {q[7]} | **Banca:** {q[9] or 'N/A'} | **Órgão:** {q[10] or 'N/A'}")
             
-            explicacao_atual = questao_selecionada['explicacao_teorica'] if questao_selecionada['explicacao_teorica'] else ""
+            explicacao_atual = q[8]
             nova_explicacao = st.text_area(
                 "Conteúdo Teórico",
                 value=explicacao_atual,
                 height=200,
-                help="Digite a explicação teórica sobre esta questão. Use **negrito** para destacar conceitos importantes."
+                help="Markdown: **negrito**, *itálico*, `código`, [link](https://...), "
+                     "# título, listas com - ou 1. e linha em branco entre parágrafos."
             )
+            with st.expander("👁️ Pré-visualização"):
+                st.markdown(f'<div class="teoria-box">{renderizar(nova_explicacao)}</div>', unsafe_allow_html=True)
             
             if st.button("💾 Salvar Conteúdo Teórico", type="primary"):
-                conn = acessar_banco()
-                conn.execute(
-                    "UPDATE questoes SET explicacao_teorica = ? WHERE id = ?",
-                    (nova_explicacao, questao_id)
-                )
-                conn.commit()
-                conn.close()
+                # O HTML é gerado aqui, uma vez, e servido pronto na revisão
+                with conexao() as conn:
+                    conn.execute(
+                        "UPDATE questoes SET explicacao_teorica = ?, explicacao_html = ? WHERE id = ?",
+                        (nova_explicacao, renderizar(nova_explicacao), questao_id)
+                    )
+                    invalidar_questoes(conn, [questao_id])
                 st.success("Conteúdo teórico salvo com sucesso!")
                 st.rerun()
         else:
@@ -492,52 +556,68 @@ if pode_acessar_admin:
     
     with tab2:
         st.markdown("### Gerenciar Questões")
-        conn = acessar_banco()
         
         # Estatísticas
-        stats = pd.read_sql("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN explicacao_teorica IS NULL OR explicacao_teorica = '' THEN 1 ELSE 0 END) as sem_teoria,
-                SUM(CASE WHEN origem = 'scraping' THEN 1 ELSE 0 END) as do_scraping,
-                SUM(CASE WHEN origem = 'manual' THEN 1 ELSE 0 END) as manuais
-            FROM questoes
-        """, conn)
+        with conexao() as conn:
+            stats = consultar_um(conn, """
+                SELECT 
+                    COUNT(*) as total,
+                    COALESCE(SUM(CASE WHEN explicacao_teorica IS NULL OR explicacao_teorica = '' THEN 1 ELSE 0 END), 0) as sem_teoria,
+                    COALESCE(SUM(CASE WHEN origem = 'scraping' THEN 1 ELSE 0 END), 0) as do_scraping,
+                    COALESCE(SUM(CASE WHEN origem = 'manual' THEN 1 ELSE 0 END), 0) as manuais
+                FROM questoes
+            """)
         
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total", int(stats['total'].iloc[0]))
-        col2.metric("Sem Teoria", int(stats['sem_teoria'].iloc[0]))
-        col3.metric("Do Scraping", int(stats['do_scraping'].iloc[0]))
-        col4.metric("Manuais", int(stats['manuais'].iloc[0]))
+        col1.metric("Total", stats.total)
+        col2.metric("Sem Teoria", stats.sem_teoria)
+        col3.metric("Do Scraping", stats.do_scraping)
+        col4.metric("Manuais", stats.manuais)
         
         # Buscar questões
-        filtro = st.selectbox("Filtrar", ["Todas", "Sem conteúdo teórico", "Do scraping", "Manuais"])
-        query = "SELECT id, enunciado, materia, banca, orgao, origem FROM questoes"
-        if filtro == "Sem conteúdo teórico":
-            query += " WHERE explicacao_teorica IS NULL OR explicacao_teorica = ''"
-        elif filtro == "Do scraping":
-            query += " WHERE origem = 'scraping'"
-        elif filtro == "Manuais":
-            query += " WHERE origem = 'manual'"
-        query += " ORDER BY id DESC LIMIT 50"
-        
-        df_questoes = pd.read_sql(query, conn)
-        conn.close()
+        texto_busca, resultados = busca_paginada("gerenciar", "🔎 Buscar por texto")
+        if texto_busca:
+            ids = [r[0] for r in resultados]
+            with conexao() as conn:
+                lista_questoes = consultar(conn, """
+                    SELECT id, substr(enunciado, 1, ?) AS previa, materia, banca, orgao, origem FROM questoes
+                    WHERE id IN (SELECT value FROM json_each(?))
+                """, (TAMANHO_PREVIA, json.dumps(ids)))
+            lista_questoes.sort(key=lambda q: ids.index(q.id))
+        else:
+            lista_questoes = listagem_paginada("gerenciar")
         
-        if len(df_questoes) > 0:
-            st.dataframe(df_questoes, use_container_width=True)
+        if lista_questoes:
+            st.dataframe(como_dicts(lista_questoes), use_container_width=True)
             
-            questao_para_deletar = st.selectbox("Deletar questão (ID)", df_questoes['id'].tolist())
+            questao_para_deletar = st.selectbox("Deletar questão (ID)", [q.id for q in lista_questoes])
             if st.button("🗑️ Deletar Questão", type="primary"):
-                conn = acessar_banco()
-                conn.execute("DELETE FROM questoes WHERE id = ?", (questao_para_deletar,))
-                conn.commit()
-                conn.close()
+                with conexao() as conn:
+                    conn.execute("DELETE FROM questoes WHERE id = ?", (questao_para_deletar,))
+                    invalidar_catalogo(conn)
+                    invalidar_questoes(conn, [questao_para_deletar])
                 st.success(f"Questão {questao_para_deletar} deletada!")
                 st.rerun()
         else:
             st.info("Nenhuma questão encontrada com este filtro.")
-    
+
+        with st.expander("📈 Conexões com o banco"):
+            est = estatisticas_conexoes()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Conexões abertas", est["aberturas"])
+            col2.metric("Empréstimos", est["emprestimos"])
+            col3.metric("Reusos", est["reusos"])
+            if est["conexoes"]:
+                st.dataframe(est["conexoes"], use_container_width=True)
+
+        with st.expander("🗃️ Cache de questões"):
+            est = obter_cache().estatisticas()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Questões", est["questoes"])
+            col2.metric("Memória", f"{est['bytes'] / 2**20:.1f} / {est['orcamento'] / 2**20:.0f} MB")
+            col3.metric("Acertos", f"{est['taxa_acerto']:.0%}", f"{est['acertos']} / {est['acertos'] + est['faltas']}")
+            col4.metric("Despejos", est["despejos"], f"{est['invalidacoes']} invalidações", delta_color="off")
+
     with tab3:
         st.markdown("### Sistema de Scraping")
         st.info("Use o script **scraper_questoes.py** para coletar questões automaticamente.")
@@ -555,11 +635,12 @@ if pode_acessar_admin:
             cargos = listar_cargos(conc_id)
             todos_cargos.extend([(c[0], f"{conc_nome} - {c[1]}") for c in cargos])
         todos_cargos.insert(0, (None, "Nenhum"))
+        nomes_cargos = dict(todos_cargos)
         
         cargo_id_scraping = st.selectbox(
             "Cargo (opcional)",
-            options=[c[0] for c in todos_cargos],
-            format_func=lambda x: next(c[1] for c in todos_cargos if c[0] == x)
+            options=list(nomes_cargos),
+            format_func=nomes_cargos.get
         )
         
         if st.button("🕷️ Executar Scraping", type="primary"):
@@ -577,7 +658,20 @@ if pode_acessar_admin:
         
         st.markdown("---")
         st.markdown("#### Limpeza de Duplicatas")
-        if st.button("🧹 Remover Questões Manuais Duplicadas"):
+        col_simular, col_remover = st.columns(2)
+        if col_simular.button("🔎 Simular Limpeza"):
+            from scraper_questoes import ScraperQuestoes
+            scraper = ScraperQuestoes()
+            scraper.marcar_questoes_manuais_para_remocao()
+            relatorio = scraper.remover_duplicatas_manuais(simular=True)
+            st.info(f"{relatorio.grupos} grupos de duplicatas | {relatorio.removidas} questões manuais seriam removidas")
+            if relatorio.exemplos:
+                st.dataframe(
+                    [{"hash": h, "mantém": sobrevivente, "remove": ", ".join(map(str, ids))}
+                     for h, sobrevivente, ids in relatorio.exemplos],
+                    use_container_width=True
+                )
+        if col_remover.button("🧹 Remover Questões Manuais Duplicadas"):
             from scraper_questoes import ScraperQuestoes
             scraper = ScraperQuestoes()
             scraper.marcar_questoes_manuais_para_remocao()
@@ -588,25 +682,19 @@ if pode_acessar_admin:
     with tab4:
         st.markdown("### 💳 Gerenciar Assinaturas")
         
-        # Estatísticas
-        conn = acessar_banco()
-        stats = pd.read_sql("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'ativa' AND data_fim >= date('now') THEN 1 ELSE 0 END) as ativas,
-                SUM(CASE WHEN status = 'ativa' AND data_fim < date('now') THEN 1 ELSE 0 END) as expiradas
-            FROM assinaturas
-        """, conn)
+        # Estatísticas pelos contadores (a varredura roda em segundo plano)
+        with conexao() as conn:
+            stats = contagem_assinaturas(conn)
+            usuarios = consultar(conn, "SELECT id, nome FROM usuarios")
         
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total", int(stats['total'].iloc[0]))
-        col2.metric("Ativas", int(stats['ativas'].iloc[0]))
-        col3.metric("Expiradas", int(stats['expiradas'].iloc[0]))
+        col1.metric("Total", stats["total"])
+        col2.metric("Ativas", stats["ativa"])
+        col3.metric("Expiradas", stats["expirada"])
         
         st.markdown("---")
         st.markdown("#### Ativar Assinatura Manualmente")
-        usuarios_df = pd.read_sql("SELECT id, nome FROM usuarios", conn)
-        usuario_assinatura = st.selectbox("Usuário", usuarios_df['nome'].tolist())
+        usuario_assinatura = st.selectbox("Usuário", [u.nome for u in usuarios])
         meses_assinatura = st.number_input("Meses", 1, 12, 1)
         
         if st.button("✅ Ativar Assinatura", type="primary"):
@@ -619,44 +707,41 @@ if pode_acessar_admin:
         
         st.markdown("---")
         st.markdown("#### Lista de Assinaturas")
-        assinaturas_df = pd.read_sql("""
-            SELECT a.id, u.nome, a.data_inicio, a.data_fim, a.valor_pago, a.status, a.metodo_pagamento
-            FROM assinaturas a
-            JOIN usuarios u ON a.usuario_id = u.id
-            ORDER BY a.data_fim DESC
-        """, conn)
-        conn.close()
+        with conexao() as conn:
+            lista_assinaturas = consultar(conn, """
+                SELECT a.id, u.nome, a.data_inicio, a.data_fim, a.valor_pago, a.status, a.metodo_pagamento
+                FROM assinaturas a
+                JOIN usuarios u ON a.usuario_id = u.id
+                ORDER BY a.data_fim DESC
+            """)
         
-        if len(assinaturas_df) > 0:
-            st.dataframe(assinaturas_df, use_container_width=True)
+        if lista_assinaturas:
+            st.dataframe(como_dicts(lista_assinaturas), use_container_width=True)
         else:
             st.info("Nenhuma assinatura cadastrada.")
     
     with tab5:
         st.markdown("### 💬 Gerenciar Comentários")
         
-        conn = acessar_banco()
-        comentarios_df = pd.read_sql("""
-            SELECT c.id, c.questao_id, q.enunciado, u.nome as usuario, c.comentario, c.data_criacao
-            FROM comentarios_questoes c
-            JOIN questoes q ON c.questao_id = q.id
-            JOIN usuarios u ON c.usuario_id = u.id
-            ORDER BY c.data_criacao DESC
-            LIMIT 50
-        """, conn)
-        conn.close()
+        def buscar(cursor):
+            with conexao() as conn:
+                return comentarios_recentes(conn, antes_de=cursor)
+        comentarios = paginas_por_chave("comentarios_admin", buscar)
         
-        if len(comentarios_df) > 0:
-            for idx, row in comentarios_df.iterrows():
-                with st.expander(f"Questão {row['questao_id']} - {row['usuario']} ({row['data_criacao']})"):
-                    st.write(f"**Enunciado:** {row['enunciado'][:100]}...")
-                    st.write(f"**Comentário:** {row['comentario']}")
-                    if st.button(f"🗑️ Deletar", key=f"del_com_{row['id']}"):
-                        conn = acessar_banco()
-                        conn.execute("DELETE FROM comentarios_questoes WHERE id = ?", (row['id'],))
-                        conn.commit()
-                        conn.close()
-                        st.rerun()
+        if comentarios:
+            # Enunciados pelo cache compartilhado em vez de um JOIN com questoes
+            enunciados = {q[0]: q[1] for q in questoes_por_id(list({r.questao_id for r in comentarios}))}
+            st.dataframe([{
+                "id": r.id, "questao_id": r.questao_id,
+                "enunciado": enunciados.get(r.questao_id, "(questão removida)")[:100],
+                "usuario": r.usuario, "comentario": r.comentario, "data_criacao": r.data_criacao,
+            } for r in comentarios], use_container_width=True)
+            
+            comentario_para_deletar = st.selectbox("Deletar comentário (ID)", [r.id for r in comentarios])
+            if st.button("🗑️ Deletar comentário"):
+                with conexao() as conn:
+                    remover_comentario(conn, comentario_para_deletar)
+                st.rerun()
         else:
             st.info("Nenhum comentário cadastrado.")
     
@@ -701,18 +786,33 @@ if not st.session_state.simulado_ativo and not st.session_state.modo_revisao:
     st.markdown("### 3️⃣ Matérias e quantidade de questões")
     config = {}
     with st.expander("Selecione as matérias e a quantidade por uma", expanded=True):
-        for mat in materias:
+        for mat, total in materias.items():
             c1, c2 = st.columns([3, 1])
-            if c1.checkbox(mat, key=f"check_{cargo_id}_{mat}"):
-                config[mat] = c2.number_input("Qtd", 1, 100, 5, key=f"num_{cargo_id}_{mat}")
+            if c1.checkbox(f"{mat} ({total})", key=f"check_{cargo_id}_{mat}"):
+                config[mat] = c2.number_input("Qtd", 1, min(100, total), min(5, total), key=f"num_{cargo_id}_{mat}")
+
+    modo = st.radio("Seleção das questões", list(MODOS_SELECAO), horizontal=True, key="sel_modo",
+                    help="Revisão inteligente traz primeiro as questões que você errou ou "
+                         "não vê há mais tempo, e completa com questões inéditas. "
+                         "Só inéditas nunca repete uma questão que já apareceu para você.")
+    if MODOS_SELECAO[modo] == INEDITAS and principal:
+        with conexao() as conn:
+            vistas = total_vistas(conn, principal.usuario_id)
+        c1, c2 = st.columns([3, 1])
+        c1.caption(f"Você já viu {vistas} questões.")
+        if vistas and c2.button("🔄 Zerar vistas"):
+            with conexao() as conn:
+                limpar_vistas(conn, principal.usuario_id)
+            st.rerun()
 
     if st.button("🚀 Iniciar simulado", type="primary", use_container_width=True):
         if config:
-            st.session_state.questoes = carregar_questoes(cargo_id, config)
-            st.session_state.indice_atual = 0
-            st.session_state.historico_respostas = {}
-            st.session_state.simulado_ativo = True
-            st.session_state.resultado_final = None
+            questoes = carregar_questoes(
+                cargo_id, config, MODOS_SELECAO[modo], principal.usuario_id if principal else None)
+            if not questoes:
+                st.error("Não há questões inéditas nestas matérias. Zere as vistas ou escolha outras matérias.")
+                st.stop()
+            iniciar_simulado(questoes)
             st.session_state.concurso_selecionado = concurso_id
             st.session_state.concurso_nome = concurso_escolhido
             st.session_state.cargo_selecionado = cargo_id
@@ -721,22 +821,64 @@ if not st.session_state.simulado_ativo and not st.session_state.modo_revisao:
         else:
             st.error("Selecione ao menos uma matéria.")
 
+    # Alternativa: buscar questões do cargo por texto e responder as encontradas
+    with st.expander("🔎 Buscar questões por texto"):
+        texto_busca, resultados = busca_paginada("menu", "Palavras do enunciado, alternativas ou teoria", cargo_id=cargo_id)
+        for qid, mat, _, trecho in resultados:
+            st.markdown(f"**{mat}** · {trecho}")
+        if resultados and st.button("📝 Responder as questões desta página", use_container_width=True):
+            ids = [r[0] for r in resultados]
+            with conexao() as conn:
+                questoes = obter_cache().obter(conn, ids)
+                if principal:
+                    marcar_vistas(conn, principal.usuario_id, ids)
+            iniciar_simulado(questoes)
+            st.session_state.concurso_selecionado = concurso_id
+            st.session_state.concurso_nome = concurso_escolhido
+            st.session_state.cargo_selecionado = cargo_id
+            st.session_state.cargo_nome = f"{cargo_escolhido} → Busca: {texto_busca}"
+            st.rerun()
+
+    # Painel de desempenho: lê só os agregados da tabela desempenho
+    with st.expander("📈 Meu desempenho neste cargo"):
+        principal = st.session_state.get("principal")
+        with conexao() as conn:
+            estatisticas = desempenho_usuario(conn, principal.usuario_id, cargo_id) if principal else []
+        if estatisticas:
+            tentativas = sum(e.tentativas for e in estatisticas)
+            acertos = sum(e.acertos for e in estatisticas)
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Questões respondidas", tentativas)
+            c2.metric("Acertos", acertos)
+            c3.metric("Aproveitamento", f"{100 * acertos / tentativas:.0f}%")
+            st.dataframe([{
+                "Matéria": e.materia,
+                "Respondidas": e.tentativas,
+                "Acertos": e.acertos,
+                "Aproveitamento (%)": e.percentual,
+                "Tempo médio (s)": e.tempo_medio,
+                "Última resposta": e.ultima_resposta,
+            } for e in estatisticas], use_container_width=True)
+        else:
+            st.info("Responda um simulado deste cargo para ver suas estatísticas.")
+
 # ==============================
 # 9. TELA DE SIMULADO / REVISÃO
 # ==============================
 else:
-    if not st.session_state.questoes:
+    if not st.session_state.ids_questoes:
         st.session_state.simulado_ativo = False
         st.session_state.modo_revisao = False
-        st.session_state.questoes = []
         st.rerun()
 
-    if not st.session_state.modo_revisao:
-        st_autorefresh(interval=1000, key="timer")
-
-    # Cada questão: (id, enunciado, op_a, op_b, op_c, op_d, correta, materia, explicacao_teorica)
-    q = st.session_state.questoes[st.session_state.indice_atual]
-    questao_id = q[0]  # ID da questão
+    # Só a questão atual é lida (do cache compartilhado):
+    # (id, enunciado, op_a, op_b, op_c, op_d, correta, materia, explicacao_teorica, banca, orgao, explicacao_html)
+    questao_id = st.session_state.ids_questoes[st.session_state.indice_atual]
+    encontrada = questoes_por_id([questao_id])
+    if not encontrada:
+        st.warning("Esta questão foi removida do banco.")
+        encontrada = [(questao_id, "(questão removida)", "", "", "", "", None, "", "")]
+    q = encontrada[0]
     enunciado, op_a, op_b, op_c, op_d, correta, materia, explicacao_teorica = q[1], q[2], q[3], q[4], q[5], q[6], q[7], q[8] if len(q) > 8 else ""
 
     # Breadcrumb e cabeçalho
@@ -747,9 +889,17 @@ else:
         if "t_inicio" not in st.session_state or st.session_state.indice_atual != st.session_state.get("last"):
             st.session_state.t_inicio = time.time()
             st.session_state.last = st.session_state.indice_atual
-        tempo = max(0, 120 - int(time.time() - st.session_state.t_inicio))
-        c2.metric("⏱️ Tempo", f"{tempo}s")
-    c2.metric("Questão", f"{st.session_state.indice_atual + 1} / {len(st.session_state.questoes)}")
+        if resposta(st.session_state.indice_atual) is None:
+            # O navegador faz a contagem e clica neste botão (oculto) ao zerar;
+            # o prazo é conferido aqui pelo relógio do servidor
+            st.button("⏰ Tempo esgotado", key="tempo_esgotado")
+            if tempo_esgotado():
+                responder(st.session_state.indice_atual, TEMPO_ESGOTADO)
+                salvar_resposta(questao_id, None, correta)
+                st.rerun()
+            with c2:
+                cronometro_cliente(tempo_restante())
+    c2.metric("Questão", f"{st.session_state.indice_atual + 1} / {len(st.session_state.ids_questoes)}")
     if c3.button("🏠 Voltar ao menu"):
         st.session_state.simulado_ativo = False
         st.session_state.modo_revisao = False
@@ -760,7 +910,7 @@ else:
     st.markdown(f"**Matéria:** {materia}")
     st.markdown(f"### {enunciado}")
 
-    resp = st.session_state.historico_respostas.get(st.session_state.indice_atual)
+    resp = resposta(st.session_state.indice_atual)
     opcoes = {"A": op_a, "B": op_b, "C": op_c, "D": op_d}
 
     for letra, texto in opcoes.items():
@@ -780,19 +930,25 @@ else:
                 type="primary" if is_selected else "secondary"
             ):
                 if resp is None:
-                    st.session_state.historico_respostas[st.session_state.indice_atual] = letra
+                    # O prazo vale pelo relógio do servidor, não pelo do navegador
+                    esgotado = tempo_esgotado()
+                    responder(st.session_state.indice_atual, TEMPO_ESGOTADO if esgotado else letra)
+                    salvar_resposta(questao_id, None if esgotado else letra, correta)
                     st.rerun()
 
+    if st.session_state.modo_revisao and resp == TEMPO_ESGOTADO:
+        st.warning("⏰ O tempo acabou antes de você responder esta questão.")
+
     # Conteúdo teórico (só no modo revisão)
     if st.session_state.modo_revisao:
         st.markdown("---")
         st.markdown("#### 📚 Conteúdo teórico")
         if explicacao_teorica and explicacao_teorica.strip():
-            html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', explicacao_teorica)
-            html = html.replace('\n', '<br>')
+            html = html_teoria(explicacao_teorica, q[11] if len(q) > 11 else None)
             st.markdown(f'<div class="teoria-box"><h4>💡 Aprenda com esta questão</h4><div>{html}</div></div>', unsafe_allow_html=True)
         else:
             st.info("Não há explicação teórica cadastrada para esta questão. Estude a matéria **" + materia + "** para aprofundar.")
+        discussao_questao(questao_id)
 
     # Navegação
     st.markdown("---")
@@ -801,16 +957,18 @@ else:
         if col_prev.button("⬅️ Anterior", use_container_width=True):
             st.session_state.indice_atual -= 1
             st.rerun()
-    if st.session_state.indice_atual < len(st.session_state.questoes) - 1:
+    if st.session_state.indice_atual < len(st.session_state.ids_questoes) - 1:
         if col_next.button("Próxima ➡️", use_container_width=True):
             st.session_state.indice_atual += 1
             st.rerun()
     else:
         if not st.session_state.modo_revisao:
             if col_next.button("📊 Finalizar simulado", use_container_width=True, type="primary"):
-                acertos = sum(1 for i, r in st.session_state.historico_respostas.items()
-                             if r == st.session_state.questoes[i][6])  # Correta agora está em índice 6
-                total = len(st.session_state.questoes)
+                finalizar_simulado()
+                corretas = {q[0]: q[6] for q in questoes_por_id(st.session_state.ids_questoes)}
+                acertos = sum(1 for i, qid in enumerate(st.session_state.ids_questoes)
+                              if resposta(i) is not None and resposta(i) == corretas.get(qid))
+                total = len(st.session_state.ids_questoes)
                 st.session_state.resultado_final = (acertos, total)
                 st.session_state.modo_revisao = True
                 st.session_state.simulado_ativo = False
@@ -0,0 +1,125 @@
+"""
+Expiração das assinaturas e consultas do login e do painel
+A varredura marca como 'expirada', em lotes, as assinaturas 'ativa' cujo
+data_fim já passou: lê só esse intervalo de idx_assinaturas_vencimento, então
+o custo é o das assinaturas que venceram desde a última passada. Depois dela,
+status = 'ativa' volta a significar ativa e ninguém precisa rederivar a
+expiração pela data.
+
+Mantidos por gatilhos (migração 14):
+  - assinatura_atual: fim da assinatura ativa mais longa de cada usuário, lido
+    pela chave no login (fim_assinatura);
+  - contadores 'assinaturas_<status>': o painel lê as métricas sem varrer a
+    tabela (contagem_assinaturas), descontando as vencidas desde a última
+    varredura.
+
+O app web roda a varredura em uma thread de fundo (iniciar_varredura); sem
+ele, agende o comando abaixo (cron/agendador de tarefas) uma vez por dia.
+
+Execute: python assinaturas.py --varrer
+"""
+import sys
+import threading
+from datetime import date
+
+from conexao import conexao, CAMINHO_BANCO
+
+ATIVA = "ativa"
+EXPIRADA = "expirada"
+LOTE_VARREDURA = 5_000   # assinaturas por transação: não segura a escrita por muito tempo
+INTERVALO_VARREDURA = 3600  # segundos entre varreduras da thread de fundo
+
+
+def _hoje():
+    # Mesmo formato de data_fim gravado por criar_assinatura (data local)
+    return date.today().isoformat()
+
+
+def fim_assinatura(conn, usuario_id, hoje=None):
+    """data_fim da assinatura ativa do usuário, ou None"""
+    linha = conn.execute("SELECT data_fim FROM assinatura_atual WHERE usuario_id = ? AND data_fim >= ?",
+                         (usuario_id, hoje or _hoje())).fetchone()
+    return linha[0] if linha else None
+
+
+def contagem_assinaturas(conn, hoje=None):
+    """
+    {status: quantidade}, com 'total'. As 'ativa' já vencidas que a
+    varredura ainda não alcançou contam como 'expirada' (leitura de um
+    intervalo de idx_assinaturas_vencimento, sem escrever).
+    """
+    contagem = {nome[len("assinaturas_"):]: valor for nome, valor in conn.execute(
+        "SELECT nome, valor FROM contadores WHERE nome LIKE 'assinaturas\\_%' ESCAPE '\\'")}
+    contagem.setdefault(ATIVA, 0)
+    contagem.setdefault(EXPIRADA, 0)
+    pendentes = conn.execute("SELECT COUNT(*) FROM assinaturas WHERE status = ? AND data_fim < ?",
+                             (ATIVA, hoje or _hoje())).fetchone()[0]
+    contagem[ATIVA] -= pendentes
+    contagem[EXPIRADA] += pendentes
+    contagem["total"] = sum(contagem.values())
+    return contagem
+
+
+def varrer_expiradas(caminho=None, hoje=None, lote=LOTE_VARREDURA):
+    """Marca como expiradas as assinaturas ativas vencidas. Retorna quantas."""
+    hoje = hoje or _hoje()
+    total = 0
+    while True:
+        # Uma transação por lote: logins e pagamentos não esperam a varredura inteira
+        with conexao(caminho) as conn:
+            alteradas = conn.execute("""
+                UPDATE assinaturas SET status = ?
+                WHERE id IN (SELECT id FROM assinaturas WHERE status = ? AND data_fim < ? LIMIT ?)
+            """, (EXPIRADA, ATIVA, hoje, lote)).rowcount
+        total += alteradas
+        if alteradas < lote:
+            return total
+
+
+class Varredura:
+    """Thread de fundo que roda varrer_expiradas a cada intervalo segundos"""
+
+    def __init__(self, caminho=None, intervalo=INTERVALO_VARREDURA):
+        self.caminho = caminho or CAMINHO_BANCO
+        self.intervalo = intervalo
+        self.expiradas = 0
+        self.erros = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="varredura-assinaturas", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=10.0):
+        self._parar.set()
+        self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self.expiradas += varrer_expiradas(self.caminho)
+            except Exception as e:
+                print(f"✗ Erro na varredura de assinaturas: {e}")
+                self.erros += 1
+            self._parar.wait(self.intervalo)
+
+
+# {caminho do banco: Varredura} — uma por processo
+_varreduras = {}
+_trava = threading.Lock()
+
+
+def iniciar_varredura(caminho=None, intervalo=INTERVALO_VARREDURA):
+    """Inicia (uma vez por processo e banco) a varredura em segundo plano"""
+    caminho = caminho or CAMINHO_BANCO
+    with _trava:
+        varredura = _varreduras.get(caminho)
+        if varredura is None:
+            varredura = _varreduras[caminho] = Varredura(caminho, intervalo)
+        return varredura
+
+
+if __name__ == "__main__":
+    if "--varrer" in sys.argv:
+        total = varrer_expiradas()
+        print(f"Assinaturas expiradas: {total}")
+    else:
+        print(__doc__)
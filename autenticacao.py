@@ -0,0 +1,70 @@
+"""
+Identidade do usuário logado (principal) no app web
+Resolvida uma única vez no login e mantida em memória na sessão. Só volta ao
+banco quando o TTL expira ou quando a assinatura do usuário muda.
+"""
+import threading
+import time
+from datetime import datetime
+
+from assinaturas import fim_assinatura
+
+# Tempo máximo (segundos) que um principal fica em memória sem reconsultar o banco
+TTL_PRINCIPAL = 300
+
+# Versão por usuário, incrementada quando algo que afeta o principal muda
+# (ex.: assinatura criada). Compartilhada por todas as sessões do processo.
+_versoes = {}
+_trava = threading.Lock()
+
+
+def invalidar_usuario(usuario_id):
+    """Força as sessões do usuário a recarregar o principal no próximo acesso"""
+    with _trava:
+        _versoes[usuario_id] = _versoes.get(usuario_id, 0) + 1
+
+
+def _versao(usuario_id):
+    return _versoes.get(usuario_id, 0)
+
+
+class Principal:
+    """Usuário logado: id, se é admin e fim da assinatura ativa"""
+    __slots__ = ("nome", "usuario_id", "admin", "assinatura_fim", "resolvido_em", "versao")
+
+    def __init__(self, nome, usuario_id, admin, assinatura_fim):
+        self.nome = nome
+        self.usuario_id = usuario_id
+        self.admin = admin
+        self.assinatura_fim = assinatura_fim
+        self.resolvido_em = time.time()
+        self.versao = _versao(usuario_id)
+
+    @property
+    def assinatura_ativa(self):
+        if not self.assinatura_fim:
+            return False
+        return str(self.assinatura_fim) >= datetime.now().date().isoformat()
+
+    def expirado(self, ttl=TTL_PRINCIPAL):
+        return (time.time() - self.resolvido_em > ttl
+                or self.versao != _versao(self.usuario_id))
+
+
+def resolver_principal(conn, nome, admin_dono):
+    """Carrega id, admin e fim da assinatura do usuário (duas leituras pela chave)"""
+    row = conn.execute("""
+        SELECT u.id, EXISTS(SELECT 1 FROM admins a WHERE a.usuario_id = u.id)
+        FROM usuarios u WHERE u.nome = ?
+    """, (nome,)).fetchone()
+    if not row:
+        return Principal(nome, None, False, None)
+    usuario_id, admin = row
+    dono = bool(nome) and nome.lower() == admin_dono.lower()
+    return Principal(nome, usuario_id, bool(admin) or dono, fim_assinatura(conn, usuario_id))
+
+
+def garantir_admin_dono(conn, principal, admin_dono):
+    """No login do dono, garante que ele está na tabela admins"""
+    if principal.usuario_id and principal.nome.lower() == admin_dono.lower():
+        conn.execute("INSERT OR IGNORE INTO admins (usuario_id) VALUES (?)", (principal.usuario_id,))
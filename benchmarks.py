@@ -0,0 +1,1218 @@
+"""
+Benchmarks das rotinas de acesso ao banco
+Execute: python benchmarks.py <nome> [tamanhos...]
+Sem argumentos, lista os benchmarks disponíveis.
+Os bancos sintéticos são criados em um diretório temporário.
+"""
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from conexao import conexao
+import database
+
+MATERIAS = [f"Matéria {i:02d}" for i in range(10)]
+CARGOS = [1, 2, 3, 4]
+
+_diretorio = tempfile.mkdtemp(prefix="bench_questoes_")
+
+
+def banco_sintetico(n_questoes, nome=None):
+    """Cria (ou reaproveita) um banco com n questões distribuídas em cargos e matérias"""
+    caminho = os.path.join(_diretorio, nome or f"questoes_{n_questoes}.db")
+    if os.path.exists(caminho):
+        return caminho
+    database.aplicar_migracoes(caminho)
+    rng = random.Random(42)
+    with conexao(caminho) as conn:
+        lote = []
+        for i in range(n_questoes):
+            lote.append((
+                rng.choice(CARGOS), f"Enunciado sintético número {i}",
+                "a", "b", "c", "d", "ABCD"[i % 4], rng.choice(MATERIAS),
+            ))
+            if len(lote) == 50_000:
+                conn.executemany(
+                    "INSERT INTO questoes (cargo_id, enunciado, op_a, op_b, op_c, op_d, correta, materia) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lote)
+                lote.clear()
+        if lote:
+            conn.executemany(
+                "INSERT INTO questoes (cargo_id, enunciado, op_a, op_b, op_c, op_d, correta, materia) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lote)
+    return caminho
+
+
+def medir(funcao, repeticoes=5):
+    """Mediana do tempo de execução em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def copiar_banco(origem, destino):
+    """Cópia consistente de um banco em WAL (inclui o que ainda não foi para o arquivo principal)"""
+    with conexao(origem) as conn:
+        copia = sqlite3.connect(destino)
+        try:
+            conn.backup(copia)
+        finally:
+            copia.close()
+
+
+def contar_comandos(caminho, funcao):
+    """Número de comandos SQL executados por funcao(conn)"""
+    with conexao(caminho) as conn:
+        antes = conn.comandos
+        funcao(conn)
+        return conn.comandos - antes
+
+
+# ==============================
+# Amostragem de questões (carregar_questoes)
+# ==============================
+def _amostragem_n_mais_1(conn, cargo_id, config):
+    """Implementação anterior: lista todos os ids e busca uma questão por vez"""
+    todas = []
+    for materia, qtd in config.items():
+        ids = [r[0] for r in conn.execute(
+            "SELECT id FROM questoes WHERE cargo_id = ? AND materia = ?", (cargo_id, materia))]
+        for qid in random.sample(ids, min(qtd, len(ids))):
+            todas.append(conn.execute("""
+                SELECT id, enunciado, op_a, op_b, op_c, op_d, correta, materia,
+                       COALESCE(explicacao_teorica, '') FROM questoes WHERE id = ?
+            """, (qid,)).fetchone())
+    random.shuffle(todas)
+    return todas
+
+
+def bench_amostragem(tamanhos=(10_000, 100_000, 1_000_000)):
+    from amostragem import amostrar_questoes
+
+    config = {m: 10 for m in MATERIAS}  # 100 questões em 10 matérias
+    print(f"{'questões':>10} | {'N+1 (ms)':>9} {'cmds':>5} | {'amostragem (ms)':>15} {'cmds':>5}")
+    for n in tamanhos:
+        caminho = banco_sintetico(n)
+        with conexao(caminho) as conn:
+            antigo = medir(lambda: _amostragem_n_mais_1(conn, 1, config))
+            novo = medir(lambda: amostrar_questoes(conn, 1, config))
+        cmds_antigo = contar_comandos(caminho, lambda c: _amostragem_n_mais_1(c, 1, config))
+        cmds_novo = contar_comandos(caminho, lambda c: amostrar_questoes(c, 1, config))
+        print(f"{n:>10} | {antigo:>9.1f} {cmds_antigo:>5} | {novo:>15.1f} {cmds_novo:>5}")
+
+
+# ==============================
+# Catálogo do menu principal (listar_concursos/cargos/materias)
+# ==============================
+def _menu_sem_cache(conn):
+    """Implementação anterior: três consultas a cada rerun do menu"""
+    conn.execute("SELECT id, nome FROM concursos ORDER BY nome").fetchall()
+    conn.execute("SELECT id, nome FROM cargos WHERE concurso_id = ? ORDER BY nome", (1,)).fetchall()
+    conn.execute("SELECT DISTINCT materia FROM questoes WHERE cargo_id = ? ORDER BY materia", (1,)).fetchall()
+
+
+def bench_catalogo(tamanhos=(10_000, 100_000, 1_000_000)):
+    import catalogo
+
+    print(f"{'questões':>10} | {'sem cache (ms)':>14} | {'recarga (ms)':>12} | {'em cache (ms)':>13}")
+    for n in tamanhos:
+        caminho = banco_sintetico(n)
+        with conexao(caminho) as conn:
+            antigo = medir(lambda: _menu_sem_cache(conn))
+            recarga = medir(lambda: catalogo.carregar_catalogo(conn))
+        catalogo.obter_catalogo(caminho)
+        cache = medir(lambda: catalogo.obter_catalogo(caminho), repeticoes=100)
+        print(f"{n:>10} | {antigo:>14.1f} | {recarga:>12.1f} | {cache:>13.3f}")
+
+
+# ==============================
+# Inicialização: pandas x registros nas consultas interativas
+# ==============================
+_SCRIPT_INICIALIZACAO = """
+import resource, sys, time
+inicio = time.perf_counter()
+from conexao import conexao
+{importacao}
+with conexao(sys.argv[1]) as conn:
+    linhas = {consulta}
+ms = (time.perf_counter() - inicio) * 1000
+print(ms, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+VARIANTES_INICIALIZACAO = {
+    "pandas": ("import pandas as pd",
+               "pd.read_sql('SELECT id, nome FROM concursos ORDER BY nome', conn)"),
+    "registros": ("from registros import consultar",
+                  "consultar(conn, 'SELECT id, nome FROM concursos ORDER BY nome')"),
+}
+
+
+def bench_inicializacao(tamanhos=(5,)):
+    """Tempo de inicialização e pico de memória (RSS) de um processo novo"""
+    import subprocess
+
+    caminho = banco_sintetico(1_000, nome="inicializacao.db")
+    repeticoes = tamanhos[0]
+    print(f"{'variante':>10} | {'tempo (ms)':>10} | {'RSS (MB)':>8}")
+    for nome, (importacao, consulta) in VARIANTES_INICIALIZACAO.items():
+        script = _SCRIPT_INICIALIZACAO.format(importacao=importacao, consulta=consulta)
+        tempos, memorias = [], []
+        for _ in range(repeticoes):
+            saida = subprocess.run([sys.executable, "-c", script, caminho],
+                                   capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+            if saida.returncode != 0:
+                print(f"{nome:>10} | indisponível ({saida.stderr.strip().splitlines()[-1]})")
+                break
+            ms, rss = saida.stdout.split()
+            tempos.append(float(ms))
+            memorias.append(int(rss) / 1024)
+        else:
+            print(f"{nome:>10} | {statistics.median(tempos):>10.1f} | {statistics.median(memorias):>8.1f}")
+
+
+# ==============================
+# Coleta (ScraperQuestoes.processar_urls) contra um servidor HTTP local
+# ==============================
+LATENCIA_SERVIDOR = 0.05  # segundos por página no servidor local
+
+
+def _servidor_questoes():
+    """Servidor HTTP local que devolve uma questão por caminho; /falha-* responde 503 uma vez"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    falhas = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(LATENCIA_SERVIDOR)
+            if self.path.startswith("/falha-") and self.path not in falhas:
+                falhas.add(self.path)
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            corpo = (
+                f'<div class="enunciado">Questão sintética {self.path}: de acordo com a lei, '
+                f'assinale a alternativa correta.</div>'
+                '<li class="alternativa">a) Primeira</li><li class="alternativa">b) Segunda</li>'
+                '<li class="alternativa">c) Terceira</li><li class="alternativa">d) Quarta</li>'
+                '<span class="gabarito">Gabarito: C</span>'
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def bench_coleta(tamanhos=(200,)):
+    import contextlib
+    import io
+    from coleta import PipelineColeta
+    from scraper_questoes import ScraperQuestoes
+
+    servidor = _servidor_questoes()
+    porta = servidor.server_address[1]
+    cenarios = [
+        ("sequencial", 1, 0),
+        ("8 conexões", 8, 0),
+        ("8 conexões, 20 req/s por host", 8, 0.05),
+    ]
+    print(f"{'páginas':>8} | {'cenário':<30} | {'páginas/s':>9} | {'salvas':>6} {'erros':>5} {'tentativas':>10}")
+    for n in tamanhos:
+        # Metade das páginas em cada "host" (127.0.0.1 e localhost); 5% falham uma vez
+        urls = [f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{porta}/"
+                f"{'falha-' if i % 20 == 0 else 'q-'}{i}" for i in range(n)]
+        for nome, conexoes, delay in cenarios:
+            caminho = banco_sintetico(0, nome=f"coleta_{n}_{conexoes}_{delay}.db")
+            pipeline = PipelineColeta(ScraperQuestoes(caminho), max_conexoes=conexoes,
+                                      delay_por_host=delay, espera_base=0.01)
+            # O sufixo muda o caminho, então cada cenário passa pelas falhas de novo
+            with contextlib.redirect_stdout(io.StringIO()):
+                r = pipeline.executar([f"{u}?{nome}" for u in urls])
+            print(f"{n:>8} | {nome:<30} | {r.paginas_por_segundo:>9.1f} | "
+                  f"{r.sucesso:>6} {r.erros:>5} {r.tentativas:>10}")
+    servidor.shutdown()
+
+
+# ==============================
+# Gravação das questões coletadas: uma a uma x em lote
+# ==============================
+def _questoes_adaptadas(n, scraper, prefixo):
+    return [scraper.adaptar_questao({
+        'enunciado': f"{prefixo} questão coletada número {i}",
+        'op_a': "a", 'op_b': "b", 'op_c': "c", 'op_d': "d",
+        'correta': "A", 'materia': MATERIAS[i % len(MATERIAS)],
+    }) for i in range(n)]
+
+
+def bench_gravacao(tamanhos=(1_000, 10_000)):
+    from gravacao import GravadorLote
+    from scraper_questoes import ScraperQuestoes
+
+    print(f"{'questões':>10} | {'uma a uma (q/s)':>15} | {'em lote (q/s)':>13} | {'duplicatas':>10} | {'similares':>9}")
+    for n in tamanhos:
+        caminho = banco_sintetico(100_000, nome=f"gravacao_{n}.db")
+        scraper = ScraperQuestoes(caminho)
+        # 10% das questões repetidas para exercitar a deduplicação
+        individuais = _questoes_adaptadas(n, scraper, "Individual")
+        individuais += individuais[:n // 10]
+        inicio = time.perf_counter()
+        for adaptada in individuais:
+            scraper.gravar_questao(adaptada, 1)
+        uma_a_uma = len(individuais) / (time.perf_counter() - inicio)
+
+        em_lote = _questoes_adaptadas(n, scraper, "Lote")
+        em_lote += em_lote[:n // 10]
+        inicio = time.perf_counter()
+        with GravadorLote(caminho, 1) as gravador:
+            for adaptada in em_lote:
+                gravador.adicionar(adaptada)
+        lote = len(em_lote) / (time.perf_counter() - inicio)
+        print(f"{n:>10} | {uma_a_uma:>15.0f} | {lote:>13.0f} | {gravador.duplicatas:>10} | {gravador.similares:>9}")
+
+
+# ==============================
+# Adaptação de texto: uma regex por regra x trie compilada
+# ==============================
+def _adaptar_regra_a_regra(texto, regras):
+    """Implementação anterior: um re.sub (recompilado) por regra"""
+    for original, substituto in regras.items():
+        texto = re.sub(re.escape(original), substituto, texto, flags=re.IGNORECASE)
+    return texto
+
+
+def bench_adaptacao(tamanhos=(7, 100, 1_000, 5_000)):
+    from adaptacao import REGRAS_PADRAO, Adaptador
+
+    rng = random.Random(42)
+    palavras = ["lei", "norma", "servidor", "público", "art.", "inciso", "prazo", "recurso",
+                "órgão", "poder", "ato", "processo", "direito", "dever", "cargo", "União"]
+    texto = " ".join(rng.choice(palavras) for _ in range(2_000))
+    texto += " de acordo com a lei, assinale a alternativa correta" * 20
+    print(f"{'regras':>7} | {'regra a regra (chars/s)':>23} | {'trie (chars/s)':>14} | {'compilação (ms)':>15}")
+    for n in tamanhos:
+        regras = dict(REGRAS_PADRAO)
+        while len(regras) < n:
+            frase = " ".join(rng.choice(palavras) for _ in range(rng.randint(2, 4)))
+            regras[f"{frase} {len(regras)}"] = "substituto"
+        inicio = time.perf_counter()
+        adaptador = Adaptador(regras)
+        compilacao = (time.perf_counter() - inicio) * 1000
+        antigo = medir(lambda: _adaptar_regra_a_regra(texto, regras), repeticoes=3)
+        novo = medir(lambda: adaptador.substituir(texto))
+        print(f"{n:>7} | {len(texto) / antigo * 1000:>23,.0f} | {len(texto) / novo * 1000:>14,.0f} | "
+              f"{compilacao:>15.1f}")
+
+
+# ==============================
+# Limpeza de duplicatas (marcar_questoes_manuais_para_remocao + remover_duplicatas_manuais)
+# ==============================
+def _banco_duplicatas(n):
+    """Banco sem hashes, com 20% das questões repetidas em grupos de ~10 (origens mistas)"""
+    caminho = os.path.join(_diretorio, f"duplicatas_{n}.db")
+    if os.path.exists(caminho):
+        return caminho
+    copiar_banco(banco_sintetico(n), caminho)
+    with conexao(caminho) as conn:
+        conn.execute("""
+            UPDATE questoes SET enunciado = 'Enunciado repetido ' || ((id / 5) % ?),
+                   origem = CASE WHEN id % 3 = 0 THEN 'scraping' ELSE 'manual' END
+            WHERE id % 5 = 0
+        """, (max(1, n // 50),))
+    return caminho
+
+
+def _hashes_linha_a_linha(conn, gerar_hash):
+    """Implementação anterior: um UPDATE por questão sem hash"""
+    for qid, enunciado in conn.execute(
+            "SELECT id, enunciado FROM questoes WHERE hash_enunciado IS NULL").fetchall():
+        conn.execute("UPDATE questoes SET hash_enunciado = ?, origem = 'manual' WHERE id = ?",
+                     (gerar_hash(enunciado), qid))
+
+
+def _remover_por_pares(conn):
+    """Implementação anterior: auto-junção por hash e filtro par a par em Python"""
+    duplicatas = conn.execute("""
+        SELECT q1.id, q1.origem, q2.id, q2.origem
+        FROM questoes q1
+        JOIN questoes q2 ON q1.hash_enunciado = q2.hash_enunciado
+        WHERE q1.id < q2.id
+        AND (q1.origem = 'manual' OR q2.origem = 'manual')
+    """).fetchall()
+    ids = []
+    for q1_id, q1_origem, q2_id, q2_origem in duplicatas:
+        if q1_origem == 'manual':
+            ids.append(q1_id)
+        elif q2_origem == 'manual':
+            ids.append(q2_id)
+    conn.executemany("DELETE FROM questoes WHERE id = ?", [(i,) for i in ids])
+    return len(duplicatas)
+
+
+def bench_deduplicacao(tamanhos=(100_000, 1_000_000)):
+    from deduplicacao import gerar_hash_enunciado as gerar_hash, preencher_hashes, remover_duplicatas
+
+    print(f"{'questões':>10} | {'hashes antigo (s)':>17} {'novo (s)':>8} | "
+          f"{'limpeza antiga (s)':>18} {'pares':>8} | {'nova (s)':>8} {'removidas':>9}")
+    for n in tamanhos:
+        base = _banco_duplicatas(n)
+        antigo, novo = base + ".antigo", base + ".novo"
+        copiar_banco(base, antigo)
+        copiar_banco(base, novo)
+        with conexao(antigo) as conn:
+            t0 = time.perf_counter()
+            _hashes_linha_a_linha(conn, gerar_hash)
+            conn.commit()
+            t1 = time.perf_counter()
+            pares = _remover_por_pares(conn)
+            conn.commit()
+            t2 = time.perf_counter()
+        with conexao(novo) as conn:
+            t3 = time.perf_counter()
+            preencher_hashes(conn, gerar_hash)
+            conn.commit()
+            t4 = time.perf_counter()
+            relatorio = remover_duplicatas(conn)
+            conn.commit()
+            t5 = time.perf_counter()
+        print(f"{n:>10} | {t1 - t0:>17.1f} {t4 - t3:>8.1f} | {t2 - t1:>18.1f} {pares:>8} | "
+              f"{t5 - t4:>8.1f} {relatorio.removidas:>9}")
+
+
+# ==============================
+# Quase duplicatas: consulta ao índice LSH na inserção
+# ==============================
+PALAVRAS = ["lei", "norma", "servidor", "público", "inciso", "prazo", "recurso", "órgão",
+            "poder", "ato", "processo", "direito", "dever", "cargo", "União", "estado",
+            "município", "tributo", "contrato", "licitação", "licença", "sanção", "recurso",
+            "competência", "autarquia", "fundação", "mandado", "segurança", "habeas", "corpus"]
+
+
+def _texto_questao(i):
+    """Enunciado sintético determinístico (palavras sorteadas com semente i)"""
+    rng = random.Random(i)
+    return " ".join(rng.choice(PALAVRAS) for _ in range(25))
+
+
+def _banco_lsh(n, reais):
+    """
+    Banco com n questões indexadas. As `reais` primeiras têm a assinatura do
+    próprio enunciado; as demais recebem assinaturas aleatórias (o custo da
+    consulta só depende do tamanho do índice, não de como ele foi preenchido).
+    """
+    from similaridade import NUM_PERMUTACOES, assinatura, gravar_assinaturas
+
+    caminho = os.path.join(_diretorio, f"lsh_{n}.db")
+    if os.path.exists(caminho):
+        return caminho
+    copiar_banco(banco_sintetico(n), caminho)
+    rng = random.Random(7)
+    with conexao(caminho) as conn:
+        database.aplicar_migracoes(caminho)
+        for inicio in range(1, n + 1, 50_000):
+            ids = range(inicio, min(n, inicio + 49_999) + 1)
+            gravar_assinaturas(conn, [
+                (qid, assinatura(_texto_questao(qid)) if qid <= reais
+                 else tuple(rng.getrandbits(32) for _ in range(NUM_PERMUTACOES)))
+                for qid in ids
+            ])
+    return caminho
+
+
+def bench_similaridade(tamanhos=(100_000, 1_000_000)):
+    from similaridade import assinatura, buscar_similares
+
+    reais = 1_000
+    print(f"{'questões':>10} | {'assinatura (ms)':>15} | {'busca sem par (ms)':>18} | "
+          f"{'busca com par (ms)':>18} | {'encontradas':>11}")
+    for n in tamanhos:
+        caminho = _banco_lsh(n, reais)
+        textos_novos = [_texto_questao(-i) for i in range(1, 201)]
+        # Quase duplicatas das questões reais: uma palavra a mais no fim
+        textos_pares = [_texto_questao(i) + " adaptado" for i in range(1, 201)]
+        sigs_novas = [assinatura(t) for t in textos_novos]
+        sigs_pares = [assinatura(t) for t in textos_pares]
+        t_assinatura = medir(lambda: [assinatura(t) for t in textos_novos]) / len(textos_novos)
+        with conexao(caminho) as conn:
+            sem_par = medir(lambda: [buscar_similares(conn, s) for s in sigs_novas]) / len(sigs_novas)
+            com_par = medir(lambda: [buscar_similares(conn, s) for s in sigs_pares]) / len(sigs_pares)
+            encontradas = sum(bool(buscar_similares(conn, s)) for s in sigs_pares)
+        print(f"{n:>10} | {t_assinatura:>15.3f} | {sem_par:>18.3f} | {com_par:>18.3f} | "
+              f"{encontradas:>7}/{len(sigs_pares)}")
+
+
+# ==============================
+# Busca de texto completo (FTS5)
+# ==============================
+VOCABULARIO_BUSCA = 20_000
+
+
+def _palavra(i):
+    """Palavra sintética pronunciável e única para o índice i"""
+    silabas = ["ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ru", "sa", "te", "vi", "xo", "za"]
+    partes = []
+    while True:
+        partes.append(silabas[i % len(silabas)])
+        i //= len(silabas)
+        if i == 0:
+            return "".join(partes) + "ção"
+
+
+def _banco_busca(n):
+    """n questões com enunciados de 25 palavras sorteadas com distribuição de Zipf"""
+    caminho = os.path.join(_diretorio, f"busca_{n}.db")
+    if os.path.exists(caminho):
+        return caminho
+    database.aplicar_migracoes(caminho)
+    rng = random.Random(3)
+    vocabulario = [_palavra(i) for i in range(VOCABULARIO_BUSCA)]
+    acumulado = []
+    total = 0.0
+    for i in range(VOCABULARIO_BUSCA):
+        total += 1 / (i + 1)
+        acumulado.append(total)
+    with conexao(caminho) as conn:
+        for inicio in range(0, n, 50_000):
+            conn.executemany(
+                "INSERT INTO questoes (cargo_id, enunciado, op_a, op_b, op_c, op_d, correta, materia) "
+                "VALUES (?, ?, 'a', 'b', 'c', 'd', 'A', ?)",
+                [(rng.choice(CARGOS), " ".join(rng.choices(vocabulario, cum_weights=acumulado, k=25)),
+                  rng.choice(MATERIAS)) for _ in range(inicio, min(n, inicio + 50_000))])
+            conn.commit()
+    return caminho
+
+
+def bench_busca(tamanhos=(100_000, 1_000_000)):
+    from busca import buscar_questoes
+
+    rng = random.Random(5)
+    print(f"{'questões':>10} | {'consulta':<22} | {'p50 (ms)':>8} {'p95 (ms)':>8}")
+    for n in tamanhos:
+        caminho = _banco_busca(n)
+        with conexao(caminho) as conn:
+            # Consultas montadas a partir de enunciados reais do banco
+            amostra = [r[0].split() for r in conn.execute(
+                "SELECT enunciado FROM questoes WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(rng.sample(range(1, n + 1), 200)),))]
+            cenarios = {
+                "1 palavra": [rng.choice(p) for p in amostra],
+                "2 palavras": [" ".join(rng.sample(p, 2)) for p in amostra],
+                "2 palavras + prefixo": [" ".join(rng.sample(p, 2))[:-3] for p in amostra],
+                "2 palavras, 3ª página": [" ".join(rng.sample(p, 2)) for p in amostra],
+                "1 palavra, por cargo": [rng.choice(p) for p in amostra],
+            }
+            for nome, consultas in cenarios.items():
+                pagina = 2 if "página" in nome else 0
+                filtro = {"cargo_id": CARGOS[0]} if "cargo" in nome else {}
+                tempos = []
+                for consulta in consultas:
+                    inicio = time.perf_counter()
+                    buscar_questoes(conn, consulta, pagina=pagina, **filtro)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                tempos.sort()
+                print(f"{n:>10} | {nome:<22} | {statistics.median(tempos):>8.2f} "
+                      f"{tempos[int(len(tempos) * 0.95)]:>8.2f}")
+
+
+# ==============================
+# Listagem paginada do admin
+# ==============================
+def _pagina_offset(conn, pagina, por_pagina=50, materia=None):
+    """Paginação por OFFSET, para comparação: percorre todas as linhas puladas"""
+    where = "WHERE materia = ?" if materia else ""
+    params = ([materia] if materia else []) + [por_pagina, pagina * por_pagina]
+    return conn.execute(f"""
+        SELECT id, substr(enunciado, 1, 100), materia, banca, orgao, origem FROM questoes
+        {where} ORDER BY id DESC LIMIT ? OFFSET ?
+    """, params).fetchall()
+
+
+def bench_listagem(tamanhos=(100_000, 1_000_000)):
+    from listagem import listar_questoes
+
+    paginas = (0, 100, 1_000, 5_000)
+    print(f"{'questões':>10} | {'página':>6} | {'filtro':<10} | {'OFFSET (ms)':>11} {'keyset (ms)':>11}")
+    for n in tamanhos:
+        caminho = banco_sintetico(n)
+        with conexao(caminho) as conn:
+            for materia in (None, MATERIAS[0]):
+                # Cursor da página desejada (obtido uma vez, fora da medição)
+                cursores = {}
+                cursor, pagina = None, 0
+                while pagina <= max(paginas):
+                    if pagina in paginas:
+                        cursores[pagina] = cursor
+                    _, cursor = listar_questoes(conn, antes_de=cursor, materia=materia)
+                    if cursor is None:
+                        break
+                    pagina += 1
+                for pagina, cursor in cursores.items():
+                    offset = medir(lambda: _pagina_offset(conn, pagina, materia=materia))
+                    keyset = medir(lambda: listar_questoes(conn, antes_de=cursor, materia=materia))
+                    print(f"{n:>10} | {pagina:>6} | {materia or 'nenhum':<10} | {offset:>11.2f} {keyset:>11.2f}")
+
+
+# ==============================
+# Importação de planilha (importar_planilha.py)
+# ==============================
+_SCRIPT_IMPORTACAO = """
+import resource, sys
+from importar_planilha import importar_planilha
+r = importar_planilha(sys.argv[1], db_path=sys.argv[2], indexar_similaridade=False)
+print(r.lidas, r.importadas, r.rejeitadas, r.duracao, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _planilha_sintetica(n):
+    """CSV com n linhas: 1% inválidas e 1% repetidas"""
+    caminho = os.path.join(_diretorio, f"planilha_{n}.csv")
+    if os.path.exists(caminho):
+        return caminho
+    rng = random.Random(11)
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("enunciado;op_a;op_b;op_c;op_d;correta;materia;banca;ano\n")
+        for i in range(n):
+            numero = i - 1 if i % 100 == 50 else i
+            correta = "Z" if i % 100 == 99 else "ABCD"[i % 4]
+            f.write(f"Enunciado importado número {numero} {_texto_questao(numero)};a;b;c;d;{correta};"
+                    f"{rng.choice(MATERIAS)};Banca {i % 7};{2000 + i % 25}\n")
+    return caminho
+
+
+def bench_importacao(tamanhos=(100_000, 1_000_000)):
+    """Vazão e pico de memória (RSS) da importação em um processo novo"""
+    import subprocess
+
+    print(f"{'linhas':>10} | {'importadas':>10} {'rejeitadas':>10} | {'tempo (s)':>9} "
+          f"{'linhas/s':>9} | {'RSS (MB)':>8}")
+    for n in tamanhos:
+        planilha = _planilha_sintetica(n)
+        banco = os.path.join(_diretorio, f"importacao_{n}.db")
+        saida = subprocess.run([sys.executable, "-c", _SCRIPT_IMPORTACAO, planilha, banco],
+                               capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+        if saida.returncode != 0:
+            print(f"{n:>10} | erro ({saida.stderr.strip().splitlines()[-1]})")
+            continue
+        lidas, importadas, rejeitadas, duracao, rss = saida.stdout.split()
+        print(f"{n:>10} | {importadas:>10} {rejeitadas:>10} | {float(duracao):>9.1f} "
+              f"{int(lidas) / float(duracao):>9.0f} | {int(rss) / 1024:>8.1f}")
+
+
+# ==============================
+# Registro de respostas (fila de escrita)
+# ==============================
+def bench_respostas(tamanhos=(1_000, 10_000)):
+    """Latência de registrar uma resposta: INSERT + commit direto vs fila de escrita"""
+    from respostas import SQL_INSERIR, finalizar_simulado, registrar_resposta
+
+    print(f"{'respostas':>10} | {'direto p50/p99 (µs)':>20} | {'fila p50/p99 (µs)':>18} | {'esvaziar (ms)':>13}")
+    for n in tamanhos:
+        caminho = banco_sintetico(1_000, nome=f"respostas_{n}.db")
+
+        def latencias(registrar):
+            tempos = []
+            for i in range(n):
+                inicio = time.perf_counter()
+                registrar(i)
+                tempos.append((time.perf_counter() - inicio) * 1e6)
+            tempos.sort()
+            return tempos[len(tempos) // 2], tempos[int(len(tempos) * 0.99)]
+
+        def direto(i):
+            with conexao(caminho) as conn:
+                conn.execute(SQL_INSERIR, (1, i % 1000 + 1, "direto", "A", 1, 3.0))
+
+        d50, d99 = latencias(direto)
+        f50, f99 = latencias(lambda i: registrar_resposta(1, i % 1000 + 1, "fila", "A", True, 3.0,
+                                                          db_path=caminho))
+        inicio = time.perf_counter()
+        finalizar_simulado(caminho)
+        esvaziar = (time.perf_counter() - inicio) * 1000
+        print(f"{n:>10} | {d50:>9.1f} {d99:>10.1f} | {f50:>8.1f} {f99:>9.1f} | {esvaziar:>13.1f}")
+
+
+# ==============================
+# Painel de desempenho (estatísticas materializadas)
+# ==============================
+def _desempenho_group_by(conn, usuario_id, cargo_id):
+    """Alternativa sem materialização: agrega todo o histórico a cada leitura"""
+    return conn.execute("""
+        SELECT q.materia, COUNT(*), SUM(r.acertou), AVG(r.tempo_gasto), MAX(r.data_resposta)
+        FROM respostas r JOIN questoes q ON q.id = r.questao_id
+        WHERE r.usuario_id = ? AND q.cargo_id = ?
+        GROUP BY q.materia
+    """, (usuario_id, cargo_id)).fetchall()
+
+
+def bench_desempenho(tamanhos=(10_000, 100_000, 1_000_000)):
+    from desempenho import desempenho_usuario, reconstruir_desempenho
+    from respostas import SQL_INSERIR
+
+    print(f"{'respostas':>10} | {'gravação c/ gatilho (s)':>23} | {'GROUP BY (ms)':>13} | "
+          f"{'agregados (ms)':>14} | {'reconstruir (s)':>15}")
+    rng = random.Random(9)
+    for n in tamanhos:
+        caminho = banco_sintetico(10_000, nome=f"desempenho_{n}.db")
+        inicio = time.perf_counter()
+        with conexao(caminho) as conn:
+            for bloco in range(0, n, 50_000):
+                conn.executemany(SQL_INSERIR, [
+                    (1, rng.randint(1, 10_000), "bench", "A", rng.random() < 0.6, rng.uniform(5, 120))
+                    for _ in range(bloco, min(n, bloco + 50_000))])
+        gravacao = time.perf_counter() - inicio
+        with conexao(caminho) as conn:
+            group_by = medir(lambda: _desempenho_group_by(conn, 1, 1))
+            agregados = medir(lambda: desempenho_usuario(conn, 1, 1))
+            inicio = time.perf_counter()
+            reconstruir_desempenho(conn)
+            reconstruir = time.perf_counter() - inicio
+        print(f"{n:>10} | {gravacao:>23.2f} | {group_by:>13.2f} | {agregados:>14.3f} | {reconstruir:>15.2f}")
+
+
+# ==============================
+# Revisão inteligente (agenda por usuário)
+# ==============================
+def bench_revisao(tamanhos=(10_000, 100_000), questoes=1_000_000, por_usuario=40):
+    """Montar um simulado de 100 questões: sorteio uniforme x revisões vencidas + inéditas"""
+    from amostragem import amostrar_questoes
+    from revisao import selecionar_revisao, vencidas
+
+    config = {m: 10 for m in MATERIAS}
+    caminho = banco_sintetico(questoes, nome=f"revisao_{questoes}.db")
+    rng = random.Random(18)
+    with conexao(caminho) as conn:
+        ids = {m: [] for m in MATERIAS}
+        for qid, materia in conn.execute("SELECT id, materia FROM questoes WHERE cargo_id = 1"):
+            ids[materia].append(qid)
+        usuarios = conn.execute("SELECT COUNT(DISTINCT usuario_id) FROM revisao").fetchone()[0]
+    totais = {m: len(qs) for m, qs in ids.items()}  # o app os tem no catálogo
+
+    print(f"{'usuários':>10} | {'agenda':>10} | {'uniforme (ms)':>13} | {'vencidas (ms)':>13} | "
+          f"{'revisão (ms)':>12} | {'vencidas/simulado':>17}")
+    for u in sorted(tamanhos):
+        # Agenda sintética: por_usuario questões respondidas, vencimentos em ±60 dias
+        with conexao(caminho) as conn:
+            for inicio in range(usuarios + 1, u + 1, 2_000):
+                linhas = []
+                for usuario in range(inicio, min(u, inicio + 1_999) + 1):
+                    for materia in rng.sample(MATERIAS, 5):
+                        for qid in rng.sample(ids[materia], por_usuario // 5):
+                            dias = rng.uniform(-60, 60)
+                            linhas.append((usuario, qid, 1, materia, rng.randint(0, 6), 1, 1,
+                                           f"-{rng.uniform(1, 64):.3f} days", f"{dias:+.3f} days"))
+                conn.executemany("""
+                    INSERT OR IGNORE INTO revisao VALUES
+                        (?, ?, ?, ?, ?, ?, ?, datetime('now', ?), datetime('now', ?))
+                """, linhas)
+        usuarios = max(usuarios, u)
+        amostra = [rng.randint(1, u) for _ in range(20)]
+        with conexao(caminho) as conn:
+            agenda = conn.execute("SELECT COUNT(*) FROM revisao").fetchone()[0]
+            uniforme = medir(lambda: [amostrar_questoes(conn, 1, config, totais) for _ in amostra]) / len(amostra)
+            devidas = medir(lambda: [vencidas(conn, usr, 1, config) for usr in amostra]) / len(amostra)
+            adaptativa = medir(lambda: [selecionar_revisao(conn, usr, 1, config, totais) for usr in amostra]) / len(amostra)
+            media = statistics.mean(sum(map(len, vencidas(conn, usr, 1, config).values())) for usr in amostra)
+        print(f"{u:>10} | {agenda:>10} | {uniforme:>13.2f} | {devidas:>13.3f} | {adaptativa:>12.2f} | {media:>17.1f}")
+
+
+# ==============================
+# Questões vistas (conjunto compacto por usuário)
+# ==============================
+def bench_vistas(tamanhos=(1_000, 10_000, 100_000, 500_000, 900_000), questoes=1_000_000):
+    """Tamanho do conjunto e custo de sortear só inéditas, com n de 1 milhão de questões já vistas"""
+    from amostragem import amostrar_questoes
+    from vistas import ConjuntoVisto, amostrar_ineditas, carregar_vistas, marcar_vistas
+
+    config = {m: 10 for m in MATERIAS}
+    caminho = banco_sintetico(questoes)
+    with conexao(caminho) as conn:
+        totais = dict(conn.execute(
+            "SELECT materia, COUNT(*) FROM questoes WHERE cargo_id = 1 GROUP BY materia").fetchall())
+    rng = random.Random(19)
+    print(f"{'vistas':>8} | {'conjunto (KB)':>13} | {'bytes/id':>8} | {'set() (KB)':>10} | {'carregar (ms)':>13} | "
+          f"{'in (ns)':>7} | {'marcar 100 (ms)':>15} | {'uniforme (ms)':>13} | {'inéditas (ms)':>13}")
+    for n in tamanhos:
+        ids = rng.sample(range(1, questoes + 1), n)
+        conjunto = ConjuntoVisto(ids)
+        blob = conjunto.serializar()
+        conjunto_py = set(ids)
+        tamanho_py = sys.getsizeof(conjunto_py) + sum(sys.getsizeof(i) for i in conjunto_py)
+        with conexao(caminho) as conn:
+            conn.execute("INSERT OR REPLACE INTO vistas VALUES (1, ?, ?)", (blob, n))
+        with conexao(caminho) as conn:
+            carregar = medir(lambda: carregar_vistas(conn, 1))
+            testes = [rng.randint(1, questoes) for _ in range(100_000)]
+            inicio = time.perf_counter()
+            sum(t in conjunto for t in testes)
+            pertinencia = (time.perf_counter() - inicio) / len(testes) * 1e9
+            uniforme = medir(lambda: amostrar_questoes(conn, 1, config, totais))
+            ineditas = medir(lambda: amostrar_ineditas(conn, 1, 1, config, totais))
+            sorteio = amostrar_ineditas(conn, 1, 1, config, totais)
+            assert not any(q[0] in conjunto for q in sorteio)
+        marcar = medir(lambda: _marcar(caminho, marcar_vistas, rng, questoes))
+        print(f"{n:>8} | {len(blob) / 1024:>13.1f} | {len(blob) / n:>8.2f} | {tamanho_py / 1024:>10.0f} | "
+              f"{carregar:>13.2f} | {pertinencia:>7.0f} | {marcar:>15.2f} | {uniforme:>13.2f} | {ineditas:>13.2f}")
+
+
+def _marcar(caminho, marcar_vistas, rng, questoes):
+    with conexao(caminho) as conn:
+        marcar_vistas(conn, 1, [rng.randint(1, questoes) for _ in range(100)])
+
+
+# ==============================
+# Sorteador compartilhado x ORDER BY RANDOM() (main_app.py, simulado.py)
+# ==============================
+def _sorteio_order_by_random(conn, config):
+    """Implementação anterior do app de desktop: ordena a matéria inteira a cada sorteio"""
+    todas = []
+    for materia, qtd in config.items():
+        todas += conn.execute("""
+            SELECT id, enunciado, op_a, op_b, op_c, op_d, correta FROM questoes
+            WHERE materia = ? ORDER BY RANDOM() LIMIT ?
+        """, (materia, qtd)).fetchall()
+    return todas
+
+
+def _vies_com_buracos(rng, sorteios=20_000):
+    """
+    Coeficiente de variação do número de vezes que cada questão de uma matéria
+    é sorteada, num banco com blocos de ids apagados, e o valor esperado para
+    um sorteio uniforme (1 / raiz da média)
+    """
+    from amostragem import amostrar_questoes
+
+    caminho = os.path.join(_diretorio, "sorteio_buracos.db")
+    if not os.path.exists(caminho):
+        database.aplicar_migracoes(caminho)
+        with conexao(caminho) as conn:
+            conn.executemany(
+                "INSERT INTO questoes (cargo_id, enunciado, op_a, op_b, op_c, op_d, correta, materia) "
+                "VALUES (1, ?, 'a', 'b', 'c', 'd', 'A', ?)",
+                [(f"Enunciado {i}", MATERIAS[i % 2]) for i in range(4_000)])
+            # Buracos de tamanhos variados: ids isolados e longos intervalos apagados
+            conn.execute("DELETE FROM questoes WHERE id BETWEEN 500 AND 1500 OR id % 7 = 0")
+    contagem = {}
+    with conexao(caminho) as conn:
+        totais = dict(conn.execute("SELECT materia, COUNT(*) FROM questoes GROUP BY materia").fetchall())
+        for _ in range(sorteios):
+            for q in amostrar_questoes(conn, ..., {MATERIAS[0]: 5}, totais, rng):
+                contagem[q[0]] = contagem.get(q[0], 0) + 1
+    media = sorteios * 5 / totais[MATERIAS[0]]
+    return len(contagem), totais[MATERIAS[0]], statistics.pstdev(contagem.values()) / media, media ** -0.5
+
+
+def bench_sorteio(tamanhos=(10_000, 100_000, 1_000_000)):
+    from amostragem import amostrar_do_banco, amostrar_questoes
+
+    config = {m: 5 for m in MATERIAS[:4]}  # 20 questões em 4 matérias, sem filtro de cargo
+    rng = random.Random(20)
+    print(f"{'questões':>10} | {'ORDER BY RANDOM() (ms)':>22} | {'amostragem (ms)':>15} | {'simulado.py (ms)':>16}")
+    for n in tamanhos:
+        caminho = banco_sintetico(n)
+        with conexao(caminho) as conn:
+            antigo = medir(lambda: _sorteio_order_by_random(conn, config))
+            novo = medir(lambda: amostrar_questoes(conn, ..., config, rng=rng))
+            terminal = medir(lambda: amostrar_do_banco(conn, 5, rng))
+        print(f"{n:>10} | {antigo:>22.1f} | {novo:>15.2f} | {terminal:>16.2f}")
+    sorteadas, existentes, variacao, esperada = _vies_com_buracos(rng)
+    print(f"\nCom buracos na numeração: {sorteadas}/{existentes} questões sorteadas ao menos uma vez; "
+          f"coeficiente de variação {variacao:.3f} (uniforme: {esperada:.3f})")
+
+
+# ==============================
+# Estado da sessão do simulado: questões completas x ids + cache compartilhado
+# ==============================
+def _banco_textos(n, nome="textos"):
+    """n questões de um mesmo cargo com textos de tamanho realista (enunciado, alternativas e teoria)"""
+    caminho = os.path.join(_diretorio, f"{nome}_{n}.db")
+    if os.path.exists(caminho):
+        return caminho
+    database.aplicar_migracoes(caminho)
+    with conexao(caminho) as conn:
+        conn.executemany("""
+            INSERT INTO questoes (cargo_id, enunciado, op_a, op_b, op_c, op_d, correta, materia, explicacao_teorica)
+            VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(_texto_questao(i) * 2, *(_texto_questao(i + k)[:80] for k in range(1, 5)), "ABCD"[i % 4],
+               MATERIAS[i % len(MATERIAS)], " ".join(_texto_questao(i + k) for k in range(6)))
+              for i in range(n)])
+    return caminho
+
+
+def bench_sessoes(tamanhos=(100, 1_000), questoes=5_000):
+    """Memória de N sessões simultâneas com simulados de 100 questões do mesmo cargo"""
+    import tracemalloc
+    from array import array
+    from amostragem import amostrar_questoes
+    from cache_questoes import CacheQuestoes
+
+    caminho = _banco_textos(questoes)
+    config = {m: 10 for m in MATERIAS}
+    with conexao(caminho) as conn:
+        totais = dict(conn.execute("SELECT materia, COUNT(*) FROM questoes GROUP BY materia").fetchall())
+    print(f"{'sessões':>8} | {'questões completas (MB)':>23} | {'ids + respostas (MB)':>20} | "
+          f"{'cache (MB)':>10} | {'leitura da questão (µs)':>23}")
+    for n in tamanhos:
+        rng = random.Random(21)
+        with conexao(caminho) as conn:
+            tracemalloc.start()
+            antigas = [amostrar_questoes(conn, 1, config, totais, rng) for _ in range(n)]
+            antigo = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del antigas
+
+            rng = random.Random(21)
+            cache = CacheQuestoes()
+            tracemalloc.start()
+            sessoes = []
+            for _ in range(n):
+                sorteio = amostrar_questoes(conn, 1, config, totais, rng)
+                cache.guardar(sorteio)
+                sessoes.append((array("q", (q[0] for q in sorteio)), bytearray(len(sorteio))))
+                del sorteio
+            total = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            so_sessoes = sum(sys.getsizeof(ids) + sys.getsizeof(resp) for ids, resp in sessoes)
+            leitura = medir(lambda: [cache.obter(conn, [ids[i]]) for ids, _ in sessoes[:100] for i in range(100)])
+        print(f"{n:>8} | {antigo / 2**20:>23.1f} | {so_sessoes / 2**20:>20.2f} | "
+              f"{(total - so_sessoes) / 2**20:>10.1f} | {leitura * 1000 / 10_000:>23.2f}")
+
+
+# ==============================
+# Cache de questões com orçamento em bytes
+# ==============================
+def bench_cache(tamanhos=(2, 8, 32), questoes=50_000, leituras=200_000):
+    """Taxa de acerto e memória do cache para orçamentos em MB, com acessos concentrados (Zipf)"""
+    import itertools
+    import tracemalloc
+    from cache_questoes import CacheQuestoes, invalidar_questoes, obter_cache
+
+    caminho = _banco_textos(questoes)
+    rng = random.Random(22)
+    pesos = list(itertools.accumulate(1 / (i + 1) for i in range(questoes)))
+    acessos = rng.choices(range(1, questoes + 1), cum_weights=pesos, k=leituras)
+    print(f"{'orçamento (MB)':>14} | {'questões':>8} | {'medido (MB)':>11} | {'acertos':>7} | "
+          f"{'despejos':>8} | {'acerto (µs)':>11} | {'falta (µs)':>10}")
+    with conexao(caminho) as conn:
+        for mb in tamanhos:
+            tracemalloc.start()
+            cache = CacheQuestoes(orcamento=mb * 2**20)
+            for qid in acessos:
+                cache.obter(conn, [qid])
+            medido = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            est = cache.estatisticas()
+            presente = next(iter(cache._itens))
+            acerto = medir(lambda: [cache.obter(conn, [presente]) for _ in range(1_000)]) * 1000 / 1_000
+            ausentes = [i for i in range(1, questoes + 1) if i not in cache._itens][:1_000]
+            inicio = time.perf_counter()
+            for qid in ausentes:
+                cache.obter(conn, [qid])
+            falta = (time.perf_counter() - inicio) * 1e6 / len(ausentes)
+            print(f"{mb:>14} | {est['questoes']:>8} | {medido / 2**20:>11.1f} | {est['taxa_acerto']:>7.1%} | "
+                  f"{est['despejos']:>8} | {acerto:>11.2f} | {falta:>10.1f}")
+
+    # Invalidação: a alteração no painel aparece na leitura seguinte
+    # (o cache do processo é descartado no commit de cada bloco)
+    cache = obter_cache(caminho)
+    with conexao(caminho) as conn:
+        antes = cache.obter(conn, [1])[0][8]
+        conn.execute("UPDATE questoes SET explicacao_teorica = 'Nova teoria' WHERE id = 1")
+        invalidar_questoes(conn, [1])
+        durante = cache.obter(conn, [1])[0][8]
+    with conexao(caminho) as conn:
+        depois = cache.obter(conn, [1])[0][8]
+        conn.execute("UPDATE questoes SET explicacao_teorica = ? WHERE id = 1", (antes,))
+        invalidar_questoes(conn, [1])
+    print(f"\nInvalidação após UPDATE: {'ok' if depois == 'Nova teoria' else 'FALHOU'} "
+          f"(antes do commit: {'antiga' if durante == antes else 'nova'})")
+
+
+# ==============================
+# Conteúdo teórico: HTML gerado a cada exibição x gravado ao salvar
+# ==============================
+def _html_por_exibicao(texto):
+    """Implementação anterior da revisão: duas substituições a cada rerun"""
+    return re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', texto).replace('\n', '<br>')
+
+
+def bench_renderizacao(tamanhos=(10_000, 100_000)):
+    from renderizacao import html_teoria, reconstruir_html, renderizar
+
+    # "_" e "**" no endereço do link não viram ênfase dentro do href
+    url = "https://www.planalto.gov.br/ccivil_03/_ato2019-2022/lei_14133.htm#art_5**"
+    gerado = renderizar(f"Veja a [_Lei 14.133_]({url}) e o _art. 5º_")
+    assert f'<a href="{url}" ' in gerado, gerado
+    assert "<em>Lei 14.133</em></a>" in gerado and "<em>art. 5º</em>" in gerado, gerado
+
+    texto = "\n".join(f"**Conceito {i}**: " + _texto_questao(i) for i in range(8)) + \
+        "\n\n- primeiro item\n- segundo item com `código`\n\n" + _texto_questao(99)
+    salvo = renderizar(texto)
+    n = 10_000
+    inicio = time.perf_counter()
+    for _ in range(n):
+        _html_por_exibicao(texto)
+    antigo = (time.perf_counter() - inicio) / n * 1e6
+    inicio = time.perf_counter()
+    for _ in range(n):
+        renderizar(texto)
+    completo = (time.perf_counter() - inicio) / n * 1e6
+    inicio = time.perf_counter()
+    for _ in range(n):
+        html_teoria(texto, salvo)
+    gravado = (time.perf_counter() - inicio) / n * 1e6
+    inicio = time.perf_counter()
+    for _ in range(n):
+        html_teoria(texto)
+    em_cache = (time.perf_counter() - inicio) / n * 1e6
+    print(f"Por exibição ({len(texto)} caracteres): re.sub a cada rerun {antigo:.1f} µs | "
+          f"Markdown seguro {completo:.1f} µs | HTML gravado {gravado:.2f} µs | "
+          f"sem HTML, cache por conteúdo {em_cache:.2f} µs\n")
+
+    print(f"{'questões':>10} | {'preenchimento (s)':>17} | {'questões/s':>10}")
+    for n in tamanhos:
+        caminho = _banco_textos(n)
+        with conexao(caminho) as conn:
+            conn.execute("UPDATE questoes SET explicacao_html = NULL")
+        inicio = time.perf_counter()
+        with conexao(caminho) as conn:
+            total = reconstruir_html(conn)
+        duracao = time.perf_counter() - inicio
+        print(f"{n:>10} | {duracao:>17.2f} | {total / duracao:>10.0f}")
+
+
+# ==============================
+# Comentários (paginação por chave, contagem e fila de escrita)
+# ==============================
+def _comentarios_completos(conn, questao_id):
+    """Implementação anterior: carrega a discussão inteira da questão"""
+    return conn.execute("""
+        SELECT c.id, u.nome, c.comentario, c.data_criacao
+        FROM comentarios_questoes c JOIN usuarios u ON c.usuario_id = u.id
+        WHERE c.questao_id = ? ORDER BY c.data_criacao DESC
+    """, (questao_id,)).fetchall()
+
+
+def bench_comentarios(tamanhos=(1_000, 10_000, 100_000), rajada=2_000, threads=8):
+    """Uma página de uma questão popular (início e fim da discussão) e uma rajada de comentários"""
+    from comentarios import (SQL_INSERIR, adicionar_comentario, comentarios_da_questao,
+                             esvaziar_comentarios, total_comentarios)
+
+    print(f"{'comentários':>11} | {'tudo (ms)':>9} | {'OFFSET fim (ms)':>15} | {'chave 1ª (ms)':>13} | "
+          f"{'chave fim (ms)':>14} | {'COUNT (ms)':>10} | {'contagem (ms)':>13}")
+    for n in tamanhos:
+        caminho = banco_sintetico(1_000, nome=f"comentarios_{n}.db")
+        with conexao(caminho) as conn:
+            if total_comentarios(conn, 1) == 0:
+                conn.execute("INSERT OR IGNORE INTO usuarios (id, nome, senha) VALUES (1, 'aluno', 'x')")
+                # Duas datas por segundo: empates resolvidos pelo id
+                conn.executemany(
+                    "INSERT INTO comentarios_questoes (questao_id, usuario_id, comentario, data_criacao) "
+                    "VALUES (?, 1, ?, datetime('2026-01-01', '+' || ? || ' seconds'))",
+                    ((1 if i % 10 else 2, f"Comentário {i} " + "texto " * 20, i // 2)
+                     for i in range(n)))
+            total = total_comentarios(conn, 1)
+            # Cursor da última página percorrendo as anteriores, como o botão "Próxima"
+            cursor = None
+            while True:
+                _, proximo = comentarios_da_questao(conn, 1, antes_de=cursor)
+                if proximo is None:
+                    break
+                cursor = proximo
+            tudo = medir(lambda: _comentarios_completos(conn, 1))
+            offset = medir(lambda: conn.execute("""
+                SELECT c.id, u.nome, c.comentario, c.data_criacao
+                FROM comentarios_questoes c LEFT JOIN usuarios u ON u.id = c.usuario_id
+                WHERE c.questao_id = ? ORDER BY c.data_criacao DESC, c.id DESC LIMIT 21 OFFSET ?
+            """, (1, max(0, total - 20))).fetchall())
+            primeira = medir(lambda: comentarios_da_questao(conn, 1))
+            fim = medir(lambda: comentarios_da_questao(conn, 1, antes_de=cursor))
+            count = medir(lambda: conn.execute(
+                "SELECT COUNT(*) FROM comentarios_questoes WHERE questao_id = 1").fetchone())
+            contagem = medir(lambda: total_comentarios(conn, 1))
+        print(f"{total:>11} | {tudo:>9.2f} | {offset:>15.2f} | {primeira:>13.3f} | "
+              f"{fim:>14.3f} | {count:>10.2f} | {contagem:>13.3f}")
+
+    # Rajada: várias sessões comentando ao mesmo tempo
+    caminho = banco_sintetico(1_000, nome="comentarios_rajada.db")
+    por_thread = rajada // threads
+
+    def direto(t):
+        for i in range(por_thread):
+            with conexao(caminho) as conn:
+                conn.execute(SQL_INSERIR, (1 + i % 50, 1, f"direto {t}-{i}"))
+
+    def fila(t):
+        for i in range(por_thread):
+            adicionar_comentario(1 + i % 50, 1, f"fila {t}-{i}", db_path=caminho)
+
+    print(f"\nRajada de {rajada} comentários em {threads} threads:")
+    for nome, funcao in (("INSERT + commit direto", direto), ("fila de escrita", fila)):
+        inicio = time.perf_counter()
+        trabalhadores = [threading.Thread(target=funcao, args=(t,)) for t in range(threads)]
+        for t in trabalhadores:
+            t.start()
+        for t in trabalhadores:
+            t.join()
+        enfileirado = (time.perf_counter() - inicio) * 1000
+        esvaziar_comentarios(caminho)
+        gravado = (time.perf_counter() - inicio) * 1000
+        print(f"  {nome:<23} chamadas {enfileirado:>8.1f} ms | gravados {gravado:>8.1f} ms")
+
+
+# ==============================
+# Assinaturas (varredura de expiradas, fim atual e contadores)
+# ==============================
+def _fim_por_varredura(conn, usuario_id, hoje):
+    """Implementação anterior do login: rederiva a expiração pela data a cada consulta"""
+    linha = conn.execute("""
+        SELECT data_fim FROM assinaturas
+        WHERE usuario_id = ? AND status = 'ativa' AND data_fim >= ?
+        ORDER BY data_fim DESC LIMIT 1
+    """, (usuario_id, hoje)).fetchone()
+    return linha[0] if linha else None
+
+
+def _estatisticas_por_varredura(conn, hoje):
+    """Implementação anterior do painel: percorre a tabela inteira"""
+    return conn.execute("""
+        SELECT COUNT(*),
+               COALESCE(SUM(CASE WHEN status = 'ativa' AND data_fim >= ? THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN status = 'ativa' AND data_fim < ? THEN 1 ELSE 0 END), 0)
+        FROM assinaturas
+    """, (hoje, hoje)).fetchone()
+
+
+def bench_assinaturas(tamanhos=(100_000, 1_000_000), por_usuario=5, amostra=2_000):
+    """
+    n assinaturas gravadas como 'ativa' e nunca expiradas (como antes da
+    varredura), com data_fim entre 2 anos atrás e 2 meses à frente. Confere
+    fim atual e contadores contra as consultas antigas antes e depois.
+    """
+    from datetime import date, timedelta
+
+    from assinaturas import contagem_assinaturas, fim_assinatura, varrer_expiradas
+
+    hoje = date.today()
+    print(f"{'assinaturas':>11} | {'gravação (s)':>12} | {'1ª varredura (s)':>16} | {'dia seguinte (ms)':>17} | "
+          f"{'login antigo (µs)':>17} | {'login (µs)':>10} | {'painel antigo (ms)':>18} | {'painel (ms)':>11}")
+    for n in tamanhos:
+        caminho = banco_sintetico(0, nome=f"assinaturas_{n}.db")
+        usuarios = max(1, n // por_usuario)
+        rng = random.Random(25)
+        inicio = time.perf_counter()
+        with conexao(caminho) as conn:
+            linhas = []
+            for _ in range(n):
+                fim = hoje + timedelta(days=rng.randint(-730, 60))
+                linhas.append((rng.randint(1, usuarios), (fim - timedelta(days=30)).isoformat(), fim.isoformat()))
+            conn.executemany("INSERT INTO assinaturas (usuario_id, data_inicio, data_fim, status) "
+                             "VALUES (?, ?, ?, 'ativa')", linhas)
+        gravacao = time.perf_counter() - inicio
+        hoje_txt = hoje.isoformat()
+        ids = rng.sample(range(1, usuarios + 1), min(amostra, usuarios))
+
+        with conexao(caminho) as conn:
+            total, ativas, expiradas = _estatisticas_por_varredura(conn, hoje_txt)
+            esperado = {u: _fim_por_varredura(conn, u, hoje_txt) for u in ids}
+            # Antes da varredura o painel já desconta as vencidas
+            antes = contagem_assinaturas(conn, hoje_txt)
+            if (antes["total"], antes["ativa"], antes["expirada"]) != (total, ativas, expiradas):
+                raise AssertionError(f"contadores antes da varredura {antes} ≠ {(total, ativas, expiradas)}")
+            painel_antigo = medir(lambda: _estatisticas_por_varredura(conn, hoje_txt))
+            inicio = time.perf_counter()
+            for u in ids:
+                _fim_por_varredura(conn, u, hoje_txt)
+            login_antigo = (time.perf_counter() - inicio) / len(ids) * 1e6
+
+        inicio = time.perf_counter()
+        varridas = varrer_expiradas(caminho, hoje_txt)
+        varredura = time.perf_counter() - inicio
+
+        with conexao(caminho) as conn:
+            contagem = contagem_assinaturas(conn, hoje_txt)
+            por_status = dict(conn.execute("SELECT status, COUNT(*) FROM assinaturas GROUP BY status"))
+            erros = []
+            if varridas != expiradas:
+                erros.append(f"varredura expirou {varridas}, esperadas {expiradas}")
+            if (contagem["total"], contagem["ativa"], contagem["expirada"]) != (total, ativas, expiradas):
+                erros.append(f"contadores {contagem} ≠ {(total, ativas, expiradas)}")
+            if {s: contagem[s] for s in por_status} != por_status:
+                erros.append(f"contadores {contagem} ≠ GROUP BY {por_status}")
+            divergentes = [u for u in ids if fim_assinatura(conn, u, hoje_txt) != esperado[u]]
+            if divergentes:
+                erros.append(f"fim atual diverge para {len(divergentes)} usuários (ex.: {divergentes[:5]})")
+            if erros:
+                raise AssertionError("; ".join(erros))
+            painel = medir(lambda: contagem_assinaturas(conn, hoje_txt))
+            inicio = time.perf_counter()
+            for u in ids:
+                fim_assinatura(conn, u, hoje_txt)
+            login = (time.perf_counter() - inicio) / len(ids) * 1e6
+        # Regime normal: só as que vencem de um dia para o outro
+        amanha = (hoje + timedelta(days=1)).isoformat()
+        inicio = time.perf_counter()
+        vencidas_no_dia = varrer_expiradas(caminho, amanha)
+        dia = (time.perf_counter() - inicio) * 1000
+        print(f"{n:>11} | {gravacao:>12.2f} | {varredura:>16.2f} | {dia:>17.2f} | {login_antigo:>17.1f} | "
+              f"{login:>10.1f} | {painel_antigo:>18.1f} | {painel:>11.3f}")
+        print(f"{'':>11}   conferência ok: {ativas} ativas, {expiradas} expiradas, "
+              f"fim atual igual ao antigo em {len(ids)} usuários; {vencidas_no_dia} vencidas no dia seguinte")
+
+
+BENCHMARKS = {
+    "amostragem": bench_amostragem,
+    "catalogo": bench_catalogo,
+    "inicializacao": bench_inicializacao,
+    "coleta": bench_coleta,
+    "gravacao": bench_gravacao,
+    "adaptacao": bench_adaptacao,
+    "deduplicacao": bench_deduplicacao,
+    "similaridade": bench_similaridade,
+    "busca": bench_busca,
+    "listagem": bench_listagem,
+    "importacao": bench_importacao,
+    "respostas": bench_respostas,
+    "desempenho": bench_desempenho,
+    "revisao": bench_revisao,
+    "vistas": bench_vistas,
+    "sorteio": bench_sorteio,
+    "sessoes": bench_sessoes,
+    "cache": bench_cache,
+    "renderizacao": bench_renderizacao,
+    "comentarios": bench_comentarios,
+    "assinaturas": bench_assinaturas,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Uso: python benchmarks.py <nome> [tamanhos...]")
+        print("Disponíveis:", ", ".join(BENCHMARKS))
+        sys.exit(1)
+    tamanhos = [int(t) for t in sys.argv[2:]]
+    if tamanhos:
+        BENCHMARKS[sys.argv[1]](tamanhos)
+    else:
+        BENCHMARKS[sys.argv[1]]()
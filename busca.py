@@ -0,0 +1,137 @@
+"""
+Busca de questões por texto (SQLite FTS5)
+A tabela questoes_fts (migração 6) indexa enunciado, alternativas, conteúdo
+teórico, banca e órgão, sem acentos. A consulta exige todas as palavras
+digitadas (a última, enquanto incompleta, como início de palavra) e todas as
+questões encontradas são ordenadas por BM25, com o enunciado pesando mais que
+as demais colunas; só a página pedida sai do ordenador (ORDER BY ... LIMIT).
+"""
+import json
+
+from amostragem import COLUNAS_QUESTAO
+from similaridade import normalizar
+
+POR_PAGINA = 20
+
+# Pesos do BM25 na ordem das colunas de questoes_fts
+PESOS_BM25 = "10.0, 2.0, 2.0, 2.0, 2.0, 2.0, 1.0, 1.0, 1.0"
+
+# Acima de tantas questões encontradas, só as mais recentes entram no BM25
+# (ver buscar_questoes)
+LIMITE_RANQUEAMENTO = 50_000
+
+TAMANHO_TRECHO = 24  # palavras ao redor do primeiro termo encontrado
+
+
+def termos_busca(texto):
+    """Palavras do texto como o índice as guarda (minúsculas, sem acentos)"""
+    return normalizar(texto or "").split()
+
+
+def _palavra_conhecida(conn, termo):
+    """Se o termo aparece como palavra inteira em alguma questão"""
+    return conn.execute("SELECT 1 FROM questoes_fts WHERE questoes_fts MATCH ? LIMIT 1",
+                        (f'"{termo}"',)).fetchone() is not None
+
+
+def montar_consulta(conn, texto):
+    """
+    Consulta FTS5 que exige todas as palavras do texto, ou None se não houver
+    palavras. A última, se ainda não for uma palavra do índice, vale como
+    início de palavra (busca enquanto se digita).
+    """
+    termos = list(dict.fromkeys(termos_busca(texto)))
+    if not termos:
+        return None
+    consulta = [f'"{t}"' for t in termos]
+    if not _palavra_conhecida(conn, termos[-1]):
+        consulta[-1] += "*"
+    return " ".join(consulta)
+
+
+def destacar(texto, termos, tamanho=TAMANHO_TRECHO):
+    """Trecho do texto ao redor do primeiro termo encontrado, com os termos em **negrito**"""
+    palavras = (texto or "").split()
+    normalizadas = [normalizar(p) for p in palavras]
+    prefixo = termos[-1] if termos else None
+
+    def casa(n):
+        return n and (n in termos or (prefixo and n.startswith(prefixo)))
+
+    primeira = next((i for i, n in enumerate(normalizadas) if casa(n)), 0)
+    inicio = max(0, min(primeira - tamanho // 3, len(palavras) - tamanho))
+    trecho = [f"**{p}**" if casa(n) else p
+              for p, n in zip(palavras[inicio:inicio + tamanho], normalizadas[inicio:inicio + tamanho])]
+    return ("…" if inicio > 0 else "") + " ".join(trecho) + ("…" if inicio + tamanho < len(palavras) else "")
+
+
+def buscar_questoes(conn, texto, pagina=0, por_pagina=POR_PAGINA, cargo_id=..., materia=None,
+                    limite_ranqueamento=LIMITE_RANQUEAMENTO):
+    """
+    Retorna (resultados, tem_mais). Cada resultado é uma tupla
+    (id, materia, cargo_id, trecho do enunciado com os termos em **negrito**).
+    cargo_id=... (padrão) não filtra por cargo; None filtra o banco geral.
+
+    O BM25 é calculado para cada questão encontrada (~2 µs por questão em
+    benchmarks.py busca): até limite_ranqueamento questões (já com os
+    filtros), todas são ranqueadas. Acima disso (palavras presentes em quase
+    todo o banco, como "de"), só as limite_ranqueamento mais recentes entram
+    no ranqueamento: com 1 milhão de questões, ranquear todas as ocorrências
+    de uma palavra comum leva ~1,7 s; com o limite, o p95 fica abaixo de
+    200 ms sem filtro. A consulta não muda (todas as palavras, inclusive o
+    prefixo), só o intervalo de ids. limite_ranqueamento=None ranqueia todas.
+    """
+    consulta = montar_consulta(conn, texto)
+    if consulta is None:
+        return [], False
+    filtros, params = [], []
+    if cargo_id is None:
+        filtros.append("q.cargo_id IS NULL")
+    elif cargo_id is not ...:
+        filtros.append("q.cargo_id = ?")
+        params.append(cargo_id)
+    if materia:
+        filtros.append("q.materia = ?")
+        params.append(materia)
+    if filtros:
+        # CROSS JOIN: percorre o índice de texto e só então consulta questoes
+        base = f"""
+            SELECT q.id FROM questoes_fts CROSS JOIN questoes q ON q.id = questoes_fts.rowid
+            WHERE questoes_fts MATCH ? AND questoes_fts.rowid >= ?{"".join(f" AND {f}" for f in filtros)}
+        """
+    else:
+        base = "SELECT rowid FROM questoes_fts WHERE questoes_fts MATCH ? AND rowid >= ?"
+    inicio = pagina * por_pagina
+
+    menor_id = 0
+    if limite_ranqueamento:
+        # Id da limite-ésima questão encontrada, da mais recente para a mais
+        # antiga (percorre o índice sem calcular o BM25); None = abaixo do limite
+        linha = conn.execute(f"{base} ORDER BY questoes_fts.rowid DESC LIMIT 1 OFFSET ?",
+                             [consulta, 0, *params, max(limite_ranqueamento, inicio + por_pagina + 1) - 1]
+                             ).fetchone()
+        menor_id = linha[0] if linha else 0
+    ids = [qid for (qid,) in conn.execute(
+        f"{base} ORDER BY bm25(questoes_fts, {PESOS_BM25}) LIMIT ? OFFSET ?",
+        [consulta, menor_id, *params, por_pagina + 1, inicio])]
+
+    # Só as questões da página são lidas da tabela
+    pagina_ids = ids[:por_pagina]
+    por_id = {r[0]: r for r in conn.execute("""
+        SELECT id, materia, cargo_id, enunciado FROM questoes
+        WHERE id IN (SELECT value FROM json_each(?))
+    """, (json.dumps(pagina_ids),))}
+    termos = termos_busca(texto)
+    resultados = [(qid, por_id[qid][1], por_id[qid][2], destacar(por_id[qid][3], termos))
+                  for qid in pagina_ids if qid in por_id]
+    return resultados, len(ids) > por_pagina
+
+
+def questoes_por_ids(conn, ids):
+    """Questões completas (mesmo formato de amostrar_questoes), na ordem dos ids"""
+    rows = conn.execute(f"""
+        SELECT {COLUNAS_QUESTAO} FROM questoes
+        WHERE id IN (SELECT value FROM json_each(?))
+    """, (json.dumps(list(ids)),)).fetchall()
+    por_id = {r[0]: r for r in rows}
+    return [por_id[i] for i in ids if i in por_id]
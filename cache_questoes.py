@@ -0,0 +1,204 @@
+"""
+Cache de questões compartilhado pelo processo
+O simulado guarda na sessão só os ids das questões (e as respostas); o texto
+de cada questão é lido daqui quando ela é exibida, assim como nas telas de
+conteúdo teórico e de comentários do painel. Como o cache é um só para todas
+as sessões, N alunos respondendo o mesmo cargo dividem uma única cópia de
+cada questão em vez de N.
+
+É um LRU limitado por ORCAMENTO_BYTES (tamanho estimado dos registros, que
+variam muito com o conteúdo teórico); as questões que não estão nele são
+lidas do banco de uma vez (IN por chave primária) e passam a ocupá-lo.
+Quem altera ou remove questões chama invalidar_questoes(conn, ids), que
+incrementa o contador 'questoes' da tabela contadores e, após o commit,
+descarta os ids no processo; os outros processos conferem esse contador (no
+máximo uma vez por INTERVALO_VERIFICACAO) e esvaziam o cache quando ele muda.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from amostragem import COLUNAS_QUESTAO
+from conexao import apos_commit, conexao, CAMINHO_BANCO
+
+ORCAMENTO_BYTES = 64 * 2**20
+INTERVALO_VERIFICACAO = 1.0  # segundos entre consultas ao contador
+_CUSTO_ENTRADA = 100  # nó do OrderedDict e chave, por questão
+
+
+def tamanho_registro(q):
+    """Bytes estimados de uma questão em memória (tupla + campos)"""
+    return sys.getsizeof(q) + sum(sys.getsizeof(campo) for campo in q) + _CUSTO_ENTRADA
+
+
+def geracao_questoes(conn):
+    try:
+        row = conn.execute("SELECT valor FROM contadores WHERE nome = 'questoes'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+class CacheQuestoes:
+    """LRU de questões no formato de amostrar_questoes, indexadas pelo id"""
+
+    def __init__(self, orcamento=ORCAMENTO_BYTES):
+        self.orcamento = orcamento
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.despejos = 0
+        self.invalidacoes = 0
+        self._itens = OrderedDict()  # id → (questão, bytes)
+        self._trava = threading.Lock()
+        self._versao = 0  # muda a cada descarte: leituras anteriores não entram no cache
+        self._geracao = None
+        self._verificado = 0.0
+
+    def __len__(self):
+        return len(self._itens)
+
+    @property
+    def versao(self):
+        """Tomar antes de ler questões do banco e passar a guardar(..., versao=)"""
+        with self._trava:
+            return self._versao
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                "questoes": len(self._itens), "bytes": self.bytes, "orcamento": self.orcamento,
+                "acertos": self.acertos, "faltas": self.faltas, "despejos": self.despejos,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
+
+    def guardar(self, questoes, versao=None):
+        """
+        Inclui questões já lidas do banco (ex.: as do sorteio). Com versao (a
+        de antes da leitura), não guarda nada se houve descarte no meio.
+        """
+        with self._trava:
+            if versao is not None and versao != self._versao:
+                return
+            for q in questoes:
+                antigo = self._itens.pop(q[0], None)
+                if antigo is not None:
+                    self.bytes -= antigo[1]
+                tamanho = tamanho_registro(q)
+                self._itens[q[0]] = (q, tamanho)
+                self.bytes += tamanho
+            while self.bytes > self.orcamento and self._itens:
+                _, (_, tamanho) = self._itens.popitem(last=False)
+                self.bytes -= tamanho
+                self.despejos += 1
+
+    def obter(self, conn, ids):
+        """Questões dos ids, na mesma ordem (as que não existem mais são omitidas)"""
+        self._conferir_geracao(conn)
+        encontradas, faltam = {}, []
+        with self._trava:
+            versao = self._versao
+            for qid in ids:
+                item = self._itens.get(qid)
+                if item is None:
+                    faltam.append(qid)
+                else:
+                    self._itens.move_to_end(qid)
+                    encontradas[qid] = item[0]
+            self.acertos += len(encontradas)
+            self.faltas += len(faltam)
+        if faltam:
+            lidas = conn.execute(f"""
+                SELECT {COLUNAS_QUESTAO} FROM questoes
+                WHERE id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(faltam),)).fetchall()
+            self.guardar(lidas, versao)
+            encontradas.update((q[0], q) for q in lidas)
+        return [encontradas[qid] for qid in ids if qid in encontradas]
+
+    def descartar(self, ids):
+        with self._trava:
+            self._versao += 1
+            for qid in ids:
+                item = self._itens.pop(qid, None)
+                if item is not None:
+                    self.bytes -= item[1]
+                    self.invalidacoes += 1
+
+    def limpar(self):
+        with self._trava:
+            self._versao += 1
+            self.invalidacoes += len(self._itens)
+            self._itens.clear()
+            self.bytes = 0
+
+    def invalidar_local(self, ids, geracao):
+        """Descarta ids (None = tudo) alterados por este processo, que já deixou o contador em geracao"""
+        if ids is None:
+            self.limpar()
+        else:
+            self.descartar(ids)
+        with self._trava:
+            # A mudança é deste processo: não precisa esvaziar o cache ao vê-la
+            if self._geracao is not None and geracao == self._geracao + 1:
+                self._geracao = geracao
+
+    def _conferir_geracao(self, conn):
+        agora = time.monotonic()
+        if agora - self._verificado < INTERVALO_VERIFICACAO:
+            return
+        self._verificado = agora
+        geracao = geracao_questoes(conn)
+        if self._geracao is not None and geracao != self._geracao:
+            # Outro processo alterou questões: não há como saber quais
+            self.limpar()
+        self._geracao = geracao
+
+
+# {caminho absoluto do banco: CacheQuestoes}
+_caches = {}
+_trava = threading.Lock()
+
+
+def obter_cache(caminho=None):
+    caminho = os.path.abspath(caminho or CAMINHO_BANCO)
+    with _trava:
+        cache = _caches.get(caminho)
+        if cache is None:
+            cache = _caches[caminho] = CacheQuestoes()
+        return cache
+
+
+def questoes_por_id(ids, caminho=None):
+    """Questões completas dos ids, na ordem pedida, lidas do cache compartilhado"""
+    with conexao(caminho) as conn:
+        return obter_cache(caminho).obter(conn, ids)
+
+
+def invalidar_questoes(conn, ids=None):
+    """
+    Chamar após UPDATE/DELETE em questoes, na mesma transação. ids=None
+    descarta todo o cache. O contador muda dentro da transação; o cache deste
+    processo só é descartado depois do commit, senão outra thread poderia
+    reler a versão antiga (ainda confirmada) e guardá-la como atual.
+    Os outros processos esvaziam o deles ao ver o contador mudar.
+    Retorna a nova geração.
+    """
+    try:
+        conn.execute("""
+            INSERT INTO contadores (nome, valor) VALUES ('questoes', 1)
+            ON CONFLICT(nome) DO UPDATE SET valor = valor + 1
+        """)
+    except sqlite3.OperationalError:
+        # Banco ainda sem migrações: não há cache para invalidar
+        return
+    caminho = conn.execute("PRAGMA database_list").fetchone()[2]
+    geracao = geracao_questoes(conn)
+    apos_commit(conn, lambda: obter_cache(caminho).invalidar_local(ids, geracao))
+    return geracao
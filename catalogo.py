@@ -0,0 +1,116 @@
+"""
+Catálogo concurso → cargo → matéria em cache compartilhado pelo processo
+Carregado uma vez e reaproveitado por todas as sessões. Os caminhos que
+inserem ou removem questões chamam invalidar_catalogo(conn), que incrementa
+o contador 'catalogo' da tabela contadores; o cache confere esse contador (no
+máximo uma vez por INTERVALO_VERIFICACAO) e se recarrega quando ele muda.
+"""
+import sqlite3
+import threading
+import time
+
+from conexao import apos_commit, conexao, CAMINHO_BANCO
+
+INTERVALO_VERIFICACAO = 1.0  # segundos entre consultas ao contador
+
+
+class Catalogo:
+    """Árvore de concursos, cargos e matérias, com total de questões por nó"""
+
+    def __init__(self, geracao, concursos, cargos, materias, bancas=()):
+        self.geracao = geracao
+        self.concursos = concursos   # [(id, nome)]
+        self.cargos = cargos         # {concurso_id: [(id, nome)]}
+        self.materias = materias     # {cargo_id: {materia: total}} (None = banco geral)
+        self.bancas = list(bancas)   # bancas distintas, em ordem alfabética
+
+    def totais(self, cargo_id=...):
+        """{materia: total} do cargo (cargo_id=... soma todos os cargos)"""
+        if cargo_id is not ...:
+            return self.materias.get(cargo_id, {})
+        totais = {}
+        for por_cargo in self.materias.values():
+            for materia, total in por_cargo.items():
+                totais[materia] = totais.get(materia, 0) + total
+        return totais
+
+    def todas_materias(self):
+        return sorted({m for por_cargo in self.materias.values() for m in por_cargo if m})
+
+
+def geracao_catalogo(conn):
+    try:
+        row = conn.execute("SELECT valor FROM contadores WHERE nome = 'catalogo'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def invalidar_catalogo(conn):
+    """
+    Marca o catálogo como desatualizado (chamar após inserir/remover questões,
+    na mesma transação); o cache do processo é descartado após o commit.
+    """
+    try:
+        conn.execute("""
+            INSERT INTO contadores (nome, valor) VALUES ('catalogo', 1)
+            ON CONFLICT(nome) DO UPDATE SET valor = valor + 1
+        """)
+    except sqlite3.OperationalError:
+        # Banco ainda sem migrações: não há cache para invalidar
+        return
+    # Só depois do commit: antes dele, outra sessão recarregaria o catálogo
+    # ainda sem as questões da transação e o descarte não teria efeito
+    caminho = _caminho_conexao(conn)
+    apos_commit(conn, lambda: _descartar(caminho))
+
+
+def _descartar(caminho):
+    with _trava:
+        _caches.pop(caminho, None)
+
+
+def _caminho_conexao(conn):
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def carregar_catalogo(conn):
+    geracao = geracao_catalogo(conn)
+    concursos = conn.execute("SELECT id, nome FROM concursos ORDER BY nome").fetchall()
+    cargos = {}
+    for cargo_id, concurso_id, nome in conn.execute(
+            "SELECT id, concurso_id, nome FROM cargos ORDER BY nome"):
+        cargos.setdefault(concurso_id, []).append((cargo_id, nome))
+    materias = {}
+    for cargo_id, materia, total in conn.execute("""
+        SELECT cargo_id, materia, COUNT(*) FROM questoes
+        GROUP BY cargo_id, materia ORDER BY cargo_id, materia
+    """):
+        materias.setdefault(cargo_id, {})[materia] = total
+    bancas = [b for (b,) in conn.execute(
+        "SELECT DISTINCT banca FROM questoes WHERE banca IS NOT NULL AND banca <> '' ORDER BY banca")]
+    return Catalogo(geracao, concursos, cargos, materias, bancas)
+
+
+# {caminho absoluto do banco: (catálogo, instante da última verificação)}
+_caches = {}
+_trava = threading.Lock()
+
+
+def obter_catalogo(caminho=None):
+    """Retorna o catálogo em cache, recarregando se o contador mudou"""
+    caminho = caminho or CAMINHO_BANCO
+    agora = time.monotonic()
+    with conexao(caminho) as conn:
+        chave = _caminho_conexao(conn)
+        with _trava:
+            cache = _caches.get(chave)
+        if cache and agora - cache[1] < INTERVALO_VERIFICACAO:
+            return cache[0]
+        if cache and geracao_catalogo(conn) == cache[0].geracao:
+            catalogo = cache[0]
+        else:
+            catalogo = carregar_catalogo(conn)
+        with _trava:
+            _caches[chave] = (catalogo, agora)
+        return catalogo
@@ -0,0 +1,282 @@
+"""
+Pipeline concorrente de coleta de questões (usado por ScraperQuestoes.processar_urls)
+Etapas ligadas por filas limitadas, cada uma em suas próprias threads:
+  baixar (max_conexoes threads) → extrair → adaptar → gravar (em lote, ver gravacao.py)
+- Cada site tem um balde de tokens: no máximo uma requisição a cada
+  delay_por_host segundos por host, sem travar os demais sites.
+- Falhas de rede, 429 e 5xx são repetidas com espera exponencial.
+- Cada thread de download mantém sua própria requests.Session (conexões
+  keep-alive reaproveitadas).
+As filas limitadas seguram as etapas rápidas quando a seguinte atrasa, então a
+memória fica limitada mesmo com milhares de URLs.
+"""
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from gravacao import GravadorLote
+
+# Marca de fim de fila entre as etapas
+_FIM = object()
+
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+class BaldeTokens:
+    """Limitador por balde de tokens: taxa tokens/s, acumulando até capacidade"""
+
+    def __init__(self, taxa, capacidade=1):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.atualizado = time.monotonic()
+        self.trava = threading.Lock()
+
+    def aguardar(self):
+        while True:
+            with self.trava:
+                agora = time.monotonic()
+                self.tokens = min(self.capacidade, self.tokens + (agora - self.atualizado) * self.taxa)
+                self.atualizado = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.taxa
+            time.sleep(espera)
+
+
+class LimitadorHosts:
+    """Um balde de tokens por host; delay <= 0 desliga o limite"""
+
+    def __init__(self, delay_por_host):
+        self.taxa = 1 / delay_por_host if delay_por_host and delay_por_host > 0 else None
+        self.baldes = {}
+        self.trava = threading.Lock()
+
+    def aguardar(self, url):
+        if self.taxa is None:
+            return
+        host = urlparse(url).netloc
+        with self.trava:
+            balde = self.baldes.get(host)
+            if balde is None:
+                balde = self.baldes[host] = BaldeTokens(self.taxa)
+        balde.aguardar()
+
+
+class ResultadoColeta:
+    def __init__(self):
+        self.sucesso = 0
+        self.erros = 0
+        self.duplicatas = 0
+        self.paginas = 0      # páginas baixadas com sucesso
+        self.tentativas = 0   # requisições feitas, incluindo repetições
+        self.duracao = 0.0
+        self.falha = None     # exceção que derrubou uma etapa (a coleta termina mesmo assim)
+
+    @property
+    def paginas_por_segundo(self):
+        return self.paginas / self.duracao if self.duracao else 0.0
+
+
+class PipelineColeta:
+    def __init__(self, scraper, max_conexoes=8, delay_por_host=2, max_tentativas=3,
+                 espera_base=1.0, tamanho_fila=32, timeout=10, tamanho_lote=500, intervalo_lote=2.0):
+        self.scraper = scraper
+        self.max_conexoes = max_conexoes
+        self.limitador = LimitadorHosts(delay_por_host)
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.tamanho_fila = tamanho_fila
+        self.timeout = timeout
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_lote = intervalo_lote
+        self._local = threading.local()
+        self._trava = threading.Lock()
+
+    def _sessao(self):
+        sessao = getattr(self._local, "sessao", None)
+        if sessao is None:
+            sessao = self._local.sessao = requests.Session()
+            sessao.headers.update(self.scraper.session.headers)
+        return sessao
+
+    def _contar(self, resultado, campo, qtd=1):
+        with self._trava:
+            setattr(resultado, campo, getattr(resultado, campo) + qtd)
+
+    def baixar(self, url, resultado):
+        """Baixa a página respeitando o limite do host; repete falhas temporárias"""
+        sessao = self._sessao()
+        for tentativa in range(self.max_tentativas):
+            self.limitador.aguardar(url)
+            self._contar(resultado, "tentativas")
+            espera = self.espera_base * 2 ** tentativa * (0.5 + random.random())
+            try:
+                response = sessao.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                erro = e
+            else:
+                if response.status_code not in STATUS_REPETIR:
+                    response.raise_for_status()
+                    return response.content
+                erro = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    espera = max(espera, int(retry_after))
+            if tentativa + 1 < self.max_tentativas:
+                time.sleep(espera)
+        raise erro
+
+    # Etapas --------------------------------------------------------------
+    # Uma etapa que falha registra a exceção em resultado.falha e continua
+    # repassando o fim e consumindo a fila de entrada: as etapas anteriores
+    # não travam em put() nem executar() em join().
+    def _falhou(self, resultado, etapa, e):
+        print(f"✗ Falha na etapa {etapa}: {e}")
+        with self._trava:
+            if resultado.falha is None:
+                resultado.falha = e
+
+    @staticmethod
+    def _drenar(fila):
+        while fila.get() is not _FIM:
+            pass
+
+    def _etapa_baixar(self, urls, paginas, resultado):
+        fim = False
+        try:
+            while True:
+                url = urls.get()
+                if url is _FIM:
+                    fim = True
+                    return
+                try:
+                    html = self.baixar(url, resultado)
+                except Exception as e:
+                    print(f"Erro ao extrair questão de {url}: {e}")
+                    self._contar(resultado, "erros")
+                    continue
+                self._contar(resultado, "paginas")
+                paginas.put((url, html))
+        except Exception as e:
+            self._falhou(resultado, "baixar", e)
+        finally:
+            sessao = getattr(self._local, "sessao", None)
+            if sessao is not None:
+                sessao.close()
+            if not fim:
+                self._drenar(urls)
+
+    def _etapa_extrair(self, paginas, questoes, resultado):
+        fim = False
+        try:
+            while True:
+                item = paginas.get()
+                if item is _FIM:
+                    fim = True
+                    return
+                url, html = item
+                try:
+                    questao = self.scraper.extrair_questao_html(html)
+                except Exception as e:
+                    print(f"Erro ao extrair questão de {url}: {e}")
+                    questao = None
+                if questao and questao['enunciado']:
+                    questoes.put((url, questao))
+                else:
+                    self._contar(resultado, "erros")
+        except Exception as e:
+            self._falhou(resultado, "extrair", e)
+        finally:
+            questoes.put(_FIM)
+            if not fim:
+                self._drenar(paginas)
+
+    def _etapa_adaptar(self, questoes, adaptadas, resultado):
+        fim = False
+        try:
+            while True:
+                item = questoes.get()
+                if item is _FIM:
+                    fim = True
+                    return
+                url, questao = item
+                try:
+                    adaptadas.put((url, self.scraper.adaptar_questao(questao)))
+                except Exception as e:
+                    print(f"✗ Erro: {e}")
+                    self._contar(resultado, "erros")
+        except Exception as e:
+            self._falhou(resultado, "adaptar", e)
+        finally:
+            adaptadas.put(_FIM)
+            if not fim:
+                self._drenar(questoes)
+
+    def _etapa_gravar(self, adaptadas, cargo_id, resultado):
+        fim, gravador = False, None
+        try:
+            gravador = GravadorLote(self.scraper.db_path, cargo_id,
+                                    tamanho_lote=self.tamanho_lote, intervalo=self.intervalo_lote)
+            while True:
+                try:
+                    item = adaptadas.get(timeout=self.intervalo_lote)
+                except queue.Empty:
+                    gravador.enviar_se_vencido()
+                    continue
+                if item is _FIM:
+                    fim = True
+                    break
+                gravador.adicionar(item[1])
+            gravador.fechar()
+            if gravador.sucesso:
+                print(f"✓ {gravador.sucesso} questões salvas em {gravador.lotes} lote(s)")
+            if gravador.similares:
+                print(f"⚠ {gravador.similares} parecidas com outras questões: revise com python similaridade.py")
+        except Exception as e:
+            self._falhou(resultado, "gravar", e)
+        finally:
+            if gravador is not None:
+                self._contar(resultado, "sucesso", gravador.sucesso)
+                self._contar(resultado, "erros", gravador.erros)
+                self._contar(resultado, "duplicatas", gravador.duplicatas)
+            if not fim:
+                self._drenar(adaptadas)
+
+    def executar(self, urls, cargo_id=None):
+        """Processa as URLs e retorna um ResultadoColeta (falha: exceção de uma etapa, se houver)"""
+        resultado = ResultadoColeta()
+        inicio = time.perf_counter()
+        fila_urls = queue.Queue(self.tamanho_fila)
+        paginas = queue.Queue(self.tamanho_fila)
+        questoes = queue.Queue(self.tamanho_fila)
+        adaptadas = queue.Queue(self.tamanho_fila)
+
+        baixadores = [threading.Thread(target=self._etapa_baixar, args=(fila_urls, paginas, resultado),
+                                       daemon=True)
+                      for _ in range(self.max_conexoes)]
+        demais = [
+            threading.Thread(target=self._etapa_extrair, args=(paginas, questoes, resultado), daemon=True),
+            threading.Thread(target=self._etapa_adaptar, args=(questoes, adaptadas, resultado), daemon=True),
+            threading.Thread(target=self._etapa_gravar, args=(adaptadas, cargo_id, resultado), daemon=True),
+        ]
+        for t in baixadores + demais:
+            t.start()
+
+        for url in urls:
+            fila_urls.put(url)
+        for _ in baixadores:
+            fila_urls.put(_FIM)
+        for t in baixadores:
+            t.join()
+        paginas.put(_FIM)
+        for t in demais:
+            t.join()
+
+        resultado.duracao = time.perf_counter() - inicio
+        return resultado
@@ -0,0 +1,92 @@
+"""
+Comentários das questões
+  - Paginação por chave: cada página de uma questão pede os comentários
+    anteriores ao último exibido, (data_criacao, id) < (?, ?), percorrendo o
+    índice (questao_id, data_criacao) na ordem; o custo é o mesmo na primeira
+    ou na centésima página. A lista do painel pagina por id.
+  - O total de comentários de cada questão fica em comentarios_contagem
+    (migração 13), mantida por gatilhos: exibir "Comentários (N)" não conta
+    as linhas da questão.
+  - adicionar_comentario só enfileira a linha (fila_escrita.py): uma rajada
+    de comentários vira uma transação por lote em vez de uma por comentário
+    disputando a trava de escrita do SQLite. esvaziar_comentarios espera a
+    gravação quando o autor precisa ver o próprio comentário em seguida.
+"""
+from fila_escrita import obter_fila
+from registros import consultar
+
+POR_PAGINA = 20
+
+SQL_INSERIR = """
+    INSERT INTO comentarios_questoes (questao_id, usuario_id, comentario) VALUES (?, ?, ?)
+"""
+
+
+def adicionar_comentario(questao_id, usuario_id, comentario, db_path=None):
+    """Agenda a gravação do comentário (retorna na hora)"""
+    obter_fila(SQL_INSERIR, db_path).enfileirar((questao_id, usuario_id, comentario))
+
+
+def esvaziar_comentarios(db_path=None, timeout=10.0):
+    """Espera os comentários pendentes serem gravados. Retorna False se estourar o timeout."""
+    return obter_fila(SQL_INSERIR, db_path).esvaziar(timeout)
+
+
+def total_comentarios(conn, questao_id):
+    linha = conn.execute("SELECT total FROM comentarios_contagem WHERE questao_id = ?",
+                         (questao_id,)).fetchone()
+    return linha[0] if linha else 0
+
+
+def comentarios_da_questao(conn, questao_id, antes_de=None, por_pagina=POR_PAGINA):
+    """
+    Retorna (registros, proximo): até por_pagina comentários da questão, dos
+    mais recentes para os mais antigos, anteriores ao cursor antes_de
+    ((data_criacao, id) do último exibido; None = desde o mais recente).
+    Campos: id, usuario, comentario, data_criacao
+    """
+    filtro, params = "", [questao_id]
+    if antes_de is not None:
+        filtro = " AND (c.data_criacao, c.id) < (?, ?)"
+        params += list(antes_de)
+    params.append(por_pagina + 1)
+    registros = consultar(conn, f"""
+        SELECT c.id, u.nome AS usuario, c.comentario, c.data_criacao
+        FROM comentarios_questoes c
+        LEFT JOIN usuarios u ON u.id = c.usuario_id
+        WHERE c.questao_id = ?{filtro}
+        ORDER BY c.data_criacao DESC, c.id DESC
+        LIMIT ?
+    """, params)
+    if len(registros) > por_pagina:
+        ultimo = registros[por_pagina - 1]
+        return registros[:por_pagina], (ultimo.data_criacao, ultimo.id)
+    return registros, None
+
+
+def comentarios_recentes(conn, antes_de=None, por_pagina=POR_PAGINA):
+    """
+    Retorna (registros, proximo) de todos os comentários, do mais recente
+    para o mais antigo, com id < antes_de. Campos: id, questao_id, usuario,
+    comentario, data_criacao
+    """
+    filtro, params = "", []
+    if antes_de is not None:
+        filtro = "WHERE c.id < ?"
+        params.append(antes_de)
+    params.append(por_pagina + 1)
+    registros = consultar(conn, f"""
+        SELECT c.id, c.questao_id, u.nome AS usuario, c.comentario, c.data_criacao
+        FROM comentarios_questoes c
+        LEFT JOIN usuarios u ON u.id = c.usuario_id
+        {filtro}
+        ORDER BY c.id DESC
+        LIMIT ?
+    """, params)
+    if len(registros) > por_pagina:
+        return registros[:por_pagina], registros[por_pagina - 1].id
+    return registros, None
+
+
+def remover_comentario(conn, comentario_id):
+    conn.execute("DELETE FROM comentarios_questoes WHERE id = ?", (comentario_id,))
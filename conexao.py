@@ -0,0 +1,221 @@
+"""
+Camada de conexão com o banco SQLite
+Pool de conexões reaproveitadas entre chamadas, com WAL, pragmas ajustados
+e cache de comandos preparados. Uso:
+
+    from conexao import conexao
+
+    with conexao() as conn:
+        conn.execute("SELECT ...")
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+CAMINHO_BANCO = "banco_questoes.db"
+
+# Conexões ociosas mantidas abertas por banco
+TAMANHO_POOL = 8
+
+# Comandos preparados mantidos em cache por conexão (sqlite3 reaproveita o
+# plano compilado quando o mesmo texto SQL é executado de novo)
+CACHE_COMANDOS = 256
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # ~16 MB de páginas em memória
+    "PRAGMA mmap_size=134217728",    # 128 MB mapeados
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class CursorContado(sqlite3.Cursor):
+    """Cursor que contabiliza os comandos executados na conexão"""
+
+    def execute(self, sql, parametros=()):
+        self.connection.comandos += 1
+        return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        self.connection.comandos += 1
+        return super().executemany(sql, parametros)
+
+    def executescript(self, script):
+        self.connection.comandos += 1
+        return super().executescript(script)
+
+
+class ConexaoPool(sqlite3.Connection):
+    """Conexão do pool com contadores de uso"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.aberta_em = time.time()
+        self.emprestimos = 0
+        self.comandos = 0
+        self.apos_commit = []  # ações adiadas para depois do commit (ver apos_commit())
+
+    def cursor(self, factory=CursorContado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+class PoolConexoes:
+    """Pool de conexões de um arquivo de banco"""
+
+    def __init__(self, caminho, tamanho=TAMANHO_POOL):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self._livres = []
+        self._todas = []
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self.aberturas = 0
+        self.emprestimos = 0
+        self.reusos = 0
+
+    def _abrir(self):
+        conn = sqlite3.connect(
+            self.caminho,
+            check_same_thread=False,
+            cached_statements=CACHE_COMANDOS,
+            factory=ConexaoPool,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _emprestar(self):
+        with self._trava:
+            self.emprestimos += 1
+            if self._livres:
+                self.reusos += 1
+                conn = self._livres.pop()
+                conn.emprestimos += 1
+                return conn
+            self.aberturas += 1
+        conn = self._abrir()
+        conn.emprestimos += 1
+        with self._trava:
+            self._todas.append(conn)
+        return conn
+
+    def _devolver(self, conn):
+        with self._trava:
+            if len(self._livres) < self.tamanho:
+                self._livres.append(conn)
+                return
+            self._todas.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def conexao(self):
+        """
+        Empresta uma conexão para a thread atual. Chamadas aninhadas na mesma
+        thread reaproveitam a conexão já emprestada. Ao sair do bloco mais
+        externo, faz commit (ou rollback em caso de erro), devolve ao pool e
+        executa as ações registradas com apos_commit.
+        """
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._emprestar()
+        local.conn = conn
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.apos_commit.clear()
+            raise
+        finally:
+            local.conn = None
+            acoes, conn.apos_commit = conn.apos_commit, []
+            self._devolver(conn)
+        for acao in acoes:
+            acao()
+
+    def estatisticas(self):
+        """Contadores do pool e de cada conexão aberta"""
+        agora = time.time()
+        with self._trava:
+            conexoes = [
+                {
+                    "conexao": i + 1,
+                    "emprestimos": c.emprestimos,
+                    "comandos": c.comandos,
+                    "idade_s": round(agora - c.aberta_em, 1),
+                }
+                for i, c in enumerate(self._todas)
+            ]
+            return {
+                "aberturas": self.aberturas,
+                "emprestimos": self.emprestimos,
+                "reusos": self.reusos,
+                "livres": len(self._livres),
+                "conexoes": conexoes,
+            }
+
+    def fechar(self):
+        with self._trava:
+            for conn in self._todas:
+                conn.close()
+            self._todas.clear()
+            self._livres.clear()
+
+
+_pools = {}
+_trava_pools = threading.Lock()
+
+
+def obter_pool(caminho=None):
+    """Retorna (criando se preciso) o pool do arquivo de banco"""
+    caminho = caminho or CAMINHO_BANCO
+    with _trava_pools:
+        pool = _pools.get(caminho)
+        if pool is None:
+            pool = _pools[caminho] = PoolConexoes(caminho)
+        return pool
+
+
+def conexao(caminho=None):
+    """Atalho para obter_pool(caminho).conexao()"""
+    return obter_pool(caminho).conexao()
+
+
+def apos_commit(conn, acao):
+    """
+    Executa acao() quando o bloco `with conexao()` mais externo terminar com
+    commit; em rollback ela é descartada. Fora do pool, executa na hora.
+    """
+    if isinstance(conn, ConexaoPool):
+        conn.apos_commit.append(acao)
+    else:
+        acao()
+
+
+def estatisticas(caminho=None):
+    return obter_pool(caminho).estatisticas()
+
+
+def fechar_pools():
+    with _trava_pools:
+        for pool in _pools.values():
+            pool.fechar()
+        _pools.clear()
@@ -1,10 +1,14 @@
-import sqlite3
+"""
+Schema do banco e migrações versionadas
+Cada migração roda uma única vez por banco; a versão aplicada fica na tabela
+schema_version. Para alterar o schema, acrescente um passo ao fim de MIGRACOES.
+Execute: python database.py [--verificar-indices]
+"""
+import sys
+from conexao import conexao, CAMINHO_BANCO
 
-def criar_tabela():
-    # Conecta ao banco (cria o arquivo se ele não existir)
-    conexao = sqlite3.connect('banco_questoes.db')
-    cursor = conexao.cursor()
 
+def _migracao_tabelas_base(cursor):
     # Tabela de usuários (precisa existir antes de admins)
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS usuarios (
@@ -92,47 +96,7 @@ def criar_tabela():
     )
     ''')
 
-    # Colunas novas (se a tabela já existir sem elas)
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN cargo_id INTEGER')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN explicacao_teorica TEXT')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN banca TEXT')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN ano INTEGER')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN orgao TEXT')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN origem TEXT DEFAULT "manual"')
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cursor.execute('ALTER TABLE questoes ADD COLUMN hash_enunciado TEXT')
-    except sqlite3.OperationalError:
-        pass
-
-    conexao.commit()
-    conexao.close()
-    print("Sucesso: Arquivo 'banco_questoes.db' e tabelas criados!")
-
-if __name__ == "__main__":
-    criar_tabela()
-
-def criar_tabela_historico():
-    conexao = sqlite3.connect('banco_questoes.db')
-    cursor = conexao.cursor()
-    # Cria uma tabela para guardar cada simulado feito
+    # Tabela para guardar cada simulado feito
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS historico (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -142,9 +106,505 @@ def criar_tabela_historico():
         percentual REAL
     )
     ''')
-    conexao.commit()
-    conexao.close()
+
+
+def _migracao_colunas_questoes(cursor):
+    # Colunas novas (bancos antigos criados sem elas)
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(questoes)")}
+    novas = [
+        ("cargo_id", "INTEGER"),
+        ("explicacao_teorica", "TEXT"),
+        ("banca", "TEXT"),
+        ("ano", "INTEGER"),
+        ("orgao", "TEXT"),
+        ("origem", "TEXT DEFAULT 'manual'"),
+        ("hash_enunciado", "TEXT"),
+    ]
+    for nome, tipo in novas:
+        if nome not in colunas:
+            cursor.execute(f"ALTER TABLE questoes ADD COLUMN {nome} {tipo}")
+
+
+def _migracao_indices(cursor):
+    # Índices dos filtros mais usados pelo app
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questoes_cargo_materia ON questoes(cargo_id, materia)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questoes_hash ON questoes(hash_enunciado)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_assinaturas_usuario ON assinaturas(usuario_id, status, data_fim)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_comentarios_questao ON comentarios_questoes(questao_id, data_criacao)")
+
+
+def _migracao_contadores(cursor):
+    # Contadores globais (ex.: geração do catálogo, incrementada a cada escrita em questoes)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS contadores (
+        nome TEXT PRIMARY KEY,
+        valor INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+
+
+def _migracao_similaridade(cursor):
+    # Assinaturas MinHash e chaves LSH dos enunciados (ver similaridade.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS lsh_assinaturas (
+        questao_id INTEGER PRIMARY KEY,
+        assinatura BLOB NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS lsh_bandas (
+        chave INTEGER NOT NULL,
+        questao_id INTEGER NOT NULL,
+        PRIMARY KEY (chave, questao_id)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bandas_questao ON lsh_bandas(questao_id)")
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_questoes_lsh_delete AFTER DELETE ON questoes
+    BEGIN
+        DELETE FROM lsh_assinaturas WHERE questao_id = old.id;
+        DELETE FROM lsh_bandas WHERE questao_id = old.id;
+    END
+    ''')
+
+
+COLUNAS_BUSCA = ("enunciado", "op_a", "op_b", "op_c", "op_d", "op_e", "explicacao_teorica", "banca", "orgao")
+
+
+def _migracao_busca(cursor):
+    # Índice de texto completo (FTS5) sobre questoes, mantido por gatilhos.
+    # Conteúdo externo: o texto fica só em questoes; remove_diacritics faz
+    # "licitacao" encontrar "licitação"; prefix='2 3' agiliza a busca por
+    # palavras ainda incompletas.
+    colunas = ", ".join(COLUNAS_BUSCA)
+    novos = ", ".join(f"new.{c}" for c in COLUNAS_BUSCA)
+    antigos = ", ".join(f"old.{c}" for c in COLUNAS_BUSCA)
+    cursor.execute(f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS questoes_fts USING fts5(
+        {colunas},
+        content='questoes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_questoes_fts_insert AFTER INSERT ON questoes
+    BEGIN
+        INSERT INTO questoes_fts (rowid, {colunas}) VALUES (new.id, {novos});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_questoes_fts_delete AFTER DELETE ON questoes
+    BEGIN
+        INSERT INTO questoes_fts (questoes_fts, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_questoes_fts_update AFTER UPDATE OF {colunas} ON questoes
+    BEGIN
+        INSERT INTO questoes_fts (questoes_fts, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+        INSERT INTO questoes_fts (rowid, {colunas}) VALUES (new.id, {novos});
+    END
+    ''')
+    # Indexa as questões já existentes
+    cursor.execute("INSERT INTO questoes_fts (questoes_fts) VALUES ('rebuild')")
+
+
+def _migracao_listagem(cursor):
+    # Paginação por chave (WHERE id < ? ORDER BY id DESC) com filtro: cada
+    # índice já entrega as questões do filtro em ordem de id
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questoes_origem_id ON questoes(origem, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questoes_materia_id ON questoes(materia, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questoes_banca_id ON questoes(banca, id)")
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_questoes_sem_teoria ON questoes(id)
+    WHERE explicacao_teorica IS NULL OR explicacao_teorica = ''
+    ''')
+
+
+def _migracao_respostas(cursor):
+    # Uma linha por resposta dada em um simulado (gravadas pela fila de escrita)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS respostas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL,
+        questao_id INTEGER NOT NULL,
+        simulado_id TEXT NOT NULL,
+        alternativa TEXT,
+        acertou INTEGER NOT NULL,
+        tempo_gasto REAL,
+        data_resposta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+        FOREIGN KEY (questao_id) REFERENCES questoes(id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_respostas_usuario ON respostas(usuario_id, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_respostas_simulado ON respostas(simulado_id)")
+
+
+SQL_RECONSTRUIR_DESEMPENHO = '''
+    INSERT OR REPLACE INTO desempenho
+        (usuario_id, cargo_id, materia, tentativas, acertos, tempo_total, ultima_resposta)
+    SELECT r.usuario_id, IFNULL(q.cargo_id, 0), q.materia, COUNT(*), SUM(r.acertou),
+           SUM(IFNULL(r.tempo_gasto, 0)), MAX(r.data_resposta)
+    FROM respostas r JOIN questoes q ON q.id = r.questao_id
+    GROUP BY r.usuario_id, IFNULL(q.cargo_id, 0), q.materia
+'''
+
+
+def _migracao_desempenho(cursor):
+    # Estatísticas materializadas por usuário × cargo × matéria (cargo 0 = banco
+    # geral), atualizadas pelo gatilho a cada resposta gravada
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS desempenho (
+        usuario_id INTEGER NOT NULL,
+        cargo_id INTEGER NOT NULL,
+        materia TEXT NOT NULL,
+        tentativas INTEGER NOT NULL,
+        acertos INTEGER NOT NULL,
+        tempo_total REAL NOT NULL,
+        ultima_resposta TIMESTAMP,
+        PRIMARY KEY (usuario_id, cargo_id, materia)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_respostas_desempenho AFTER INSERT ON respostas
+    BEGIN
+        INSERT INTO desempenho (usuario_id, cargo_id, materia, tentativas, acertos, tempo_total, ultima_resposta)
+        SELECT new.usuario_id, IFNULL(q.cargo_id, 0), q.materia, 1, new.acertou,
+               IFNULL(new.tempo_gasto, 0), new.data_resposta
+        FROM questoes q WHERE q.id = new.questao_id
+        ON CONFLICT (usuario_id, cargo_id, materia) DO UPDATE SET
+            tentativas = tentativas + 1,
+            acertos = acertos + excluded.acertos,
+            tempo_total = tempo_total + excluded.tempo_total,
+            ultima_resposta = MAX(ultima_resposta, excluded.ultima_resposta);
+    END
+    ''')
+    # Respostas gravadas antes desta migração
+    cursor.execute(SQL_RECONSTRUIR_DESEMPENHO)
+
+
+# Leitner: acerto sobe uma caixa (até CAIXA_MAXIMA), erro volta à caixa 0; a
+# próxima revisão fica 2^caixa dias depois da resposta (1, 2, 4 ... 64 dias)
+CAIXA_MAXIMA = 6
+
+_REVISAO_NOVA_CAIXA = f"CASE WHEN excluded.acertos THEN MIN(caixa + 1, {CAIXA_MAXIMA}) ELSE 0 END"
+
+_REVISAO_UPSERT = f'''
+        ON CONFLICT (usuario_id, questao_id) DO UPDATE SET
+            caixa = {_REVISAO_NOVA_CAIXA},
+            acertos = acertos + excluded.acertos,
+            erros = erros + excluded.erros,
+            ultima_vista = excluded.ultima_vista,
+            proxima_revisao = datetime(excluded.ultima_vista,
+                                       '+' || (1 << {_REVISAO_NOVA_CAIXA}) || ' days')
+'''
+
+# Reaplica o histórico em ordem: cada linha do SELECT passa pelo upsert como
+# se a resposta tivesse acabado de ser gravada
+SQL_RECONSTRUIR_REVISAO = f'''
+    INSERT INTO revisao
+        (usuario_id, questao_id, cargo_id, materia, caixa, acertos, erros, ultima_vista, proxima_revisao)
+    SELECT r.usuario_id, r.questao_id, IFNULL(q.cargo_id, 0), q.materia, r.acertou, r.acertou,
+           1 - r.acertou, r.data_resposta, datetime(r.data_resposta, '+' || (1 << r.acertou) || ' days')
+    FROM respostas r JOIN questoes q ON q.id = r.questao_id
+    WHERE true
+    ORDER BY r.id
+    {_REVISAO_UPSERT}
+'''
+
+
+def _migracao_revisao(cursor):
+    # Agenda de revisão espaçada por usuário × questão respondida. O índice
+    # põe as questões de cada matéria em ordem de vencimento: as próximas k
+    # revisões são um intervalo contíguo dele
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS revisao (
+        usuario_id INTEGER NOT NULL,
+        questao_id INTEGER NOT NULL,
+        cargo_id INTEGER NOT NULL,
+        materia TEXT NOT NULL,
+        caixa INTEGER NOT NULL,
+        acertos INTEGER NOT NULL,
+        erros INTEGER NOT NULL,
+        ultima_vista TIMESTAMP NOT NULL,
+        proxima_revisao TIMESTAMP NOT NULL,
+        PRIMARY KEY (usuario_id, questao_id)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute("""CREATE INDEX IF NOT EXISTS idx_revisao_vencimento
+                      ON revisao(usuario_id, cargo_id, materia, proxima_revisao)""")
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_respostas_revisao AFTER INSERT ON respostas
+    BEGIN
+        INSERT INTO revisao
+            (usuario_id, questao_id, cargo_id, materia, caixa, acertos, erros, ultima_vista, proxima_revisao)
+        SELECT new.usuario_id, new.questao_id, IFNULL(q.cargo_id, 0), q.materia, new.acertou, new.acertou,
+               1 - new.acertou, new.data_resposta,
+               datetime(new.data_resposta, '+' || (1 << new.acertou) || ' days')
+        FROM questoes q WHERE q.id = new.questao_id
+        {_REVISAO_UPSERT};
+    END
+    ''')
+    # Respostas gravadas antes desta migração
+    cursor.execute(SQL_RECONSTRUIR_REVISAO)
+
+
+def _migracao_vistas(cursor):
+    # Questões já servidas a cada usuário, como um conjunto compacto
+    # serializado (vistas.py); total evita desserializar só para contar.
+    # usuario_id 0 é o aplicativo de desktop, que não tem login
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS vistas (
+        usuario_id INTEGER PRIMARY KEY,
+        conjunto BLOB NOT NULL,
+        total INTEGER NOT NULL
+    )
+    ''')
+
+
+def _migracao_html_teoria(cursor):
+    # HTML do conteúdo teórico, gerado ao salvar (renderizacao.py). Se o texto
+    # mudar sem o HTML junto (importação, outro script), o gatilho o anula e
+    # ele volta a ser renderizado na hora até o próximo preenchimento
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(questoes)")}
+    if "explicacao_html" not in colunas:
+        cursor.execute("ALTER TABLE questoes ADD COLUMN explicacao_html TEXT")
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_questoes_html_desatualizado
+    AFTER UPDATE OF explicacao_teorica ON questoes
+    WHEN new.explicacao_teorica IS NOT old.explicacao_teorica
+         AND new.explicacao_html IS old.explicacao_html
+    BEGIN
+        UPDATE questoes SET explicacao_html = NULL WHERE id = new.id;
+    END
+    ''')
+
+
+def _migracao_comentarios_contagem(cursor):
+    # Total de comentários por questão, mantido por gatilhos (comentarios.py):
+    # o título da discussão não precisa contar as linhas da questão
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS comentarios_contagem (
+        questao_id INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_comentarios_contagem_inserir AFTER INSERT ON comentarios_questoes
+    BEGIN
+        INSERT INTO comentarios_contagem (questao_id, total) VALUES (new.questao_id, 1)
+        ON CONFLICT (questao_id) DO UPDATE SET total = total + 1;
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_comentarios_contagem_remover AFTER DELETE ON comentarios_questoes
+    BEGIN
+        UPDATE comentarios_contagem SET total = total - 1 WHERE questao_id = old.questao_id;
+        DELETE FROM comentarios_contagem WHERE questao_id = old.questao_id AND total <= 0;
+    END
+    ''')
+    # Comentários gravados antes desta migração
+    cursor.execute('''
+    INSERT OR REPLACE INTO comentarios_contagem (questao_id, total)
+    SELECT questao_id, COUNT(*) FROM comentarios_questoes GROUP BY questao_id
+    ''')
+
+
+def _migracao_assinaturas(cursor):
+    # Expiração em lote (assinaturas.py): a varredura lê só as ativas já
+    # vencidas, um intervalo de idx_assinaturas_vencimento
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_assinaturas_vencimento ON assinaturas(status, data_fim)")
+    # As que venceram antes desta migração, antes dos gatilhos existirem
+    cursor.execute('''
+    UPDATE assinaturas SET status = 'expirada'
+    WHERE status = 'ativa' AND data_fim < date('now', 'localtime')
+    ''')
+    # Fim da assinatura ativa mais longa de cada usuário: o login lê uma
+    # linha pela chave. A varredura não mexe nela (a data já passou e a
+    # leitura compara com hoje); as demais mudanças recalculam o usuário
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS assinatura_atual (
+        usuario_id INTEGER PRIMARY KEY,
+        data_fim DATE NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    recalcular = '''
+        DELETE FROM assinatura_atual WHERE usuario_id = {u}.usuario_id;
+        INSERT INTO assinatura_atual (usuario_id, data_fim)
+        SELECT usuario_id, MAX(data_fim) FROM assinaturas
+        WHERE usuario_id = {u}.usuario_id AND status = 'ativa' GROUP BY usuario_id;
+    '''
+    # Quantas assinaturas há em cada status, em contadores ('assinaturas_<status>')
+    contar = '''
+        INSERT INTO contadores (nome, valor) VALUES ('assinaturas_' || {u}.status, {d})
+        ON CONFLICT (nome) DO UPDATE SET valor = valor + {d};
+    '''
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assinaturas_inserir AFTER INSERT ON assinaturas
+    BEGIN
+        INSERT INTO assinatura_atual (usuario_id, data_fim)
+        SELECT new.usuario_id, new.data_fim WHERE new.status = 'ativa'
+        ON CONFLICT (usuario_id) DO UPDATE SET data_fim = MAX(data_fim, excluded.data_fim);
+        {contar.format(u="new", d=1)}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assinaturas_status AFTER UPDATE OF status ON assinaturas
+    WHEN new.status IS NOT old.status
+    BEGIN
+        {contar.format(u="old", d=-1)}
+        {contar.format(u="new", d=1)}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assinaturas_atualizar AFTER UPDATE OF usuario_id, status, data_fim ON assinaturas
+    WHEN NOT (old.status = 'ativa' AND new.status = 'expirada' AND new.data_fim IS old.data_fim
+              AND new.usuario_id IS old.usuario_id)
+    BEGIN
+        {recalcular.format(u="old")}
+        {recalcular.format(u="new")}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_assinaturas_remover AFTER DELETE ON assinaturas
+    BEGIN
+        {recalcular.format(u="old")}
+        {contar.format(u="old", d=-1)}
+    END
+    ''')
+    # Assinaturas gravadas antes desta migração
+    cursor.execute('''
+    INSERT OR REPLACE INTO assinatura_atual (usuario_id, data_fim)
+    SELECT usuario_id, MAX(data_fim) FROM assinaturas WHERE status = 'ativa' GROUP BY usuario_id
+    ''')
+    cursor.execute('''
+    INSERT OR REPLACE INTO contadores (nome, valor)
+    SELECT 'assinaturas_' || status, COUNT(*) FROM assinaturas GROUP BY status
+    ''')
+
+
+# (versão, descrição, função) — sempre em ordem crescente de versão
+MIGRACOES = [
+    (1, "Tabelas base", _migracao_tabelas_base),
+    (2, "Colunas de metadados em questoes", _migracao_colunas_questoes),
+    (3, "Índices dos filtros mais usados", _migracao_indices),
+    (4, "Tabela de contadores", _migracao_contadores),
+    (5, "Índice de similaridade (MinHash/LSH)", _migracao_similaridade),
+    (6, "Busca de texto completo (FTS5)", _migracao_busca),
+    (7, "Índices da listagem paginada do admin", _migracao_listagem),
+    (8, "Registro de respostas por usuário", _migracao_respostas),
+    (9, "Estatísticas de desempenho materializadas", _migracao_desempenho),
+    (10, "Agenda de revisão espaçada", _migracao_revisao),
+    (11, "Conjunto de questões vistas por usuário", _migracao_vistas),
+    (12, "HTML do conteúdo teórico", _migracao_html_teoria),
+    (13, "Contagem de comentários por questão", _migracao_comentarios_contagem),
+    (14, "Expiração e fim atual das assinaturas", _migracao_assinaturas),
+]
+
+# Bancos já migrados neste processo (evita reconsultar a versão a cada rerun)
+_migrados = set()
+
+
+def versao_schema(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        versao INTEGER PRIMARY KEY,
+        descricao TEXT NOT NULL,
+        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+
+
+def aplicar_migracoes(caminho=None):
+    """Aplica as migrações pendentes. Retorna a lista de versões aplicadas."""
+    caminho = caminho or CAMINHO_BANCO
+    if caminho in _migrados:
+        return []
+    aplicadas = []
+    with conexao(caminho) as conn:
+        if conn.in_transaction:
+            conn.commit()
+        atual = versao_schema(conn)
+        for versao, descricao, migracao in MIGRACOES:
+            if versao <= atual:
+                continue
+            # BEGIN IMMEDIATE trava a escrita: outro processo migrando ao mesmo
+            # tempo espera e depois enxerga a versão já aplicada
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if versao <= versao_schema(conn):
+                    conn.rollback()
+                    continue
+                migracao(conn.cursor())
+                conn.execute(
+                    "INSERT INTO schema_version (versao, descricao) VALUES (?, ?)",
+                    (versao, descricao)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append(versao)
+    _migrados.add(caminho)
+    return aplicadas
+
+
+# Consultas quentes do app e o índice que cada uma deve usar
+CONSULTAS_QUENTES = [
+    ("questões por cargo e matéria",
+     "SELECT id FROM questoes WHERE cargo_id = ? AND materia = ?", (1, "Português")),
+    ("duplicata por hash",
+     "SELECT id FROM questoes WHERE hash_enunciado = ?", ("x",)),
+    ("assinatura ativa",
+     "SELECT data_fim FROM assinatura_atual WHERE usuario_id = ? AND data_fim >= ?", (1, "2026-01-01")),
+    ("assinaturas vencidas",
+     "SELECT id FROM assinaturas WHERE status = 'ativa' AND data_fim < ? LIMIT 5000", ("2026-01-01",)),
+    ("comentários da questão",
+     "SELECT id, comentario FROM comentarios_questoes WHERE questao_id = ? "
+     "AND (data_criacao, id) < (?, ?) ORDER BY data_criacao DESC, id DESC LIMIT 21",
+     (1, "2026-01-01 00:00:00", 1000)),
+    ("revisões vencidas",
+     "SELECT questao_id FROM revisao WHERE usuario_id = ? AND cargo_id = ? AND materia = ? "
+     "AND proxima_revisao <= ? ORDER BY proxima_revisao LIMIT 10", (1, 1, "Português", "2026-01-01")),
+]
+
+
+def verificar_indices(caminho=None):
+    """
+    Roda EXPLAIN QUERY PLAN nas consultas quentes.
+    Retorna lista de (nome, usa_indice, plano).
+    """
+    resultado = []
+    with conexao(caminho) as conn:
+        for nome, sql, params in CONSULTAS_QUENTES:
+            plano = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            usa_indice = all("USING" in passo for passo in plano if passo.startswith(("SCAN", "SEARCH")))
+            usa_indice = usa_indice and not any("TEMP B-TREE" in passo for passo in plano)
+            resultado.append((nome, usa_indice, " | ".join(plano)))
+    return resultado
+
+
+def criar_tabela(caminho=None):
+    # Conecta ao banco (cria o arquivo se ele não existir) e aplica as migrações
+    aplicadas = aplicar_migracoes(caminho)
+    if aplicadas:
+        print(f"Migrações aplicadas: {aplicadas}")
+    print(f"Sucesso: Arquivo '{caminho or CAMINHO_BANCO}' e tabelas criados!")
+
+
+def criar_tabela_historico():
+    # A tabela historico faz parte das tabelas base
+    aplicar_migracoes()
     print("Tabela de histórico pronta!")
 
+
 if __name__ == "__main__":
-    criar_tabela_historico()
\ No newline at end of file
+    criar_tabela()
+    if "--verificar-indices" in sys.argv:
+        falhas = 0
+        for nome, usa_indice, plano in verificar_indices():
+            print(f"{'✓' if usa_indice else '✗'} {nome}: {plano}")
+            falhas += not usa_indice
+        sys.exit(1 if falhas else 0)
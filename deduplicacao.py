@@ -0,0 +1,105 @@
+"""
+Detecção e limpeza de questões duplicadas (mesmo hash_enunciado)
+Tudo em operações de conjunto:
+  - hashes faltantes são calculados em blocos e gravados com executemany
+  - uma passada com ROW_NUMBER() por hash escolhe a sobrevivente de cada grupo
+    (prioridade pela origem: scraping antes de manual; depois o menor id)
+  - as perdedoras manuais são removidas em um único DELETE
+Com simular=True nada é alterado: apenas o relatório é montado.
+"""
+import hashlib
+import json
+import re
+
+from catalogo import invalidar_catalogo
+from cache_questoes import invalidar_questoes
+
+BLOCO_HASHES = 10_000
+_ESPACOS = re.compile(r'\s+')
+
+# Menor valor = maior prioridade para sobreviver
+PRIORIDADE_ORIGEM = "CASE origem WHEN 'scraping' THEN 0 WHEN 'manual' THEN 2 ELSE 1 END"
+
+SQL_PERDEDORAS = f"""
+    WITH grupos AS (
+        SELECT hash_enunciado FROM questoes
+        WHERE hash_enunciado IS NOT NULL
+        GROUP BY hash_enunciado HAVING COUNT(*) > 1
+    ),
+    ranqueadas AS (
+        SELECT q.id, q.hash_enunciado, q.origem,
+               ROW_NUMBER() OVER grupo AS ordem,
+               FIRST_VALUE(q.id) OVER grupo AS sobrevivente
+        FROM questoes q JOIN grupos g ON g.hash_enunciado = q.hash_enunciado
+        WINDOW grupo AS (PARTITION BY q.hash_enunciado ORDER BY {PRIORIDADE_ORIGEM}, q.id)
+    )
+    SELECT id, hash_enunciado, sobrevivente FROM ranqueadas
+    WHERE ordem > 1 AND origem = 'manual'
+"""
+
+
+def gerar_hash_enunciado(texto):
+    """Hash do enunciado (minúsculas, espaços normalizados) para detectar duplicatas"""
+    texto_limpo = _ESPACOS.sub(' ', texto.lower().strip())
+    return hashlib.md5(texto_limpo.encode()).hexdigest()
+
+
+class RelatorioDuplicatas:
+    def __init__(self, grupos, removidas, exemplos, simulado):
+        self.grupos = grupos          # hashes com mais de uma questão
+        self.removidas = removidas    # questões manuais removidas (ou a remover)
+        self.exemplos = exemplos      # [(hash, id sobrevivente, [ids removidos])]
+        self.simulado = simulado
+
+    def __str__(self):
+        verbo = "Seriam removidas" if self.simulado else "Removidas"
+        linhas = [f"{self.grupos} grupos de duplicatas; {verbo} {self.removidas} questões manuais"]
+        for hash_enunciado, sobrevivente, ids in self.exemplos:
+            linhas.append(f"  {hash_enunciado[:12]}…: mantém {sobrevivente}, remove {ids}")
+        return "\n".join(linhas)
+
+
+def preencher_hashes(conn, gerar_hash=gerar_hash_enunciado, bloco=BLOCO_HASHES):
+    """Calcula hash_enunciado das questões sem hash (marcadas como manuais). Retorna quantas."""
+    total = 0
+    ultimo_id = 0
+    while True:
+        linhas = conn.execute("""
+            SELECT id, enunciado FROM questoes
+            WHERE hash_enunciado IS NULL AND id > ? ORDER BY id LIMIT ?
+        """, (ultimo_id, bloco)).fetchall()
+        if not linhas:
+            return total
+        conn.executemany(
+            "UPDATE questoes SET hash_enunciado = ?, origem = 'manual' WHERE id = ?",
+            [(gerar_hash(enunciado), qid) for qid, enunciado in linhas]
+        )
+        total += len(linhas)
+        ultimo_id = linhas[-1][0]
+
+
+def remover_duplicatas(conn, simular=False, max_exemplos=10):
+    """Remove as questões manuais que não sobrevivem em seu grupo de duplicatas"""
+    perdedoras = conn.execute(SQL_PERDEDORAS).fetchall()
+    grupos = conn.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM questoes WHERE hash_enunciado IS NOT NULL
+            GROUP BY hash_enunciado HAVING COUNT(*) > 1
+        )
+    """).fetchone()[0]
+
+    exemplos = {}
+    for qid, hash_enunciado, sobrevivente in perdedoras:
+        if hash_enunciado in exemplos or len(exemplos) < max_exemplos:
+            exemplos.setdefault(hash_enunciado, (sobrevivente, []))[1].append(qid)
+
+    if perdedoras and not simular:
+        conn.execute("DELETE FROM questoes WHERE id IN (SELECT value FROM json_each(?))",
+                     (json.dumps([qid for qid, _, _ in perdedoras]),))
+        invalidar_catalogo(conn)
+        invalidar_questoes(conn, [qid for qid, _, _ in perdedoras])
+    return RelatorioDuplicatas(
+        grupos, len(perdedoras),
+        [(h, sobrevivente, ids) for h, (sobrevivente, ids) in exemplos.items()],
+        simular,
+    )
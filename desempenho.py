@@ -0,0 +1,61 @@
+"""
+Estatísticas de desempenho por usuário × cargo × matéria
+A tabela desempenho (migração 9) guarda tentativas, acertos, tempo total e
+última resposta de cada combinação. Um gatilho a atualiza a cada resposta
+gravada (respostas.py), então o painel lê só os agregados: o custo não
+depende de quantas questões o aluno já respondeu. reconstruir_desempenho
+refaz a tabela a partir do registro bruto em uma única passada.
+
+Execute: python desempenho.py --reconstruir
+"""
+import sys
+
+from conexao import conexao
+from database import SQL_RECONSTRUIR_DESEMPENHO
+from registros import consultar
+
+CARGO_GERAL = 0  # cargo_id gravado para questões do banco geral
+
+
+def reconstruir_desempenho(conn):
+    """Recalcula todas as estatísticas a partir de respostas. Retorna o número de linhas."""
+    conn.execute("DELETE FROM desempenho")
+    conn.execute(SQL_RECONSTRUIR_DESEMPENHO)
+    return conn.execute("SELECT COUNT(*) FROM desempenho").fetchone()[0]
+
+
+def desempenho_usuario(conn, usuario_id, cargo_id=...):
+    """
+    Estatísticas do usuário por matéria (cargo_id=... todas; None = banco geral).
+    Campos: cargo_id, materia, tentativas, acertos, percentual, tempo_medio, ultima_resposta
+    """
+    filtro, params = "", [usuario_id]
+    if cargo_id is not ...:
+        filtro = " AND cargo_id = ?"
+        params.append(CARGO_GERAL if cargo_id is None else cargo_id)
+    return consultar(conn, f"""
+        SELECT cargo_id, materia, tentativas, acertos,
+               ROUND(100.0 * acertos / tentativas, 1) AS percentual,
+               ROUND(tempo_total / tentativas, 1) AS tempo_medio,
+               ultima_resposta
+        FROM desempenho
+        WHERE usuario_id = ?{filtro}
+        ORDER BY cargo_id, materia
+    """, params)
+
+
+def resumo_usuario(conn, usuario_id):
+    """(tentativas, acertos) somados de todas as matérias"""
+    return conn.execute("""
+        SELECT COALESCE(SUM(tentativas), 0), COALESCE(SUM(acertos), 0)
+        FROM desempenho WHERE usuario_id = ?
+    """, (usuario_id,)).fetchone()
+
+
+if __name__ == "__main__":
+    if "--reconstruir" in sys.argv:
+        with conexao() as conn:
+            total = reconstruir_desempenho(conn)
+        print(f"Estatísticas reconstruídas: {total} combinações usuário × cargo × matéria")
+    else:
+        print(__doc__)
@@ -0,0 +1,121 @@
+"""
+Fila de escrita assíncrona (write-behind) para o SQLite
+Quem enfileira não espera o disco: uma thread de fundo acumula os registros e
+os grava com executemany em uma única transação a cada tamanho_lote registros
+ou intervalo segundos (o que vier primeiro). esvaziar() bloqueia até tudo o
+que foi enfileirado antes dele estar gravado; no encerramento do processo
+(atexit) as filas são esvaziadas.
+
+Uso:
+    fila = obter_fila(SQL_INSERIR)
+    fila.enfileirar((a, b, c))   # retorna na hora
+    fila.esvaziar()              # quando o dado precisa estar no banco
+"""
+import atexit
+import queue
+import threading
+import time
+
+from conexao import conexao, CAMINHO_BANCO
+
+_FIM = object()
+
+
+class FilaEscrita:
+    def __init__(self, sql, db_path=None, tamanho_lote=200, intervalo=0.5):
+        self.sql = sql
+        self.db_path = db_path or CAMINHO_BANCO
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.gravados = 0
+        self.erros = 0
+        self.lotes = 0
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, name="fila-escrita", daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, parametros):
+        """Agenda a gravação de uma linha (tupla de parâmetros de self.sql)"""
+        self._fila.put(parametros)
+
+    def esvaziar(self, timeout=10.0):
+        """Espera a gravação de tudo o que já foi enfileirado. Retorna False se estourar o timeout."""
+        if not self._thread.is_alive():
+            return self._fila.empty()
+        pronto = threading.Event()
+        self._fila.put(pronto)
+        return pronto.wait(timeout)
+
+    def fechar(self, timeout=10.0):
+        if self._thread.is_alive():
+            self._fila.put(_FIM)
+            self._thread.join(timeout)
+
+    def _executar(self):
+        lote, avisar = [], []
+        prazo = None  # instante em que o lote pendente precisa ser gravado
+        while True:
+            espera = None if prazo is None else max(0.0, prazo - time.monotonic())
+            try:
+                item = self._fila.get(timeout=espera)
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                avisar.append(item)
+            elif item is not None and item is not _FIM:
+                lote.append(item)
+                if prazo is None:
+                    prazo = time.monotonic() + self.intervalo
+                if len(lote) < self.tamanho_lote and time.monotonic() < prazo:
+                    continue
+            # Lote cheio, prazo vencido, pedido de esvaziar ou fim da fila
+            if lote:
+                self._gravar(lote)
+                lote = []
+            prazo = None
+            for evento in avisar:
+                evento.set()
+            avisar = []
+            if item is _FIM:
+                return
+
+    def _gravar(self, lote):
+        try:
+            with conexao(self.db_path) as conn:
+                conn.executemany(self.sql, lote)
+            self.gravados += len(lote)
+        except Exception as e:
+            print(f"✗ Erro ao gravar lote da fila ({e}); gravando um a um")
+            # Isola as linhas problemáticas sem perder o restante do lote
+            with conexao(self.db_path) as conn:
+                for linha in lote:
+                    try:
+                        conn.execute(self.sql, linha)
+                        self.gravados += 1
+                    except Exception as e:
+                        print(f"✗ Erro: {e}")
+                        self.erros += 1
+        self.lotes += 1
+
+
+# {(sql, caminho do banco): FilaEscrita} — uma por processo
+_filas = {}
+_trava = threading.Lock()
+
+
+def obter_fila(sql, db_path=None, **opcoes):
+    """Fila compartilhada pelo processo para o comando e o banco"""
+    chave = (sql, db_path or CAMINHO_BANCO)
+    with _trava:
+        fila = _filas.get(chave)
+        if fila is None:
+            fila = _filas[chave] = FilaEscrita(sql, db_path, **opcoes)
+        return fila
+
+
+@atexit.register
+def fechar_filas():
+    with _trava:
+        filas = list(_filas.values())
+    for fila in filas:
+        fila.fechar()
@@ -1,14 +1,13 @@
-import sqlite3
+from conexao import conexao
 import matplotlib.pyplot as plt
 
 def gerar_grafico():
-    conexao = sqlite3.connect('banco_questoes.db')
-    cursor = conexao.cursor()
+    with conexao() as conn:
+        cursor = conn.cursor()
     
-    # Busca os percentuais de acerto na ordem que foram feitos
-    cursor.execute('SELECT id, percentual FROM historico ORDER BY id')
-    dados = cursor.fetchall()
-    conexao.close()
+        # Busca os percentuais de acerto na ordem que foram feitos
+        cursor.execute('SELECT id, percentual FROM historico ORDER BY id')
+        dados = cursor.fetchall()
 
     if not dados:
         print("Faça pelo menos um simulado para gerar o gráfico!")
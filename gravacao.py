@@ -0,0 +1,153 @@
+"""
+Gravação em lote de questões coletadas
+Em vez de uma conexão, um SELECT de duplicata e um commit por questão, o
+GravadorLote carrega uma vez os hashes já existentes, descarta duplicatas em
+memória e grava o lote com executemany em uma única transação a cada
+tamanho_lote questões ou intervalo segundos (o que vier primeiro).
+Quase duplicatas (similaridade.py) não são descartadas: a semelhança do
+enunciado não basta para dizer que é a mesma questão (números, "correta" ×
+"incorreta"). Elas são gravadas e contadas em similares; a assinatura fica no
+índice LSH e o relatório de python similaridade.py as lista para revisão.
+"""
+import json
+import time
+
+from conexao import conexao
+from catalogo import invalidar_catalogo
+from similaridade import IndiceMemoria, assinatura, buscar_similares, gravar_assinaturas
+
+SQL_INSERIR = """
+    INSERT INTO questoes (
+        cargo_id, enunciado, op_a, op_b, op_c, op_d, op_e,
+        correta, materia, banca, ano, orgao, origem, hash_enunciado
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'scraping', ?)
+"""
+
+
+def _linha(adaptada, cargo_id):
+    return (
+        cargo_id,
+        adaptada['enunciado'],
+        adaptada['op_a'],
+        adaptada['op_b'],
+        adaptada['op_c'],
+        adaptada['op_d'],
+        adaptada['op_e'],
+        adaptada.get('correta', ''),
+        adaptada.get('materia', ''),
+        adaptada.get('banca', ''),
+        adaptada.get('ano'),
+        adaptada.get('orgao', ''),
+        adaptada['hash_enunciado'],
+    )
+
+
+class GravadorLote:
+    """
+    Uso:
+        with GravadorLote(db_path, cargo_id) as gravador:
+            for adaptada in ...:
+                gravador.adicionar(adaptada)
+        gravador.sucesso, gravador.erros, gravador.duplicatas, gravador.similares
+    """
+
+    def __init__(self, db_path, cargo_id=None, tamanho_lote=500, intervalo=2.0):
+        self.db_path = db_path
+        self.cargo_id = cargo_id
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.sucesso = 0
+        self.erros = 0
+        self.duplicatas = 0
+        self.similares = 0  # gravadas, mas parecidas com outra (revisar)
+        self.lotes = 0
+        self._pendentes = []
+        self._assinaturas = {}  # hash_enunciado → assinatura, das pendentes
+        self._indice_pendentes = IndiceMemoria()
+        self._ultimo_envio = time.monotonic()
+        with conexao(db_path) as conn:
+            self._hashes = {h for (h,) in conn.execute(
+                "SELECT hash_enunciado FROM questoes WHERE hash_enunciado IS NOT NULL")}
+
+    def adicionar(self, adaptada):
+        """
+        Enfileira uma questão já adaptada (ver ScraperQuestoes.adaptar_questao).
+        Retorna False se for duplicata exata (no banco ou no próprio lote).
+        """
+        if adaptada['hash_enunciado'] in self._hashes:
+            self.duplicatas += 1
+            return False
+        sig = adaptada.get('assinatura') or assinatura(adaptada['enunciado'])
+        if self._indice_pendentes.buscar(sig) is not None:
+            self.similares += 1
+        else:
+            with conexao(self.db_path) as conn:
+                if buscar_similares(conn, sig):
+                    self.similares += 1
+        self._hashes.add(adaptada['hash_enunciado'])
+        self._assinaturas[adaptada['hash_enunciado']] = sig
+        self._indice_pendentes.adicionar(adaptada['hash_enunciado'], sig)
+        self._pendentes.append(_linha(adaptada, self.cargo_id))
+        if len(self._pendentes) >= self.tamanho_lote:
+            self.enviar()
+        else:
+            self.enviar_se_vencido()
+        return True
+
+    def enviar_se_vencido(self):
+        """Grava o lote pendente se já passou o intervalo desde o último envio"""
+        if self._pendentes and time.monotonic() - self._ultimo_envio >= self.intervalo:
+            self.enviar()
+
+    def enviar(self):
+        """Grava as questões pendentes em uma única transação. Retorna quantas foram salvas."""
+        linhas, self._pendentes = self._pendentes, []
+        assinaturas, self._assinaturas = self._assinaturas, {}
+        self._indice_pendentes = IndiceMemoria()
+        self._ultimo_envio = time.monotonic()
+        if not linhas:
+            return 0
+        try:
+            with conexao(self.db_path) as conn:
+                conn.executemany(SQL_INSERIR, linhas)
+                self._indexar(conn, assinaturas)
+                invalidar_catalogo(conn)
+            salvas = len(linhas)
+        except Exception as e:
+            print(f"✗ Erro ao gravar lote ({e}); gravando uma a uma")
+            salvas = self._enviar_individual(linhas, assinaturas)
+        self.sucesso += salvas
+        self.erros += len(linhas) - salvas
+        self.lotes += 1
+        return salvas
+
+    def _indexar(self, conn, assinaturas):
+        # Os ids só existem depois do INSERT: recupera-os pelo hash (indexado)
+        ids = conn.execute(
+            "SELECT hash_enunciado, id FROM questoes WHERE hash_enunciado IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(assinaturas)),)
+        ).fetchall()
+        gravar_assinaturas(conn, [(qid, assinaturas[h]) for h, qid in ids])
+
+    def _enviar_individual(self, linhas, assinaturas):
+        # Isola as linhas problemáticas sem perder o restante do lote
+        salvas = 0
+        with conexao(self.db_path) as conn:
+            for linha in linhas:
+                try:
+                    cursor = conn.execute(SQL_INSERIR, linha)
+                    gravar_assinaturas(conn, [(cursor.lastrowid, assinaturas[linha[-1]])])
+                    salvas += 1
+                except Exception as e:
+                    print(f"✗ Erro: {e}")
+            invalidar_catalogo(conn)
+        return salvas
+
+    def fechar(self):
+        self.enviar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -1,48 +1,299 @@
-import sqlite3
-import pandas as pd
+"""
+Importação em massa de questões a partir de planilha (CSV ou XLSX)
+A planilha é lida em streaming e processada em lotes de TAMANHO_LOTE linhas,
+então a memória não cresce com o tamanho do arquivo. Para cada lote:
+  - cada linha é validada (enunciado, alternativas A–D e matéria
+    obrigatórios, correta entre A e E); as inválidas vão para o CSV de
+    rejeitadas (--rejeitadas; padrão <arquivo>.rejeitadas.csv na pasta
+    temporária do sistema) com o número da linha e o motivo
+  - o hash do enunciado descarta duplicatas do próprio lote e do banco
+  - as novas questões são gravadas com executemany em uma transação, junto
+    com o ponto de retomada (tabela contadores)
+Se a importação for interrompida, rodar de novo continua do último lote
+gravado (--recomecar ignora o ponto salvo).
+
+Execute: python importar_planilha.py [arquivo] [--lote 5000] [--cargo ID]
+         [--separador ";"] [--rejeitadas CAMINHO] [--recomecar] [--sem-similaridade]
+  --sem-similaridade não calcula as assinaturas MinHash na importação
+  (bem mais rápido; depois rode python similaridade.py para indexá-las)
+"""
+import csv
+import json
 import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+from conexao import conexao
+from catalogo import invalidar_catalogo
+from database import aplicar_migracoes
+from deduplicacao import gerar_hash_enunciado
+from similaridade import indexar
+
+ARQUIVO_PADRAO = 'questoes_para_importar.csv'
+TAMANHO_LOTE = 5_000
+
+COLUNAS_OBRIGATORIAS = ('enunciado', 'op_a', 'op_b', 'op_c', 'op_d', 'correta', 'materia')
+COLUNAS_OPCIONAIS = ('op_e', 'explicacao_teorica', 'banca', 'ano', 'orgao', 'cargo_id')
+ALTERNATIVAS = 'ABCDE'
+
+SQL_INSERIR = """
+    INSERT INTO questoes (
+        cargo_id, enunciado, op_a, op_b, op_c, op_d, op_e, correta, materia,
+        explicacao_teorica, banca, ano, orgao, origem, hash_enunciado
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'planilha', ?)
+"""
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.lidas = 0
+        self.importadas = 0
+        self.duplicadas = 0
+        self.rejeitadas = 0
+        self.retomada_em = 0  # última linha já importada em uma execução anterior
+        self.arquivo_rejeitadas = None  # CSV com as linhas rejeitadas e o motivo
+        self.duracao = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        return self.lidas / self.duracao if self.duracao else 0.0
+
+    def __str__(self):
+        return (f"{self.lidas} linhas lidas em {self.duracao:.1f}s ({self.linhas_por_segundo:.0f} linhas/s): "
+                f"{self.importadas} importadas, {self.duplicadas} duplicadas, {self.rejeitadas} rejeitadas")
+
+
+def criar_modelo(arquivo_csv):
+    """Cria uma planilha de exemplo (separador ; — padrão do Excel no Brasil)"""
+    with open(arquivo_csv, 'w', newline='', encoding='utf-8-sig') as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(COLUNAS_OBRIGATORIAS)
+        escritor.writerow(['Exemplo: Quanto é 5+5?', '10', '15', '20', '25', 'A', 'Matemática'])
+        escritor.writerow(['Exemplo: Qual a capital da França?', 'Londres', 'Paris', 'Madri', 'Lisboa', 'B', 'Geografia'])
+
+
+def _ler_csv(caminho, separador):
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        leitor = csv.reader(f, delimiter=separador)
+        cabecalho = [c.strip().lower() for c in next(leitor, [])]
+        yield cabecalho
+        for linha in leitor:
+            if any(campo.strip() for campo in linha):
+                yield leitor.line_num, dict(zip(cabecalho, linha))
+
+
+def _ler_xlsx(caminho):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Para importar .xlsx instale o openpyxl (pip install openpyxl) ou salve a planilha como CSV")
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = planilha.active.iter_rows(values_only=True)
+        cabecalho = [str(c or '').strip().lower() for c in next(linhas, ())]
+        yield cabecalho
+        for numero, linha in enumerate(linhas, start=2):
+            if any(c not in (None, '') for c in linha):
+                yield numero, dict(zip(cabecalho, linha))
+    finally:
+        planilha.close()
+
+
+def ler_planilha(caminho, separador=';'):
+    """Gerador: primeiro o cabeçalho, depois (número da linha, {coluna: valor})"""
+    if caminho.lower().endswith(('.xlsx', '.xlsm')):
+        return _ler_xlsx(caminho)
+    return _ler_csv(caminho, separador)
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _inteiro(valor, campo):
+    texto = _texto(valor)
+    if not texto:
+        return None
+    try:
+        return int(float(texto))
+    except ValueError:
+        raise ValueError(f"{campo} inválido: {texto!r}")
+
+
+def validar_linha(registro, cargo_padrao=None):
+    """Converte a linha em tupla para SQL_INSERIR; ValueError com o motivo se for inválida"""
+    campos = {c: _texto(registro.get(c)) for c in COLUNAS_OBRIGATORIAS + COLUNAS_OPCIONAIS}
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if not campos[c]]
+    if faltando:
+        raise ValueError(f"campos obrigatórios vazios: {', '.join(faltando)}")
+    correta = campos['correta'].upper().rstrip(')')
+    if len(correta) != 1 or correta not in ALTERNATIVAS:
+        raise ValueError(f"correta deve ser uma letra de A a E (recebido {campos['correta']!r})")
+    if correta == 'E' and not campos['op_e']:
+        raise ValueError("correta é E, mas op_e está vazia")
+    ano = _inteiro(registro.get('ano'), 'ano')
+    cargo_id = _inteiro(registro.get('cargo_id'), 'cargo_id')
+    return (
+        cargo_id if cargo_id is not None else cargo_padrao,
+        campos['enunciado'], campos['op_a'], campos['op_b'], campos['op_c'], campos['op_d'],
+        campos['op_e'] or None, correta, campos['materia'],
+        campos['explicacao_teorica'] or None, campos['banca'] or None, ano, campos['orgao'] or None,
+        gerar_hash_enunciado(campos['enunciado']),
+    )
+
+
+def _chave_retomada(caminho):
+    return f"importacao:{os.path.abspath(caminho)}"
+
+
+def _gravar_lote(conn, linhas, indexar_similaridade):
+    """Grava as linhas cujo hash ainda não existe no banco. Retorna (importadas, duplicadas)."""
+    existentes = {h for (h,) in conn.execute(
+        "SELECT hash_enunciado FROM questoes WHERE hash_enunciado IN (SELECT value FROM json_each(?))",
+        (json.dumps([linha[-1] for linha in linhas]),))}
+    novas = [linha for linha in linhas if linha[-1] not in existentes]
+    conn.executemany(SQL_INSERIR, novas)
+    if novas and indexar_similaridade:
+        # Assinaturas MinHash só das questões deste lote (localizadas pelo hash)
+        indexar(conn, conn.execute(
+            "SELECT id, enunciado FROM questoes WHERE hash_enunciado IN (SELECT value FROM json_each(?))",
+            (json.dumps([linha[-1] for linha in novas]),)).fetchall())
+    return len(novas), len(linhas) - len(novas)
+
+
+def caminho_rejeitadas(caminho):
+    """
+    CSV padrão das linhas rejeitadas: na pasta temporária, não ao lado da
+    planilha (que pode estar no repositório). O nome é fixo por planilha para
+    a retomada continuar o mesmo arquivo.
+    """
+    return os.path.join(tempfile.gettempdir(), f"{os.path.basename(caminho)}.rejeitadas.csv")
+
+
+def importar_planilha(caminho, db_path=None, tamanho_lote=TAMANHO_LOTE, cargo_id=None, separador=';',
+                      recomecar=False, indexar_similaridade=True, arquivo_rejeitadas=None, progresso=None):
+    """
+    Importa a planilha em lotes e retorna um ResultadoImportacao.
+    As linhas inválidas vão para arquivo_rejeitadas (padrão: caminho_rejeitadas).
+    progresso(resultado) é chamado após cada lote gravado.
+    """
+    aplicar_migracoes(db_path)
+    resultado = ResultadoImportacao()
+    chave = _chave_retomada(caminho)
+    with conexao(db_path) as conn:
+        if recomecar:
+            conn.execute("DELETE FROM contadores WHERE nome = ?", (chave,))
+        linha_salva = conn.execute("SELECT valor FROM contadores WHERE nome = ?", (chave,)).fetchone()
+    resultado.retomada_em = linha_salva[0] if linha_salva else 0
+
+    leitor = ler_planilha(caminho, separador)
+    cabecalho = next(leitor)
+    ausentes = [c for c in COLUNAS_OBRIGATORIAS if c not in cabecalho]
+    if ausentes:
+        raise ValueError(f"Colunas obrigatórias ausentes na planilha: {', '.join(ausentes)}")
+
+    resultado.arquivo_rejeitadas = arquivo_rejeitadas or caminho_rejeitadas(caminho)
+    inicio = time.perf_counter()
+    with open(resultado.arquivo_rejeitadas, 'a' if resultado.retomada_em else 'w', newline='', encoding='utf-8-sig') as f:
+        rejeitadas = csv.writer(f, delimiter=';')
+        if not resultado.retomada_em:
+            rejeitadas.writerow(['linha', 'motivo'])
+        pendentes = ((n, r) for n, r in leitor if n > resultado.retomada_em)
+        while True:
+            lote = list(islice(pendentes, tamanho_lote))
+            if not lote:
+                break
+            linhas, hashes = [], set()
+            for numero, registro in lote:
+                try:
+                    linha = validar_linha(registro, cargo_id)
+                except ValueError as e:
+                    rejeitadas.writerow([numero, str(e)])
+                    resultado.rejeitadas += 1
+                    continue
+                if linha[-1] in hashes:
+                    resultado.duplicadas += 1
+                    continue
+                hashes.add(linha[-1])
+                linhas.append(linha)
+            with conexao(db_path) as conn:
+                importadas, duplicadas = _gravar_lote(conn, linhas, indexar_similaridade)
+                conn.execute("""
+                    INSERT INTO contadores (nome, valor) VALUES (?, ?)
+                    ON CONFLICT(nome) DO UPDATE SET valor = excluded.valor
+                """, (chave, lote[-1][0]))
+                if importadas:
+                    invalidar_catalogo(conn)
+            f.flush()
+            resultado.lidas += len(lote)
+            resultado.importadas += importadas
+            resultado.duplicadas += duplicadas
+            resultado.duracao = time.perf_counter() - inicio
+            if progresso:
+                progresso(resultado)
+
+    # Concluída: a próxima importação deste arquivo começa do início
+    with conexao(db_path) as conn:
+        conn.execute("DELETE FROM contadores WHERE nome = ?", (chave,))
+    resultado.duracao = time.perf_counter() - inicio
+    return resultado
+
+
+def importar_dados(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    def opcao(nome, padrao=None):
+        return argv[argv.index(nome) + 1] if nome in argv else padrao
+
+    valores = {opcao(n) for n in ('--lote', '--cargo', '--separador', '--rejeitadas')}
+    posicionais = [a for a in argv if not a.startswith('--') and a not in valores]
+    arquivo = posicionais[0] if posicionais else ARQUIVO_PADRAO
 
-def importar_dados():
-    arquivo_csv = 'questoes_para_importar.csv'
-    
     # 1. Se o arquivo não existir, o script cria um modelo para você preencher
-    if not os.path.exists(arquivo_csv):
-        exemplo = {
-            'enunciado': ['Exemplo: Quanto é 5+5?', 'Exemplo: Qual a capital da França?'],
-            'op_a': ['10', 'Londres'],
-            'op_b': ['15', 'Paris'],
-            'op_c': ['20', 'Madri'],
-            'op_d': ['25', 'Lisboa'],
-            'correta': ['A', 'B'],
-            'materia': ['Matemática', 'Geografia']
-        }
-        df_modelo = pd.DataFrame(exemplo)
-        # Salva o modelo usando ponto e vírgula como separador (padrão Excel Brasil)
-        df_modelo.to_csv(arquivo_csv, index=False, sep=';', encoding='utf-8-sig')
+    if not os.path.exists(arquivo):
+        criar_modelo(arquivo)
         print(f"--- ATENÇÃO ---")
-        print(f"O arquivo '{arquivo_csv}' foi criado na sua pasta.")
+        print(f"O arquivo '{arquivo}' foi criado na sua pasta.")
         print("Abra ele, apague os exemplos, cole suas questões e salve.")
         print("Depois, rode este script novamente para importar.")
         return
 
-    # 2. Se o arquivo já existe, ele lê e envia para o Banco de Dados
+    # 2. Se o arquivo já existe, importa em lotes
+    cargo = opcao('--cargo')
     try:
-        # Lendo o CSV (usando ; como separador)
-        df = pd.read_csv(arquivo_csv, sep=';', encoding='utf-8-sig')
-        
-        # Conectando ao seu banco de dados
-        conexao = sqlite3.connect('banco_questoes.db')
-        
-        # 'append' significa que ele vai ADICIONAR ao que já existe, sem apagar nada
-        df.to_sql('questoes', conexao, if_exists='append', index=False)
-        
-        conexao.close()
-        print(f"--- SUCESSO ---")
-        print(f"Foram importadas {len(df)} questões com sucesso!")
-        
+        resultado = importar_planilha(
+            arquivo,
+            tamanho_lote=int(opcao('--lote', TAMANHO_LOTE)),
+            cargo_id=int(cargo) if cargo else None,
+            separador=opcao('--separador', ';'),
+            arquivo_rejeitadas=opcao('--rejeitadas'),
+            recomecar='--recomecar' in argv,
+            indexar_similaridade='--sem-similaridade' not in argv,
+            progresso=lambda r: print(f"  {r.lidas} linhas lidas, {r.importadas} importadas "
+                                      f"({r.linhas_por_segundo:.0f} linhas/s)"),
+        )
     except Exception as e:
         print(f"Erro ao importar: {e}")
         print("Verifique se o arquivo está aberto no Excel. Se estiver, feche-o e tente de novo.")
+        print("O que já foi gravado está salvo: rode de novo para continuar de onde parou.")
+        return
+
+    print(f"--- SUCESSO ---")
+    if resultado.retomada_em:
+        print(f"Importação retomada após a linha {resultado.retomada_em}.")
+    print(resultado)
+    if resultado.rejeitadas:
+        print(f"Linhas rejeitadas (com o motivo) em '{resultado.arquivo_rejeitadas}':")
+        with open(resultado.arquivo_rejeitadas, newline='', encoding='utf-8-sig') as f:
+            for linha, motivo in islice(csv.reader(f, delimiter=';'), 1, 11):
+                print(f"  linha {linha}: {motivo}")
+
 
 if __name__ == "__main__":
-    importar_dados()
\ No newline at end of file
+    importar_dados()
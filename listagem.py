@@ -0,0 +1,54 @@
+"""
+Listagem paginada de questões para o painel administrativo
+Paginação por chave (keyset): cada página pede as questões com id menor que
+o último id da página anterior (WHERE id < ? ORDER BY id DESC LIMIT ?).
+Com os índices da migração 7 o custo é o mesmo na primeira ou na milésima
+página, ao contrário de OFFSET, que percorre todas as linhas puladas.
+Só as colunas exibidas são lidas, e o enunciado já vem truncado do SQLite.
+"""
+from registros import consultar
+
+POR_PAGINA = 50
+TAMANHO_PREVIA = 100  # caracteres do enunciado na listagem
+
+SEM_TEORIA = "(explicacao_teorica IS NULL OR explicacao_teorica = '')"
+
+
+def listar_questoes(conn, antes_de=None, por_pagina=POR_PAGINA, origem=None, materia=None,
+                    banca=None, sem_teoria=False, tamanho_previa=TAMANHO_PREVIA):
+    """
+    Retorna (registros, proximo): até por_pagina questões com id < antes_de
+    (desde a mais recente se None), em ordem decrescente de id. proximo é o
+    cursor da página seguinte (None na última página).
+    Campos: id, previa, materia, banca, orgao, origem, tem_teoria
+    """
+    filtros, params = [], [tamanho_previa, tamanho_previa]
+    if antes_de is not None:
+        filtros.append("id < ?")
+        params.append(antes_de)
+    if origem:
+        filtros.append("origem = ?")
+        params.append(origem)
+    if materia:
+        filtros.append("materia = ?")
+        params.append(materia)
+    if banca:
+        filtros.append("banca = ?")
+        params.append(banca)
+    if sem_teoria:
+        filtros.append(SEM_TEORIA)
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    params.append(por_pagina + 1)
+    registros = consultar(conn, f"""
+        SELECT id,
+               substr(enunciado, 1, ?) || CASE WHEN length(enunciado) > ? THEN '…' ELSE '' END AS previa,
+               materia, banca, orgao, origem,
+               NOT {SEM_TEORIA} AS tem_teoria
+        FROM questoes
+        {where}
+        ORDER BY id DESC
+        LIMIT ?
+    """, params)
+    if len(registros) > por_pagina:
+        return registros[:por_pagina], registros[por_pagina - 1].id
+    return registros, None
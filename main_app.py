@@ -1,6 +1,10 @@
 import customtkinter as ctk
-import sqlite3
 import sys
+from conexao import conexao
+from database import aplicar_migracoes
+from amostragem import amostrar_questoes
+from catalogo import obter_catalogo
+from vistas import carregar_vistas, marcar_vistas, USUARIO_LOCAL
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -16,13 +20,7 @@ class AppConcursos(ctk.CTk):
         self.mostrar_menu_inicial()
 
     def preparar_banco(self):
-        conexao = sqlite3.connect('banco_questoes.db')
-        cursor = conexao.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS historico 
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT, data TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
-                          acertos INTEGER, total INTEGER, percentual REAL)''')
-        conexao.commit()
-        conexao.close()
+        aplicar_migracoes()
 
     def mostrar_menu_inicial(self):
         if self.timer_id: self.after_cancel(self.timer_id)
@@ -41,11 +39,7 @@ class AppConcursos(ctk.CTk):
         self.frame_scroll.pack(pady=10, padx=20, fill="both", expand=True)
 
         # Buscar matérias no banco
-        conexao = sqlite3.connect('banco_questoes.db')
-        cursor = conexao.cursor()
-        cursor.execute('SELECT DISTINCT materia FROM questoes ORDER BY materia')
-        materias = [row[0] for row in cursor.fetchall()]
-        conexao.close()
+        materias = obter_catalogo().todas_materias()
 
         # Criar uma linha para cada matéria
         for mat in materias:
@@ -61,6 +55,9 @@ class AppConcursos(ctk.CTk):
             entry.pack(side="right")
             self.entradas_materias[mat] = entry
 
+        self.check_ineditas = ctk.CTkCheckBox(self, text="Apenas questões inéditas (nunca vistas)")
+        self.check_ineditas.pack(pady=5)
+
         # Botão de Ação Principal
         ctk.CTkButton(self, text="INICIAR SIMULADO PERSONALIZADO", 
                       fg_color="#1f538d", height=50, font=("Arial Bold", 16),
@@ -70,30 +67,28 @@ class AppConcursos(ctk.CTk):
                       command=self.abrir_grafico).pack(pady=5)
 
     def gerar_simulado_composto(self):
-        self.questoes = []
-        conexao = sqlite3.connect('banco_questoes.db')
-        cursor = conexao.cursor()
-
+        config = {}
         for mat, check in self.checks_materias.items():
             if check.get() == 1: # Se estiver marcado
                 try:
                     qtd = int(self.entradas_materias[mat].get())
                 except:
                     qtd = 0
-                
                 if qtd > 0:
-                    cursor.execute('SELECT enunciado, op_a, op_b, op_c, op_d, correta FROM questoes WHERE materia = ? ORDER BY RANDOM() LIMIT ?', (mat, qtd))
-                    self.questoes.extend(cursor.fetchall())
+                    config[mat] = qtd
 
-        conexao.close()
+        with conexao() as conn:
+            excluir = carregar_vistas(conn, USUARIO_LOCAL) if self.check_ineditas.get() == 1 else None
+            # Já vêm embaralhadas, sem ficar tudo em bloco por matéria
+            sorteadas = amostrar_questoes(conn, ..., config, excluir=excluir)
+            marcar_vistas(conn, USUARIO_LOCAL, [q[0] for q in sorteadas])
+        # (enunciado, op_a, op_b, op_c, op_d, correta)
+        self.questoes = [q[1:7] for q in sorteadas]
 
         if not self.questoes:
             # Se nada foi selecionado, avisar o usuário (opcional)
             return
 
-        import random
-        random.shuffle(self.questoes) # Mistura as matérias para não vir tudo em bloco
-        
         self.indice = 0
         self.acertos = 0
         self.respostas_usuario = [None] * len(self.questoes)
@@ -246,12 +241,9 @@ class AppConcursos(ctk.CTk):
         self.montar_tela_questoes()
 
     def salvar_resultado_personalizado(self, total):
-        conexao = sqlite3.connect('banco_questoes.db')
-        cursor = conexao.cursor()
-        cursor.execute('INSERT INTO historico (acertos, total, percentual) VALUES (?, ?, ?)', 
-                       (self.acertos, total, (self.acertos/total)*100))
-        conexao.commit()
-        conexao.close()
+        with conexao() as conn:
+            conn.execute('INSERT INTO historico (acertos, total, percentual) VALUES (?, ?, ?)', 
+                         (self.acertos, total, (self.acertos/total)*100))
 
     def abrir_grafico(self):
         import subprocess
@@ -0,0 +1,37 @@
+"""
+Mapeamento leve de linhas do SQLite para registros (namedtuple)
+Substitui pd.read_sql nas consultas interativas do app: cada linha vira uma
+namedtuple com os nomes das colunas do SELECT, acessível por atributo
+(r.nome), índice (r[0]) ou, via como_dicts, pronta para st.dataframe.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+
+@lru_cache(maxsize=128)
+def tipo_registro(colunas):
+    """namedtuple para a tupla de nomes de colunas (reaproveitada entre consultas)"""
+    return namedtuple("Registro", colunas, rename=True)
+
+
+def _tipo_cursor(cursor):
+    return tipo_registro(tuple(d[0] for d in cursor.description))
+
+
+def consultar(conn, sql, params=()):
+    """Lista de registros da consulta"""
+    cursor = conn.execute(sql, params)
+    tipo = _tipo_cursor(cursor)
+    return [tipo._make(row) for row in cursor]
+
+
+def consultar_um(conn, sql, params=()):
+    """Primeiro registro da consulta, ou None"""
+    cursor = conn.execute(sql, params)
+    row = cursor.fetchone()
+    return _tipo_cursor(cursor)._make(row) if row is not None else None
+
+
+def como_dicts(registros):
+    """Lista de dicts (colunas → valores), formato aceito por st.dataframe"""
+    return [r._asdict() for r in registros]
@@ -0,0 +1,136 @@
+"""
+Conteúdo teórico em Markdown → HTML seguro
+O texto é escapado por inteiro antes de qualquer formatação, então só as
+tags geradas aqui chegam ao navegador. Subconjunto aceito:
+  **negrito**, *itálico* ou _itálico_, `código`, [texto](https://...),
+  # títulos (até ###), listas com "- "/"* " ou "1. ", parágrafos separados
+  por linha em branco; quebras de linha simples viram <br>.
+O HTML é gerado uma vez, ao salvar no painel, e fica na coluna
+explicacao_html (migração 12). Um gatilho a anula quando explicacao_teorica
+muda por outro caminho; enquanto estiver nula, html_teoria renderiza na hora
+com cache pelo conteúdo, e reconstruir_html preenche todas de uma vez.
+
+Execute: python renderizacao.py --reconstruir [--todas]
+"""
+import functools
+import html
+import re
+import sys
+
+from conexao import conexao
+from cache_questoes import invalidar_questoes
+
+_TITULO = re.compile(r"^(#{1,3})\s+(.*)$")
+_ITEM = re.compile(r"^\s*[-*]\s+(.*)$")
+_ITEM_NUMERADO = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_CODIGO = re.compile(r"`([^`\n]+)`")
+_NEGRITO = re.compile(r"\*\*(.+?)\*\*")
+_ITALICO = re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+_LINK = re.compile(r"\[([^\]\n]+)\]\(((?:https?://|mailto:)[^\s)]+)\)")
+_MARCADOR = re.compile("\x00(\\d+)\x00")
+
+TAGS_TITULO = {1: "h5", 2: "h6", 3: "h6"}
+
+
+def _inline(texto):
+    """Formatação dentro de uma linha (texto ainda não escapado)"""
+    texto = html.escape(texto, quote=True)
+    # Trechos de código e endereços dos links ficam de fora das demais regras
+    # (um "_" ou "**" na URL não pode virar <em>/<strong> dentro do href)
+    guardados = []
+
+    def guardar(trecho):
+        guardados.append(trecho)
+        return f"\x00{len(guardados) - 1}\x00"
+
+    texto = _CODIGO.sub(lambda m: guardar(f"<code>{m.group(1)}</code>"), texto)
+    texto = _LINK.sub(lambda m: guardar(f'<a href="{m.group(2)}" target="_blank" rel="noopener noreferrer">')
+                      + m.group(1) + guardar("</a>"), texto)
+    texto = _NEGRITO.sub(r"<strong>\1</strong>", texto)
+    texto = _ITALICO.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", texto)
+    return _MARCADOR.sub(lambda m: guardados[int(m.group(1))], texto)
+
+
+def renderizar(texto):
+    """HTML seguro do Markdown (string vazia se não houver texto)"""
+    if not texto or not texto.strip():
+        return ""
+    blocos = []
+    paragrafo, lista, tipo_lista = [], [], None
+
+    def fechar():
+        nonlocal paragrafo, lista, tipo_lista
+        if paragrafo:
+            blocos.append("<p>" + "<br>".join(paragrafo) + "</p>")
+        if lista:
+            blocos.append(f"<{tipo_lista}>" + "".join(f"<li>{i}</li>" for i in lista) + f"</{tipo_lista}>")
+        paragrafo, lista, tipo_lista = [], [], None
+
+    for linha in texto.replace("\r\n", "\n").split("\n"):
+        if not linha.strip():
+            fechar()
+            continue
+        titulo = _TITULO.match(linha)
+        item = _ITEM.match(linha)
+        numerado = _ITEM_NUMERADO.match(linha)
+        if titulo:
+            fechar()
+            tag = TAGS_TITULO[len(titulo.group(1))]
+            blocos.append(f"<{tag}>{_inline(titulo.group(2))}</{tag}>")
+        elif item or numerado:
+            tipo = "ul" if item else "ol"
+            if paragrafo or tipo != tipo_lista:
+                fechar()
+            tipo_lista = tipo
+            lista.append(_inline((item or numerado).group(1)))
+        else:
+            if lista:
+                fechar()
+            paragrafo.append(_inline(linha.strip()))
+    fechar()
+    return "".join(blocos)
+
+
+@functools.lru_cache(maxsize=4096)
+def _renderizar_em_cache(texto):
+    return renderizar(texto)
+
+
+def html_teoria(texto, html_salvo=None):
+    """O HTML gravado, ou o renderizado na hora (em cache pelo conteúdo) se ainda não houver"""
+    if html_salvo is not None:
+        return html_salvo
+    return _renderizar_em_cache(texto or "")
+
+
+def reconstruir_html(conn, todas=False, lote=1_000):
+    """
+    Renderiza o conteúdo teórico das questões sem HTML (todas=True: de todas)
+    em uma única transação. Retorna quantas foram atualizadas.
+    """
+    filtro = "" if todas else " AND explicacao_html IS NULL"
+    total, ultimo_id = 0, 0
+    while True:
+        linhas = conn.execute(f"""
+            SELECT id, explicacao_teorica FROM questoes
+            WHERE id > ? AND explicacao_teorica IS NOT NULL AND explicacao_teorica <> ''{filtro}
+            ORDER BY id LIMIT ?
+        """, (ultimo_id, lote)).fetchall()
+        if not linhas:
+            break
+        conn.executemany("UPDATE questoes SET explicacao_html = ? WHERE id = ?",
+                         [(renderizar(texto), qid) for qid, texto in linhas])
+        total += len(linhas)
+        ultimo_id = linhas[-1][0]
+    if total:
+        invalidar_questoes(conn)
+    return total
+
+
+if __name__ == "__main__":
+    if "--reconstruir" in sys.argv:
+        with conexao() as conn:
+            total = reconstruir_html(conn, todas="--todas" in sys.argv)
+        print(f"Conteúdo teórico renderizado: {total} questões")
+    else:
+        print(__doc__)
@@ -0,0 +1,38 @@
+"""
+Registro de cada resposta dada nos simulados
+registrar_resposta só enfileira a linha (fila_escrita.py): o clique na
+alternativa não espera o disco. finalizar_simulado esvazia a fila, para que o
+simulado inteiro esteja gravado antes de o resultado ser mostrado.
+"""
+import uuid
+
+from fila_escrita import obter_fila
+
+SQL_INSERIR = """
+    INSERT INTO respostas (usuario_id, questao_id, simulado_id, alternativa, acertou, tempo_gasto)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def novo_simulado_id():
+    return uuid.uuid4().hex
+
+
+def registrar_resposta(usuario_id, questao_id, simulado_id, alternativa, acertou, tempo_gasto=None,
+                       db_path=None):
+    """alternativa=None indica que o tempo acabou sem resposta"""
+    obter_fila(SQL_INSERIR, db_path).enfileirar(
+        (usuario_id, questao_id, simulado_id, alternativa, int(bool(acertou)), tempo_gasto))
+
+
+def finalizar_simulado(db_path=None, timeout=10.0):
+    """Espera as respostas pendentes serem gravadas. Retorna False se estourar o timeout."""
+    return obter_fila(SQL_INSERIR, db_path).esvaziar(timeout)
+
+
+def respostas_do_simulado(conn, simulado_id):
+    """[(questao_id, alternativa, acertou, tempo_gasto)] na ordem em que foram dadas"""
+    return conn.execute("""
+        SELECT questao_id, alternativa, acertou, tempo_gasto FROM respostas
+        WHERE simulado_id = ? ORDER BY id
+    """, (simulado_id,)).fetchall()
@@ -0,0 +1,108 @@
+"""
+Revisão inteligente (repetição espaçada, estilo Leitner)
+A tabela revisao (migração 10) guarda, para cada questão que o aluno já
+respondeu, a caixa em que ela está, acertos, erros e a data da próxima
+revisão. Um gatilho a atualiza a cada resposta gravada: acerto sobe uma caixa
+e dobra o intervalo, erro volta à caixa 0 e a questão vence no dia seguinte.
+
+Para montar o simulado, cada matéria primeiro recebe as questões já vencidas,
+das mais atrasadas para as mais recentes (um intervalo do índice
+idx_revisao_vencimento, lido até a quantidade pedida). O que faltar é
+completado com questões sorteadas que o aluno ainda não respondeu.
+
+Execute: python revisao.py --reconstruir
+"""
+import json
+import random
+import sys
+from datetime import datetime, timezone
+
+from amostragem import amostrar_questoes
+from busca import questoes_por_ids
+from conexao import conexao
+from database import SQL_RECONSTRUIR_REVISAO
+from desempenho import CARGO_GERAL
+
+UNIFORME = "uniforme"
+REVISAO_INTELIGENTE = "revisao"
+
+# Quantas questões novas sortear a mais, para descartar as já respondidas
+FOLGA_NOVAS = 2
+
+
+def reconstruir_revisao(conn):
+    """Refaz a agenda a partir de respostas. Retorna o número de linhas."""
+    conn.execute("DELETE FROM revisao")
+    conn.execute(SQL_RECONSTRUIR_REVISAO)
+    return conn.execute("SELECT COUNT(*) FROM revisao").fetchone()[0]
+
+
+def _agora():
+    # Mesmo formato de CURRENT_TIMESTAMP (UTC), comparável como texto
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def vencidas(conn, usuario_id, cargo_id, config, agora=None):
+    """{materia: [questao_id]} vencidas, mais atrasadas primeiro, até config[materia] por matéria"""
+    materias = [m for m, qtd in config.items() if qtd > 0]
+    if not materias:
+        return {}
+    cargo = CARGO_GERAL if cargo_id is None else cargo_id
+    agora = agora or _agora()
+    # Um SELECT por matéria, cada um limitado à quantidade pedida, em um único comando
+    partes = " UNION ALL ".join(["""
+        SELECT * FROM (
+            SELECT materia, questao_id FROM revisao
+            WHERE usuario_id = ? AND cargo_id = ? AND materia = ? AND proxima_revisao <= ?
+            ORDER BY proxima_revisao LIMIT ?
+        )"""] * len(materias))
+    params = [p for m in materias for p in (usuario_id, cargo, m, agora, config[m])]
+    resultado = {m: [] for m in materias}
+    for materia, qid in conn.execute(partes, params):
+        resultado[materia].append(qid)
+    return resultado
+
+
+def _ja_respondidas(conn, usuario_id, ids):
+    return {qid for (qid,) in conn.execute("""
+        SELECT questao_id FROM revisao
+        WHERE usuario_id = ? AND questao_id IN (SELECT value FROM json_each(?))
+    """, (usuario_id, json.dumps(list(ids))))}
+
+
+def selecionar_revisao(conn, usuario_id, cargo_id, config, totais=None, agora=None, rng=random):
+    """
+    Mesmo contrato de amostrar_questoes, priorizando as revisões vencidas do
+    usuário e completando com questões que ele ainda não respondeu.
+    """
+    por_materia = {m: [] for m, qtd in config.items() if qtd > 0}
+    devidas = vencidas(conn, usuario_id, cargo_id, config, agora)
+    for q in questoes_por_ids(conn, [qid for ids in devidas.values() for qid in ids]):
+        por_materia[q[7]].append(q)
+
+    faltam = {m: config[m] - len(qs) for m, qs in por_materia.items() if config[m] > len(qs)}
+    if faltam:
+        sorteio = amostrar_questoes(conn, cargo_id, {m: qtd * FOLGA_NOVAS for m, qtd in faltam.items()},
+                                    totais, rng)
+        escolhidas = {q[0] for qs in por_materia.values() for q in qs}
+        candidatas = [q for q in sorteio if q[0] not in escolhidas]
+        respondidas = _ja_respondidas(conn, usuario_id, [q[0] for q in candidatas])
+        # Novas primeiro; se o aluno já respondeu quase tudo, as já vistas completam
+        candidatas.sort(key=lambda q: q[0] in respondidas)
+        for q in candidatas:
+            if faltam.get(q[7], 0) > 0:
+                por_materia[q[7]].append(q)
+                faltam[q[7]] -= 1
+
+    todas = [q for qs in por_materia.values() for q in qs]
+    rng.shuffle(todas)
+    return todas
+
+
+if __name__ == "__main__":
+    if "--reconstruir" in sys.argv:
+        with conexao() as conn:
+            total = reconstruir_revisao(conn)
+        print(f"Agenda de revisão reconstruída: {total} pares usuário × questão")
+    else:
+        print(__doc__)
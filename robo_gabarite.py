@@ -1,16 +1,16 @@
 import requests
 from bs4 import BeautifulSoup
-import sqlite3
+from conexao import conexao
+from catalogo import invalidar_catalogo
 
 def salvar_no_banco(enunciado, materia):
-    conexao = sqlite3.connect('banco_questoes.db')
-    cursor = conexao.cursor()
-    cursor.execute('''
-    INSERT INTO questoes (enunciado, op_a, op_b, op_c, op_d, correta, materia)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (enunciado, 'A', 'B', 'C', 'D', 'A', materia))
-    conexao.commit()
-    conexao.close()
+    with conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        INSERT INTO questoes (enunciado, op_a, op_b, op_c, op_d, correta, materia)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (enunciado, 'A', 'B', 'C', 'D', 'A', materia))
+        invalidar_catalogo(conn)
 
 def coletar_estilo_direto():
     # Mudamos para uma página de questões geral que é mais fácil de ler
@@ -0,0 +1,201 @@
+"""
+Detecção de questões quase duplicadas (MinHash + LSH)
+O hash exato (hash_enunciado) não pega a mesma questão com pequenas
+variações de texto. Aqui cada enunciado vira uma assinatura MinHash sobre
+trechos de 5 caracteres do texto normalizado (minúsculas, sem acentos nem
+pontuação); a fração de posições iguais entre duas assinaturas estima a
+similaridade de Jaccard entre os textos.
+
+A assinatura é dividida em BANDAS faixas de LINHAS_POR_BANDA valores; cada
+faixa vira uma chave na tabela lsh_bandas. Questões parecidas coincidem em
+pelo menos uma faixa com alta probabilidade, então a busca é uma consulta por
+chave no índice (sem varrer a tabela), seguida da comparação das assinaturas
+candidatas.
+
+Execute: python similaridade.py [--limiar 0.8]
+  indexa as questões que ainda não têm assinatura e lista os grupos de
+  quase duplicadas encontrados
+"""
+import hashlib
+import json
+import re
+import struct
+import sys
+import unicodedata
+import zlib
+
+from conexao import conexao
+
+BANDAS = 8
+LINHAS_POR_BANDA = 4
+NUM_PERMUTACOES = BANDAS * LINHAS_POR_BANDA
+TAMANHO_TRECHO = 5
+LIMIAR_DUPLICATA = 0.8  # similaridade estimada a partir da qual é duplicata
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = 0xFFFFFFFF
+# Coeficientes fixos: as assinaturas ficam gravadas e precisam ser estáveis
+_COEFICIENTES = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _PRIMO | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _PRIMO)
+    for i in range(NUM_PERMUTACOES)
+]
+_FORMATO = f"<{NUM_PERMUTACOES}I"
+_NAO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    return _NAO_ALFANUMERICO.sub(" ", texto).strip()
+
+
+def assinatura(texto):
+    """Tupla com NUM_PERMUTACOES valores MinHash do texto"""
+    texto = normalizar(texto or "")
+    if len(texto) < TAMANHO_TRECHO:
+        texto = texto.ljust(TAMANHO_TRECHO)
+    trechos = {zlib.crc32(texto[i:i + TAMANHO_TRECHO].encode())
+               for i in range(len(texto) - TAMANHO_TRECHO + 1)}
+    return tuple(min((a * h + b) % _PRIMO for h in trechos) & _MASCARA for a, b in _COEFICIENTES)
+
+
+def chaves_bandas(sig):
+    """Uma chave inteira (64 bits, com sinal) por banda da assinatura"""
+    chaves = []
+    for banda in range(BANDAS):
+        valores = sig[banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]
+        digest = hashlib.blake2b(struct.pack(f"<B{LINHAS_POR_BANDA}I", banda, *valores),
+                                 digest_size=8).digest()
+        chaves.append(int.from_bytes(digest, "big", signed=True))
+    return chaves
+
+
+def similaridade(sig_a, sig_b):
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERMUTACOES
+
+
+def _para_blob(sig):
+    return struct.pack(_FORMATO, *sig)
+
+
+def _de_blob(blob):
+    return struct.unpack(_FORMATO, blob)
+
+
+def indexar(conn, questoes):
+    """Grava assinatura e chaves LSH de [(questao_id, enunciado)]"""
+    return gravar_assinaturas(conn, [(qid, assinatura(enunciado)) for qid, enunciado in questoes])
+
+
+def gravar_assinaturas(conn, itens):
+    """Grava [(questao_id, assinatura já calculada)] e as chaves LSH de cada uma"""
+    linhas_bandas = [(chave, qid) for qid, sig in itens for chave in chaves_bandas(sig)]
+    conn.executemany("INSERT OR REPLACE INTO lsh_assinaturas (questao_id, assinatura) VALUES (?, ?)",
+                     [(qid, _para_blob(sig)) for qid, sig in itens])
+    conn.executemany("INSERT OR IGNORE INTO lsh_bandas (chave, questao_id) VALUES (?, ?)", linhas_bandas)
+    return len(itens)
+
+
+def indexar_pendentes(conn, bloco=5_000):
+    """Indexa as questões que ainda não têm assinatura. Retorna quantas."""
+    total = 0
+    ultimo_id = 0
+    while True:
+        linhas = conn.execute("""
+            SELECT q.id, q.enunciado FROM questoes q
+            WHERE q.id > ? AND NOT EXISTS (SELECT 1 FROM lsh_assinaturas a WHERE a.questao_id = q.id)
+            ORDER BY q.id LIMIT ?
+        """, (ultimo_id, bloco)).fetchall()
+        if not linhas:
+            return total
+        total += indexar(conn, linhas)
+        ultimo_id = linhas[-1][0]
+
+
+def buscar_similares(conn, sig, limiar=LIMIAR_DUPLICATA):
+    """[(questao_id, similaridade)] das questões indexadas parecidas com a assinatura"""
+    candidatas = conn.execute("""
+        SELECT a.questao_id, a.assinatura FROM lsh_assinaturas a
+        WHERE a.questao_id IN (
+            SELECT questao_id FROM lsh_bandas WHERE chave IN (SELECT value FROM json_each(?))
+        )
+    """, (json.dumps(chaves_bandas(sig)),)).fetchall()
+    similares = [(qid, similaridade(sig, _de_blob(blob))) for qid, blob in candidatas]
+    return sorted([s for s in similares if s[1] >= limiar], key=lambda s: -s[1])
+
+
+class IndiceMemoria:
+    """Índice LSH em memória para as questões ainda não gravadas de um lote"""
+
+    def __init__(self):
+        self.baldes = {}
+
+    def buscar(self, sig, limiar=LIMIAR_DUPLICATA):
+        vistas = set()
+        for chave in chaves_bandas(sig):
+            for i, outra in self.baldes.get(chave, ()):
+                if i not in vistas and similaridade(sig, outra) >= limiar:
+                    return i
+                vistas.add(i)
+        return None
+
+    def adicionar(self, identificador, sig):
+        for chave in chaves_bandas(sig):
+            self.baldes.setdefault(chave, []).append((identificador, sig))
+
+
+def agrupar_similares(conn, limiar=LIMIAR_DUPLICATA):
+    """
+    Indexa as pendentes e agrupa as questões quase duplicadas.
+    Retorna a lista de grupos (listas de ids, com 2 ou mais questões).
+    """
+    indexar_pendentes(conn)
+    pai = {}
+
+    def raiz(x):
+        while pai.get(x, x) != x:
+            pai[x] = pai.get(pai[x], pai[x])
+            x = pai[x]
+        return x
+
+    baldes = conn.execute("""
+        SELECT group_concat(questao_id) FROM lsh_bandas
+        GROUP BY chave HAVING COUNT(*) > 1
+    """).fetchall()
+    ids_candidatos = {int(i) for (membros,) in baldes for i in membros.split(",")}
+    assinaturas = {}
+    lista = sorted(ids_candidatos)
+    for inicio in range(0, len(lista), 50_000):
+        for qid, blob in conn.execute(
+                "SELECT questao_id, assinatura FROM lsh_assinaturas WHERE questao_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(lista[inicio:inicio + 50_000]),)):
+            assinaturas[qid] = _de_blob(blob)
+
+    for (membros,) in baldes:
+        ids = [int(i) for i in membros.split(",")]
+        # Compara cada membro do balde com o primeiro (evita O(k²) em baldes grandes)
+        referencia = ids[0]
+        for outro in ids[1:]:
+            if raiz(outro) != raiz(referencia) and \
+                    similaridade(assinaturas[referencia], assinaturas[outro]) >= limiar:
+                pai[raiz(outro)] = raiz(referencia)
+
+    grupos = {}
+    for qid in ids_candidatos:
+        grupos.setdefault(raiz(qid), []).append(qid)
+    return sorted((sorted(g) for g in grupos.values() if len(g) > 1), key=len, reverse=True)
+
+
+if __name__ == "__main__":
+    limiar = float(sys.argv[sys.argv.index("--limiar") + 1]) if "--limiar" in sys.argv else LIMIAR_DUPLICATA
+    with conexao() as conn:
+        grupos = agrupar_similares(conn, limiar)
+    tamanhos = {}
+    for g in grupos:
+        tamanhos[len(g)] = tamanhos.get(len(g), 0) + 1
+    print(f"{len(grupos)} grupos de questões quase duplicadas (limiar {limiar})")
+    for tamanho, qtd in sorted(tamanhos.items()):
+        print(f"  {qtd} grupo(s) com {tamanho} questões")
+    for g in grupos[:10]:
+        print(f"  ids: {g}")
@@ -1,26 +1,24 @@
-import sqlite3
-import random
+from conexao import conexao
+from amostragem import amostrar_do_banco
 
 def rodar_simulado():
-    conexao = sqlite3.connect('banco_questoes.db')
-    cursor = conexao.cursor()
-    cursor.execute('SELECT enunciado, op_a, op_b, op_c, op_d, correta, materia FROM questoes')
-    questoes = cursor.fetchall()
-    conexao.close()
+    total = 5 # Vamos fazer rodadas de 5 questões
+    with conexao() as conn:
+        # Sorteia só as 5 questões da rodada, sem carregar o banco inteiro
+        questoes = amostrar_do_banco(conn, total)
 
     if not questoes:
         print("Adicione questões primeiro!")
         return
 
     pontos = 0
-    total = 5 # Vamos fazer rodadas de 5 questões
-    random.shuffle(questoes) # Embaralha as questões para não ser sempre igual
+    total = len(questoes)
 
     print(f"\n=== INICIANDO SIMULADO DE {total} QUESTÕES ===")
 
     for i in range(total):
         q = questoes[i]
-        enunciado, a, b, c, d, correta, materia = q
+        enunciado, a, b, c, d, correta, materia = q[1:8]
 
         print(f"\nQUESTÃO {i+1} [{materia}]")
         print(enunciado)
@@ -0,0 +1,176 @@
+"""
+Questões já servidas a cada usuário (conjunto compacto de ids)
+Cada simulado montado marca as suas questões como vistas. O conjunto fica em
+uma única linha da tabela vistas (migração 11), serializado no formato do
+Roaring bitmap: os ids são agrupados pelos 16 bits altos e cada grupo guarda
+os 16 bits baixos como
+  - lista ordenada de uint16 (2 bytes por id) enquanto tiver até 4096 ids;
+  - mapa de 65536 bits (8 KB) a partir daí.
+Testar se uma questão já foi vista é uma busca binária ou um teste de bit,
+sem consultar respostas; o modo "só inéditas" passa o conjunto para
+amostrar_questoes, que descarta os candidatos vistos.
+"""
+import array
+import bisect
+import random
+import struct
+import sys
+
+from amostragem import amostrar_questoes
+
+INEDITAS = "ineditas"   # modo de seleção do menu
+USUARIO_LOCAL = 0       # aplicativo de desktop (main_app.py), sem login
+LIMITE_LISTA = 4096     # acima disto o grupo vira mapa de bits
+BYTES_MAPA = 8192       # 65536 bits
+
+_CABECALHO = struct.Struct("<BI")   # versão, número de grupos
+_GRUPO = struct.Struct("<II")       # 16 bits altos do id, quantidade de ids
+VERSAO = 1
+
+
+class ConjuntoVisto:
+    """Conjunto de ids inteiros não negativos, com `in`, len() e iteração em ordem"""
+
+    def __init__(self, ids=()):
+        self._grupos = {}  # 16 bits altos → array('H') ordenado ou bytearray (mapa de bits)
+        self._tamanhos = {}
+        self.atualizar(ids)
+
+    def __contains__(self, qid):
+        grupo = self._grupos.get(qid >> 16)
+        if grupo is None:
+            return False
+        baixo = qid & 0xFFFF
+        if isinstance(grupo, bytearray):
+            return bool(grupo[baixo >> 3] >> (baixo & 7) & 1)
+        i = bisect.bisect_left(grupo, baixo)
+        return i < len(grupo) and grupo[i] == baixo
+
+    def __len__(self):
+        return sum(self._tamanhos.values())
+
+    def __iter__(self):
+        for alto in sorted(self._grupos):
+            grupo = self._grupos[alto]
+            base = alto << 16
+            if isinstance(grupo, bytearray):
+                for byte_i, byte in enumerate(grupo):
+                    while byte:
+                        bit = (byte & -byte).bit_length() - 1
+                        yield base | (byte_i << 3 | bit)
+                        byte &= byte - 1
+            else:
+                for baixo in grupo:
+                    yield base | baixo
+
+    def adicionar(self, qid):
+        """Inclui o id. Retorna False se ele já estava no conjunto."""
+        alto, baixo = qid >> 16, qid & 0xFFFF
+        grupo = self._grupos.get(alto)
+        if grupo is None:
+            grupo = self._grupos[alto] = array.array("H")
+            self._tamanhos[alto] = 0
+        if isinstance(grupo, bytearray):
+            mascara = 1 << (baixo & 7)
+            if grupo[baixo >> 3] & mascara:
+                return False
+            grupo[baixo >> 3] |= mascara
+        else:
+            i = bisect.bisect_left(grupo, baixo)
+            if i < len(grupo) and grupo[i] == baixo:
+                return False
+            grupo.insert(i, baixo)
+            if len(grupo) > LIMITE_LISTA:
+                self._grupos[alto] = _para_mapa(grupo)
+        self._tamanhos[alto] += 1
+        return True
+
+    def atualizar(self, ids):
+        """Inclui vários ids. Retorna quantos eram novos."""
+        return sum(self.adicionar(qid) for qid in ids)
+
+    def serializar(self):
+        partes = [_CABECALHO.pack(VERSAO, len(self._grupos))]
+        for alto in sorted(self._grupos):
+            grupo = self._grupos[alto]
+            partes.append(_GRUPO.pack(alto, self._tamanhos[alto]))
+            if isinstance(grupo, bytearray):
+                partes.append(bytes(grupo))
+            else:
+                if sys.byteorder != "little":
+                    grupo = array.array("H", grupo)
+                    grupo.byteswap()
+                partes.append(grupo.tobytes())
+        return b"".join(partes)
+
+    @classmethod
+    def desserializar(cls, dados):
+        conjunto = cls()
+        if not dados:
+            return conjunto
+        versao, n_grupos = _CABECALHO.unpack_from(dados, 0)
+        if versao != VERSAO:
+            raise ValueError(f"Versão desconhecida do conjunto de vistas: {versao}")
+        pos = _CABECALHO.size
+        for _ in range(n_grupos):
+            alto, tamanho = _GRUPO.unpack_from(dados, pos)
+            pos += _GRUPO.size
+            if tamanho > LIMITE_LISTA:
+                conjunto._grupos[alto] = bytearray(dados[pos:pos + BYTES_MAPA])
+                pos += BYTES_MAPA
+            else:
+                grupo = array.array("H")
+                grupo.frombytes(dados[pos:pos + 2 * tamanho])
+                if sys.byteorder != "little":
+                    grupo.byteswap()
+                conjunto._grupos[alto] = grupo
+                pos += 2 * tamanho
+            conjunto._tamanhos[alto] = tamanho
+        return conjunto
+
+
+def _para_mapa(lista):
+    mapa = bytearray(BYTES_MAPA)
+    for baixo in lista:
+        mapa[baixo >> 3] |= 1 << (baixo & 7)
+    return mapa
+
+
+def carregar_vistas(conn, usuario_id):
+    linha = conn.execute("SELECT conjunto FROM vistas WHERE usuario_id = ?", (usuario_id,)).fetchone()
+    return ConjuntoVisto.desserializar(linha[0] if linha else None)
+
+
+def marcar_vistas(conn, usuario_id, ids):
+    """Acrescenta ids ao conjunto do usuário. Retorna quantos eram novos."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    # Leitura e gravação na mesma transação de escrita: duas sessões do mesmo
+    # usuário (abas, web e desktop) não sobrescrevem os bits uma da outra.
+    # Com escrita pendente, a transação em curso já tem a trava
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conjunto = carregar_vistas(conn, usuario_id)
+    novos = conjunto.atualizar(ids)
+    if novos:
+        conn.execute("""
+            INSERT INTO vistas (usuario_id, conjunto, total) VALUES (?, ?, ?)
+            ON CONFLICT (usuario_id) DO UPDATE SET conjunto = excluded.conjunto, total = excluded.total
+        """, (usuario_id, conjunto.serializar(), len(conjunto)))
+    return novos
+
+
+def total_vistas(conn, usuario_id):
+    linha = conn.execute("SELECT total FROM vistas WHERE usuario_id = ?", (usuario_id,)).fetchone()
+    return linha[0] if linha else 0
+
+
+def limpar_vistas(conn, usuario_id):
+    """Esquece as questões já vistas (recomeça o modo "só inéditas")"""
+    conn.execute("DELETE FROM vistas WHERE usuario_id = ?", (usuario_id,))
+
+
+def amostrar_ineditas(conn, usuario_id, cargo_id, config, totais=None, rng=random):
+    """Mesmo contrato de amostrar_questoes, só com questões que o usuário ainda não viu"""
+    return amostrar_questoes(conn, cargo_id, config, totais, rng, excluir=carregar_vistas(conn, usuario_id))